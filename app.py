@@ -1,5 +1,6 @@
 import sys
 import os
+import json
 import pandas as pd
 import streamlit as st
 from pathlib import Path
@@ -10,8 +11,10 @@ sys.path.append(str(current_dir))
 
 # Import utilities
 try:
-    from utils.gpt_helpers import run_gpt_prompt
+    from utils.gpt_helpers import stream_gpt_prompt
     from utils.gpt_scraper import EnterpriseScraper
+    from utils.map_reduce import map_reduce_comments
+    from utils.dedup import dedup_near_duplicates
 except ImportError as e:
     st.error(f"Import Error: {str(e)}")
     st.error(f"Current directory: {os.getcwd()}")
@@ -44,7 +47,7 @@ if st.button("Scrape the Web"):
                 dfs.append(trust_df)
             
             if dfs:
-                full_df = pd.concat(dfs, ignore_index=True)
+                full_df = dedup_near_duplicates(pd.concat(dfs, ignore_index=True), 'comment')
                 st.session_state.scraped_data = full_df
                 st.success(f"Scraped {len(full_df)} comments! Preview:")
                 st.dataframe(full_df.head())
@@ -60,21 +63,21 @@ if st.button("Scrape the Web"):
 if "scraped_data" in st.session_state and st.session_state.scraped_data is not None:
     if st.button("Analyze with GPT"):
         try:
-            comments = st.session_state.scraped_data['comment'].dropna().head(10)
+            comments = st.session_state.scraped_data['comment'].dropna()
             if len(comments) == 0:
                 st.warning("No valid comments found")
             else:
-                prompt = f"Analyze sentiment for '{keyword}' based on these comments:\n\n"
-                prompt += "\n".join([f"- {comment}" for comment in comments])
+                with st.spinner(f"Analyzing all {len(comments)} comments..."):
+                    digest = map_reduce_comments(comments, subject=keyword)
+
+                prompt = f"Analyze sentiment for '{keyword}' based on this aggregated analysis of {digest['comments_analyzed']} comments:\n\n"
+                prompt += json.dumps(digest, indent=2)
                 
                 st.markdown("### ✅ Prompt Sent to GPT")
                 st.code(prompt)
 
-                with st.spinner("Analyzing..."):
-                    response = run_gpt_prompt(prompt, module="brand_reputation")
-                
                 st.markdown("### 🧠 Analysis Results")
-                st.write(response)
+                response = st.write_stream(stream_gpt_prompt(prompt))
                 
         except Exception as e:
             st.error(f"Analysis failed: {str(e)}")
@@ -0,0 +1,83 @@
+"""MinHash + LSH near-duplicate detection vs exact pairwise Jaccard.
+
+Builds synthetic syndicated headlines (each story republished by several
+outlets with small edits), then compares run time and agreement.
+
+    python benchmarks/bench_dedup.py --stories 20000 --copies 5
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from utils.dedup import DEFAULT_THRESHOLD, SHINGLE_SIZE, _normalize, near_duplicate_labels
+
+OUTLETS = ["Reuters", "CNBC", "Bloomberg", "AP", "Yahoo Finance", "MarketWatch", "The Verge"]
+
+
+def make_mentions(stories, copies, seed=0):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    mentions = []
+    for _ in range(stories):
+        headline = " ".join(rng.choices(vocabulary, k=12))
+        for _ in range(copies):
+            mentions.append(f"{headline} - {rng.choice(OUTLETS)}")
+    rng.shuffle(mentions)
+    return mentions
+
+
+def exact_labels(texts, threshold=DEFAULT_THRESHOLD, k=SHINGLE_SIZE):
+    """Reference: Jaccard of every pair of shingle sets, O(n^2)"""
+    shingles = []
+    for text in texts:
+        text = _normalize(text).ljust(k)
+        shingles.append({text[i:i + k] for i in range(len(text) - k + 1)})
+    labels = list(range(len(texts)))
+    for i in range(len(texts)):
+        for j in range(i):
+            if labels[i] != i:
+                break
+            a, b = shingles[i], shingles[j]
+            if len(a & b) / len(a | b) >= threshold:
+                labels[i] = labels[j]
+    return np.array(labels)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stories", type=int, default=20000)
+    parser.add_argument("--copies", type=int, default=5)
+    parser.add_argument("--exact-sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    mentions = make_mentions(args.stories, args.copies)
+    sample = mentions[:args.exact_sample]
+
+    start = time.perf_counter()
+    exact = exact_labels(sample)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    approx = near_duplicate_labels(sample)
+    approx_time = time.perf_counter() - start
+    agreement = (np.unique(exact).size, np.unique(approx).size)
+
+    print(f"{len(sample):>8} mentions  exact pairwise {exact_time:8.2f} s  minhash/lsh {approx_time:6.2f} s  "
+          f"clusters exact/minhash {agreement[0]}/{agreement[1]}")
+
+    scale = (len(mentions) / len(sample)) ** 2
+    start = time.perf_counter()
+    labels = near_duplicate_labels(mentions)
+    elapsed = time.perf_counter() - start
+    print(f"{len(mentions):>8} mentions  exact pairwise ~{exact_time * scale:7.0f} s (extrapolated)  "
+          f"minhash/lsh {elapsed:6.2f} s  kept {np.unique(labels).size} of {len(mentions)}")
+
+
+if __name__ == "__main__":
+    main()
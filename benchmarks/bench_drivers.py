@@ -0,0 +1,59 @@
+"""Driver importance (correlations, standardized betas, relative weights) on a
+wide survey, vs pandas' DataFrame.corr plus a least-squares fit.
+
+    python benchmarks/bench_drivers.py --rows 1000000 --drivers 200
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.drivers import driver_importance
+
+
+def make_survey(rows, drivers, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.integers(1, 11, size=(rows, drivers)).astype(np.float32)
+    x[:, 1] += x[:, 0] * 0.5  # a collinear pair
+    effects = np.zeros(drivers, dtype=np.float32)
+    effects[:10] = np.linspace(0.5, 0.05, 10)
+    nps = np.clip(np.rint(x @ effects / effects.sum() + rng.normal(0, 1.5, rows)), 0, 10)
+    df = pd.DataFrame(x, columns=[f"driver_{i:03d}" for i in range(drivers)])
+    df.insert(0, "nps", nps.astype(np.float32))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--drivers", type=int, default=200)
+    parser.add_argument("--pandas", action="store_true", help="also time DataFrame.corr + lstsq")
+    args = parser.parse_args()
+    df = make_survey(args.rows, args.drivers)
+    print(f"{args.rows:,} rows x {args.drivers} drivers ({df.memory_usage().sum() / 2**20:.0f} MiB frame)")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    analysis = driver_importance(df, "nps")
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    print(f"driver_importance  {elapsed:6.2f} s  peak allocations {peak:.0f} MiB  R² {analysis.r_squared:.3f}")
+    print(analysis.table.head(5).to_string(index=False))
+
+    if args.pandas:
+        start = time.perf_counter()
+        corr = df.corr()
+        z = (df - df.mean()) / df.std()
+        np.linalg.lstsq(z.drop(columns="nps").to_numpy(), z["nps"].to_numpy(), rcond=None)
+        print(f"pandas corr + lstsq {time.perf_counter() - start:6.2f} s  ({corr.shape})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Aho-Corasick emotion lexicon vs the old per-row substring loop.
+
+The old loop is the page's original infer_emotion (4 emotions, 15 words);
+the automaton scores the bundled 8-emotion Plutchik lexicon, so it does
+more work per row and still matches whole words only.
+
+    python benchmarks/bench_emotion.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.emotion_lexicon import DEFAULT_LEXICON_PATH, get_emotion_lexicon, read_emotion_lexicon
+
+WORDS = ("the delivery was late and support seemed rude but the refund was fast so happy overall "
+         "badge frustrated love hate trust secure upset disappointed let down can't wait").split()
+
+
+def infer_emotion(text):
+    joy_words = ["happy", "delight", "love", "great"]
+    anger_words = ["angry", "frustrated", "bad", "hate"]
+    sadness_words = ["sad", "disappointed", "upset", "cry"]
+    trust_words = ["trust", "confident", "secure"]
+
+    scores = {"Joy": 0, "Anger": 0, "Sadness": 0, "Trust": 0}
+    text = text.lower()
+    for word in joy_words:
+        if word in text:
+            scores["Joy"] += 1
+    for word in anger_words:
+        if word in text:
+            scores["Anger"] += 1
+    for word in sadness_words:
+        if word in text:
+            scores["Sadness"] += 1
+    for word in trust_words:
+        if word in text:
+            scores["Trust"] += 1
+    return scores
+
+
+def loop_full_lexicon(texts, frame):
+    """The old substring loop run over every term of the bundled lexicon"""
+    lexicon = list(zip(frame["term"].str.lower(), frame["emotion"]))
+    totals = dict.fromkeys(frame["emotion"].unique(), 0)
+    for feedback in texts:
+        feedback = feedback.lower()
+        for term, emotion in lexicon:
+            if term in feedback:
+                totals[emotion] += 1
+    return totals
+
+
+def make_feedback(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    tokens = rng.choice(np.array(WORDS, dtype=object), size=(rows, 15))
+    return pd.Series([" ".join(row) for row in tokens])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--full-lexicon-sample", type=int, default=50_000)
+    args = parser.parse_args()
+
+    texts = make_feedback(args.rows)
+
+    start = time.perf_counter()
+    totals = {"Joy": 0, "Anger": 0, "Sadness": 0, "Trust": 0}
+    for feedback in texts.dropna():
+        scores = infer_emotion(feedback)
+        for emo in totals:
+            totals[emo] += scores[emo]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lexicon = get_emotion_lexicon()
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    matrix = lexicon.score(texts)
+    score_time = time.perf_counter() - start
+
+    sample = texts[:args.full_lexicon_sample]
+    start = time.perf_counter()
+    loop_full_lexicon(sample, read_emotion_lexicon(DEFAULT_LEXICON_PATH))
+    full_time = (time.perf_counter() - start) * args.rows / len(sample)
+
+    print(f"{args.rows:>9} rows  substring loop     {loop_time:6.2f} s  {totals}")
+    print(f"{args.rows:>9} rows  loop, full lexicon ~{full_time:5.0f} s (extrapolated from {len(sample)} rows)")
+    print(f"{args.rows:>9} rows  aho-corasick       {score_time:6.2f} s  (compile {compile_time * 1000:.0f} ms, "
+          f"{lexicon.terms} terms, {lexicon.states} states)  matrix {matrix.shape} {matrix.dtype}")
+    print("  " + ", ".join(f"{e} {v:.0f}" for e, v in zip(lexicon.emotions, matrix.sum(axis=0))))
+
+
+if __name__ == "__main__":
+    main()
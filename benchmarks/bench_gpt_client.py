@@ -0,0 +1,66 @@
+"""Latency benchmark: a new OpenAI client per call vs the shared pooled client.
+
+Runs against a local mock endpoint. --handshake-delay simulates the TLS
+handshake paid on every new connection to the real API.
+
+    python benchmarks/bench_gpt_client.py --calls 50 --handshake-delay 0.05
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import openai
+
+from benchmarks.mock_openai import start_mock_server
+from utils import gpt_client
+
+MESSAGES = [{"role": "user", "content": "Summarize the feedback."}]
+
+
+def _time_calls(make_client, calls):
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        client = make_client()
+        client.chat.completions.create(model="gpt-3.5-turbo", messages=MESSAGES)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _report(label, latencies, connections):
+    print(f"{label:<22} mean {statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"p50 {statistics.median(latencies) * 1000:7.2f} ms  "
+          f"connections {connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--handshake-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server, base_url = start_mock_server(handshake_delay=args.handshake_delay)
+    os.environ["OPENAI_API_KEY"] = "sk-mock"
+
+    # Previous behaviour: a fresh client (and connection pool) per analysis
+    def fresh_client():
+        return openai.OpenAI(api_key="sk-mock", base_url=base_url)
+
+    latencies = _time_calls(fresh_client, args.calls)
+    _report("client per call", latencies, server.connections)
+
+    server.connections = 0
+    latencies = _time_calls(lambda: gpt_client.get_client("gpt-3.5-turbo", base_url=base_url), args.calls)
+    _report("shared pooled client", latencies, server.connections)
+
+    gpt_client.close_clients()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
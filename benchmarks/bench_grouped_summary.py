@@ -0,0 +1,51 @@
+"""summarize_groups (weighted, all statistics in one pass) vs a pandas groupby
+computing the same statistics unweighted.
+
+    python benchmarks/bench_grouped_summary.py --rows 5000000 --groups 5000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.stats_helpers import summarize_groups
+
+
+def make_survey(rows, groups, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "segment": rng.integers(0, groups, rows),
+        "region": rng.choice(["North", "South", "East", "West"], rows),
+        "spend": rng.lognormal(4, 1, rows),
+        "nps": rng.integers(0, 11, rows),
+        "weight": rng.uniform(0.2, 3, rows),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--groups", type=int, default=5000)
+    args = parser.parse_args()
+    df = make_survey(args.rows, args.groups)
+    columns = ["spend", "nps"]
+
+    start = time.perf_counter()
+    grouped = df.groupby(["segment", "region"])[columns]
+    grouped.agg(["count", "mean", "std", "min", "max", "median"])
+    grouped.quantile([0.9, 0.99])
+    print(f"pandas groupby (unweighted)   {time.perf_counter() - start:6.2f} s")
+    for weights in (None, "weight"):
+        start = time.perf_counter()
+        table = summarize_groups(df, ["segment", "region"], weights, columns)
+        label = "weighted" if weights else "unweighted"
+        print(f"summarize_groups ({label:>10}) {time.perf_counter() - start:6.2f} s  {table.shape}")
+
+
+if __name__ == "__main__":
+    main()
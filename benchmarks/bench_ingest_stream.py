@@ -0,0 +1,79 @@
+"""Full load vs chunked streaming of a large tab-delimited TXT export.
+
+Each mode runs in a fresh process so peak RSS is its own: "full" parses the
+whole file with pandas and analyzes it, "stream" feeds compact chunks into
+summarize_dataframe and the keyword/emotion analytics.
+
+    python benchmarks/bench_ingest_stream.py --rows 2000000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+WORDS = ("the delivery was late and support seemed rude but the refund was fast so happy overall "
+         "frustrated love hate trust secure upset disappointed let down can't wait").split()
+
+
+def make_export(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    block = 250_000
+    for start in range(0, rows, block):
+        n = min(block, rows - start)
+        texts = rng.choice(np.array(WORDS, dtype=object), size=(n, 12))
+        pd.DataFrame({
+            "feedback": [" ".join(row) for row in texts],
+            "region": rng.choice(["North", "South", "East", "West"], n),
+            "channel": rng.choice(["web", "app", "store"], n),
+            "nps": rng.integers(0, 11, n),
+            "spend": rng.normal(100, 30, n).round(2),
+        }).to_csv(path, sep="\t", index=False, header=start == 0, mode="w" if start == 0 else "a")
+
+
+def run(mode, path):
+    from utils.ingest import iter_upload_chunks
+    from utils.parallel_text import analyze_chunks, analyze_text
+    from utils.stats_helpers import summarize_dataframe
+
+    start = time.perf_counter()
+    if mode == "full":
+        df = pd.read_csv(path, delimiter="\t")
+        summarize_dataframe(df)
+        analyze_text(df["feedback"], df["region"], workers=1)
+    else:
+        analyze_chunks(iter_upload_chunks(path, "export.txt", keep=["feedback"]), "feedback", "region")
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:>6}  {elapsed:6.2f} s  peak RSS {peak:7.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--mode", choices=["full", "stream"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.mode:
+        run(args.mode, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "export.txt")
+        make_export(path, args.rows)
+        print(f"{args.rows} rows, {os.path.getsize(path) / 2**20:.0f} MiB on disk")
+        for mode in ("full", "stream"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, "--path", path], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Chunked Arrow keyword engine vs the old join-and-findall extraction.
+
+    python benchmarks/bench_keywords.py --rows 2000000
+"""
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.keywords import count_keywords, extract_keywords
+from utils.lexicon import get_stopwords
+
+WORDS = ("service support delivery price quality waited hours refund great terrible product manager "
+         "friendly rude staff crashed login easy fast slow checkout billing the and for with very really").split()
+
+
+def make_feedback(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    tokens = rng.choice(np.array(WORDS, dtype=object), size=(rows, 12))
+    return pd.Series([" ".join(row) + "." for row in tokens])
+
+
+def old_extract_keywords(texts, stopwords):
+    text_blob = " ".join(texts).lower()
+    words = re.findall(r"\b[a-zA-Z]{4,}\b", text_blob)
+    keywords = [word for word in words if word not in stopwords]
+    return Counter(keywords).most_common(20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    texts = make_feedback(args.rows)
+    stopwords = get_stopwords()
+
+    start = time.perf_counter()
+    old = old_extract_keywords(texts, stopwords)
+    old_time = time.perf_counter() - start
+    start = time.perf_counter()
+    new = extract_keywords(texts, stopwords)
+    new_time = time.perf_counter() - start
+
+    # Peak memory on separate runs so tracing does not distort the timings
+    tracemalloc.start()
+    old_extract_keywords(texts, stopwords)
+    old_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    extract_keywords(texts, stopwords)
+    new_peak = tracemalloc.get_traced_memory()[1] + pa.default_memory_pool().max_memory()
+    tracemalloc.stop()
+
+    print(f"{args.rows:>9} rows  old {old_time:6.2f} s  peak {old_peak / 2**20:7.1f} MiB")
+    print(f"{args.rows:>9} rows  new {new_time:6.2f} s  peak {new_peak / 2**20:7.1f} MiB  same top 20: {old == new}")
+
+    segments = pd.Series(np.random.default_rng(1).choice(["north", "south", "east", "west"], args.rows))
+    start = time.perf_counter()
+    counter = count_keywords(texts, segments, stopwords, ngram_range=(1, 3))
+    print(f"{args.rows:>9} rows  1-3 grams by segment {time.perf_counter() - start:6.2f} s  "
+          f"{sum(len(c) for c in counter.segments.values())} segment terms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Van Westendorp and Gabor-Granger on 1M survey responses.
+
+    python benchmarks/bench_pricing.py --rows 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.pricing import detect_gabor_granger, detect_van_westendorp, gabor_granger, van_westendorp
+
+PRICE_POINTS = (9.99, 14.99, 19.99, 24.99, 29.99)
+
+
+def make_survey(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    fair = rng.lognormal(np.log(20), 0.3, rows)
+    df = pd.DataFrame({
+        "Too cheap (question quality)": fair * rng.uniform(0.4, 0.6, rows),
+        "Cheap / a bargain": fair * rng.uniform(0.7, 0.9, rows),
+        "Getting expensive": fair * rng.uniform(1.1, 1.3, rows),
+        "Too expensive to consider": fair * rng.uniform(1.5, 1.9, rows),
+    })
+    for price in PRICE_POINTS:
+        likely = np.clip(5 - (price / fair) * 2 + rng.normal(0, 1, rows), 1, 5).round()
+        df[f"Likelihood to buy at ${price}"] = likely.astype(np.int8)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    df = make_survey(args.rows)
+
+    start = time.perf_counter()
+    vw = van_westendorp(df, detect_van_westendorp(df.columns))
+    print(f"Van Westendorp  {time.perf_counter() - start:6.3f} s  {vw.prompt_context()}")
+    start = time.perf_counter()
+    gg = gabor_granger(df, detect_gabor_granger(df.columns))
+    print(f"Gabor-Granger   {time.perf_counter() - start:6.3f} s  {gg.prompt_context()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Mini-batch k-means segmentation (auto k by sampled silhouette) on a large
+survey, vs full-batch Lloyd iterations on the materialized feature matrix.
+
+    python benchmarks/bench_segmentation.py --rows 2000000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.segmentation import EncodedRows, _assign, _kmeans_pp, default_columns, feature_spec, segment
+
+
+def make_survey(rows, segments=5, seed=0):
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(0, segments, rows)
+    centers = rng.normal(0, 2.5, (segments, 6))
+    x = centers[truth] + rng.normal(size=(rows, 6))
+    regions = np.array(["North", "South", "East", "West"])
+    plans = np.array(["basic", "plus", "pro"])
+    df = pd.DataFrame({f"score_{i}": x[:, i].astype(np.float32) for i in range(6)})
+    df["region"] = regions[np.where(rng.random(rows) < 0.7, truth % 4, rng.integers(0, 4, rows))]
+    df["plan"] = plans[rng.integers(0, 3, rows)]
+    df["respondent_id"] = np.arange(rows)
+    return df, truth
+
+
+def lloyd(df, k, iterations=20):
+    spec = feature_spec(df, default_columns(df))
+    x = EncodedRows(df, spec).take(slice(None))
+    centers = _kmeans_pp(x[:2000], k, np.random.default_rng(0))
+    for _ in range(iterations):
+        labels, _ = _assign(x, centers)
+        centers = np.array([x[labels == j].mean(axis=0) for j in range(k)])
+    return labels
+
+
+def measure(func, *args):
+    """Time a run, then repeat it under tracemalloc (which slows NumPy down) for the peak"""
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+    df, truth = make_survey(args.rows)
+    print(f"{args.rows:,} rows, {df.memory_usage(deep=True).sum() / 2**20:.0f} MiB frame")
+
+    result, elapsed, peak = measure(segment, df)
+    agreement = pd.crosstab(result.labels, truth).max(axis=1).sum() / len(truth)
+    print(f"mini-batch, k in 2..8   {elapsed:6.2f} s  peak allocations {peak:5.0f} MiB  "
+          f"k={result.k}  purity {agreement:.3f}")
+    print("silhouette by k:", {k: round(v, 3) for k, v in result.silhouette.items()})
+
+    labels, elapsed, peak = measure(lloyd, df, result.k)
+    agreement = pd.crosstab(labels, truth).max(axis=1).sum() / len(truth)
+    print(f"full-batch Lloyd, one k {elapsed:6.2f} s  peak allocations {peak:5.0f} MiB  purity {agreement:.3f}")
+    print(result.prompt_context())
+
+
+if __name__ == "__main__":
+    main()
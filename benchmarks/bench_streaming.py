@@ -0,0 +1,56 @@
+"""Time-to-first-token with streaming vs time-to-full-response without it.
+
+Runs against a local mock endpoint that emits one word every --token-delay
+seconds, so a long report behaves like a slow completion from the real API.
+
+    python benchmarks/bench_streaming.py --words 400 --token-delay 0.02
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+os.environ["SAMI_GPT_CACHE"] = "0"  # measure the API path, not cache hits
+
+from benchmarks.mock_openai import start_mock_server
+from utils import gpt_client
+from utils.gpt_helpers import run_gpt_prompt, stream_gpt_prompt
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    reply = " ".join(f"word{i}" for i in range(args.words))
+    server, base_url = start_mock_server(token_delay=args.token_delay, reply=reply)
+    os.environ["OPENAI_API_KEY"] = "sk-mock"
+    os.environ["OPENAI_BASE_URL"] = base_url
+
+    start = time.perf_counter()
+    run_gpt_prompt("Write the report.")
+    blocking = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_token = None
+    parts = []
+    for delta in stream_gpt_prompt("Write the report."):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+        parts.append(delta)
+    streamed = time.perf_counter() - start
+
+    print(f"blocking: full response after   {blocking * 1000:8.1f} ms")
+    print(f"streaming: first token after    {first_token * 1000:8.1f} ms")
+    print(f"streaming: full response after  {streamed * 1000:8.1f} ms ({len(''.join(parts).split())} words)")
+
+    gpt_client.close_clients()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
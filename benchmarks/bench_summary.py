@@ -0,0 +1,68 @@
+"""Single-pass summarize_dataframe vs per-column pandas calls for the same
+statistics, plus the KLL quantiles' rank error against exact quantiles.
+
+    python benchmarks/bench_summary.py --rows 1000000 --columns 10
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from utils.stats_helpers import QUANTILES, summarize_dataframe
+
+
+def make_numeric(rows, columns, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f"x{i}": rng.lognormal(i % 3, 1, rows) for i in range(columns)})
+    df.loc[rng.random(rows) < 0.05, "x0"] = np.nan
+    return df
+
+
+def per_column_summary(df):
+    summary = {}
+    for col in df.select_dtypes(include='number').columns:
+        series = df[col]
+        summary[col] = {
+            "count": series.count(), "nulls": series.isna().sum(),
+            "mean": series.mean(), "std": series.std(), "min": series.min(), "max": series.max(),
+            **{name: series.quantile(q) for name, q in QUANTILES.items()},
+        }
+    return pd.DataFrame(summary).T
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    args = parser.parse_args()
+    df = make_numeric(args.rows, args.columns)
+
+    start = time.perf_counter()
+    exact = per_column_summary(df)
+    print(f"per-column pandas   {time.perf_counter() - start:6.2f} s")
+    start = time.perf_counter()
+    single = summarize_dataframe(df)
+    print(f"single pass         {time.perf_counter() - start:6.2f} s")
+    start = time.perf_counter()
+    chunked = summarize_dataframe(df.iloc[i:i + args.chunk_rows] for i in range(0, len(df), args.chunk_rows))
+    print(f"chunked ({args.chunk_rows} rows) {time.perf_counter() - start:6.2f} s")
+
+    moments = ["count", "nulls", "mean", "std", "min", "max"]
+    print("max moment difference:", float((single[moments] - exact[moments].astype(float)).abs().max().max()))
+    for label, summary in (("single", single), ("chunked", chunked)):
+        errors = []
+        for col in df.columns:
+            values = np.sort(df[col].dropna().to_numpy())
+            for name, q in QUANTILES.items():
+                errors.append(abs(np.searchsorted(values, summary.loc[col, name]) / len(values) - q))
+        print(f"{label:>8} max quantile rank error: {max(errors):.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""XLSX load time and peak memory: pd.read_excel vs openpyxl read-only vs
+the vectorized reader in utils/xlsx_reader.py.
+
+Each reader runs in a fresh process so its peak RSS is its own. Pass
+--path to time an existing workbook instead of a generated survey.
+
+    python benchmarks/bench_xlsx.py --rows 200000
+    python benchmarks/bench_xlsx.py --path survey.xlsx --usecols region,nps
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+READERS = ("read_excel", "openpyxl", "xlsx_reader")
+
+
+def make_survey(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "region": rng.choice(["North", "South", "East", "West"], rows),
+        "age": rng.integers(18, 80, rows),
+        "nps": rng.integers(0, 11, rows),
+        "spend": rng.normal(100, 30, rows).round(2),
+        "channel": rng.choice(["web", "app", "store"], rows),
+        "comment": rng.choice(["love it", "too slow", "great staff, friendly", "refund took weeks"], rows),
+        "date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D"),
+        "satisfaction": rng.random(rows),
+    }).to_excel(path, index=False, sheet_name="Responses")
+
+
+def run(reader, path, usecols):
+    from utils.xlsx_reader import _read_openpyxl, read_xlsx
+
+    data = Path(path).read_bytes()
+    start = time.perf_counter()
+    if reader == "read_excel":
+        df = pd.read_excel(path, usecols=usecols)
+    elif reader == "openpyxl":
+        df = _read_openpyxl(data, None, usecols)
+    else:
+        df = read_xlsx(data, usecols=usecols)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{reader:>12}  {elapsed:6.2f} s  peak RSS {peak:6.0f} MiB  {df.shape}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--path")
+    parser.add_argument("--usecols", help="comma-separated column subset")
+    parser.add_argument("--reader", choices=READERS)
+    args = parser.parse_args()
+    usecols = args.usecols.split(",") if args.usecols else None
+
+    if args.reader:
+        run(args.reader, args.path, usecols)
+        return
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = args.path
+        if path is None:
+            path = os.path.join(scratch, "survey.xlsx")
+            make_survey(path, args.rows)
+        print(f"{os.path.basename(path)}: {os.path.getsize(path) / 2**20:.1f} MiB"
+              + (f", columns {usecols}" if usecols else ""))
+        for reader in READERS:
+            command = [sys.executable, __file__, "--reader", reader, "--path", path]
+            if args.usecols:
+                command += ["--usecols", args.usecols]
+            subprocess.run(command, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Harness for utils/http_fetch.py against a local HTTP stand-in server.
+
+Checks connection reuse, 304 revalidation, retries and timeouts, then times
+pooled fetches against bare requests.get.
+
+    python benchmarks/check_http_fetch.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import feedparser
+import requests
+
+from benchmarks.http_standin import start_standin_server
+from utils.http_cache import DiskStore
+from utils.http_fetch import Fetcher
+
+
+def check(label, condition):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        sys.exit(1)
+
+
+def main():
+    server, base = start_standin_server(slow_delay=2.0)
+    fetcher = Fetcher(store=DiskStore(":memory:"), limiter=None, backoff_factor=0.05)
+
+    first = fetcher.get(f"{base}/feed.xml")
+    second = fetcher.get(f"{base}/feed.xml")
+    check("ETag revalidation serves 304 from the local cache", second.from_cache and server.not_modified == 1)
+    check("cached body matches the original", first.content == second.content)
+    check("feed parses from fetched bytes", len(feedparser.parse(second.content).entries) == 2)
+
+    fetcher.get(f"{base}/lastmod.json")
+    check("Last-Modified revalidation", fetcher.get(f"{base}/lastmod.json").from_cache)
+
+    fetcher.get(f"{base}/revalidate.json")
+    revalidated = fetcher.get(f"{base}/revalidate.json")
+    hits = server.hits["/revalidate.json"]
+    check("a 304's lower-case Cache-Control replaces the stored one",
+          revalidated.from_cache and fetcher.get(f"{base}/revalidate.json").from_cache
+          and server.hits["/revalidate.json"] == hits)
+
+    fetcher.get(f"{base}/fresh.json")
+    hits = server.hits.get("/fresh.json", 0)
+    check("Cache-Control max-age is served without the network",
+          fetcher.get(f"{base}/fresh.json").from_cache and server.hits["/fresh.json"] == hits)
+    check("no-store responses are never cached",
+          not fetcher.get(f"{base}/private.json").from_cache and not fetcher.get(f"{base}/private.json").from_cache)
+
+    flaky = fetcher.get(f"{base}/flaky.json")
+    check("503s are retried with backoff", flaky.status_code == 200 and server.hits["/flaky.json"] == 3)
+
+    try:
+        fetcher.get(f"{base}/slow", timeout=(1, 0.3))
+        timed_out = False
+    except requests.exceptions.RequestException:
+        timed_out = True
+    check("read timeout is enforced", timed_out)
+
+    server.connections = 0
+    for _ in range(20):
+        fetcher.get(f"{base}/feed.xml")
+    check(f"20 fetches reuse pooled connections ({server.connections} opened)", server.connections <= 1)
+
+    calls = 100
+    start = time.perf_counter()
+    for _ in range(calls):
+        requests.get(f"{base}/lastmod.json", timeout=5)
+    bare = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(calls):
+        fetcher.get(f"{base}/lastmod.json")
+    pooled = time.perf_counter() - start
+    print(f"cache stats: {fetcher.stats()}")
+    print(f"bare requests.get: {bare / calls * 1000:.2f} ms/call, pooled fetch: {pooled / calls * 1000:.2f} ms/call")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
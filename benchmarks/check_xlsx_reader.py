@@ -0,0 +1,61 @@
+"""Checks utils/xlsx_reader.py against pd.read_excel on a generated sheet with
+hourly and sub-second timestamps, mixed cells, duplicate headers and gaps.
+
+    python benchmarks/check_xlsx_reader.py
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from utils.xlsx_reader import read_xlsx
+
+
+def check(label, condition):
+    print(f"{'ok  ' if condition else 'FAIL'} {label}")
+    if not condition:
+        sys.exit(1)
+
+
+def make_workbook(path, rows=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "hourly": pd.date_range("2020-01-01", periods=rows, freq="h"),
+        "stamp": pd.Timestamp("2024-03-10 08:00") + pd.to_timedelta(rng.integers(0, 10**9, rows), unit="ms"),
+        "score": rng.normal(size=rows),
+    }).to_excel(path, index=False)
+    book = openpyxl.load_workbook(path)
+    sheet = book.active
+    sheet.cell(1, 4, "a")
+    sheet.cell(1, 5, "a")
+    sheet.cell(1, 6, "a.1")
+    for row in range(2, rows + 2, 3):
+        sheet.cell(row, 4, "text" if row % 2 else pd.Timestamp("2021-06-01 05:00").to_pydatetime())
+        sheet.cell(row, 5, row)
+    book.save(path)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as scratch:
+        path = Path(scratch) / "check.xlsx"
+        make_workbook(path)
+        expected = pd.read_excel(path)
+        actual = read_xlsx(path.read_bytes())
+
+    check("headers mangled like read_excel", list(actual.columns) == list(expected.columns))
+    # datetime resolution follows the pandas version (ns before 3.0), so compare values
+    check("hourly timestamps equal", actual["hourly"].astype(expected["hourly"].dtype).equals(expected["hourly"]))
+    check("hour of day equal", (actual["hourly"].dt.hour == expected["hourly"].dt.hour).all())
+    check("millisecond timestamps equal", actual["stamp"].astype(expected["stamp"].dtype).equals(expected["stamp"]))
+    check("mixed column values equal", actual["a"].equals(expected["a"]))
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    check("whole frame equal", True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Local HTTP stand-in for the news/social endpoints the scrapers hit"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RSS_FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Stand-in news</title>
+<item><title>Apple releases new iPhone</title><link>https://example.com/1</link>
+<pubDate>Fri, 15 Sep 2023 10:00:00 GMT</pubDate><source>Example News</source></item>
+<item><title>Apple services revenue grows</title><link>https://example.com/2</link>
+<pubDate>Sat, 16 Sep 2023 10:00:00 GMT</pubDate><source>Example News</source></item>
+</channel></rss>"""
+FEED_ETAG = '"feed-v1"'
+LAST_MODIFIED = "Fri, 15 Sep 2023 10:00:00 GMT"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        self.server.hits[path] = self.server.hits.get(path, 0) + 1
+
+        if path == "/feed.xml":
+            if self.headers.get("If-None-Match") == FEED_ETAG:
+                self.server.not_modified += 1
+                self._send(304, headers={"ETag": FEED_ETAG})
+            else:
+                self._send(200, RSS_FEED, {"Content-Type": "application/rss+xml", "ETag": FEED_ETAG})
+        elif path == "/lastmod.json":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                self.server.not_modified += 1
+                self._send(304)
+            else:
+                body = json.dumps({"data": {"children": []}}).encode()
+                self._send(200, body, {"Content-Type": "application/json", "Last-Modified": LAST_MODIFIED})
+        elif path == "/revalidate.json":
+            # must revalidate at first; the 304 then grants max-age, lower-cased as under HTTP/2
+            if self.headers.get("If-None-Match") == '"r1"':
+                self.server.not_modified += 1
+                self._send(304, headers={"etag": '"r1"', "cache-control": "max-age=60"})
+            else:
+                self._send(200, b'{"revalidate": true}', {"Cache-Control": "no-cache", "ETag": '"r1"'})
+        elif path == "/fresh.json":
+            self._send(200, b'{"fresh": true}', {"Content-Type": "application/json", "Cache-Control": "max-age=60"})
+        elif path == "/private.json":
+            self._send(200, b'{"private": true}', {"Cache-Control": "no-store", "ETag": '"p1"'})
+        elif path == "/flaky.json":
+            # Fails twice, then succeeds: exercises retry with backoff
+            if self.server.hits[path] <= 2:
+                self._send(503, b"busy")
+            else:
+                self._send(200, b'{"ok": true}', {"Content-Type": "application/json"})
+        elif path == "/slow":
+            time.sleep(self.server.slow_delay)
+            self._send(200, b"late")
+        else:
+            self._send(404, b"not found")
+
+
+def start_standin_server(slow_delay=2.0):
+    """Start the stand-in on a free local port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None  # clients hang up on /slow
+    server.connections = 0
+    server.not_modified = 0
+    server.hits = {}
+    server.slow_delay = slow_delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
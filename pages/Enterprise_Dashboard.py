@@ -5,6 +5,8 @@ import json
 from datetime import datetime
 from utils.gpt_scraper import EnterpriseScraper
 from utils.gpt_helpers import run_gpt_prompt
+from utils.dedup import dedup_near_duplicates
+from utils.mention_store import get_mention_store
 
 def show_debug_info(data):
     with st.expander("🛠️ Debug Information"):
@@ -31,14 +33,21 @@ def main():
         ["Quick Scan", "Comprehensive Report"],
         horizontal=True
     )
+    refresh = st.checkbox("Check sources for new mentions", value=True,
+                          help="Off: analyze stored mentions without scraping again")
     
     if st.button("🔍 Analyze Company"):
         with st.spinner(f"Analyzing {company}..."):
             try:
                 scraper = EnterpriseScraper()
+                store = get_mention_store()
                 
-                # Data collection
-                data = scraper.scrape_enterprise_data(company)
+                # Data collection: scrape only what is new, then read everything stored,
+                # collapsing near-duplicates stored on different runs
+                if refresh:
+                    new_data = scraper.scrape_enterprise_data(company, store=store)
+                    st.caption(f"{len(new_data)} new mentions since the last run")
+                data = dedup_near_duplicates(store.mentions(company), 'content')
                 if not data:
                     st.error("""
                     No data found. This could be because:
@@ -86,6 +95,9 @@ def main():
                         for weakness in analysis['top_weaknesses']:
                             st.markdown(f"- {weakness}")
                 
+                with st.expander("📈 Stored Mention Statistics"):
+                    st.dataframe(store.stats(company).to_frame())
+                
                 # Debug info
                 show_debug_info(data)
                 
@@ -2,10 +2,11 @@
 import streamlit as st
 import pandas as pd
 import json
-from utils.gpt_helpers import run_gpt_prompt
+from utils.gpt_helpers import stream_module_prompt
 from utils.visualizers import plot_bar_chart
 from utils.stats_helpers import summarize_dataframe
 from utils.export_helpers import export_csv, export_pdf
+from utils.upload_widgets import load_upload_with_options
 
 st.set_page_config(layout="wide")
 st.title("🎯 SAMI Category & Target AI")
@@ -40,12 +41,7 @@ if prompt.get("prompt_suggestions"):
 # Process file
 if uploaded_file:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith(".txt"):
-            df = pd.read_csv(uploaded_file, delimiter="\t")
+        df = load_upload_with_options(uploaded_file)
         st.success(f"Loaded: {uploaded_file.name}")
         st.dataframe(df.head())
     except Exception as e:
@@ -55,9 +51,8 @@ if uploaded_file:
 if st.button("Run Analysis"):
     if st.session_state.prompt_input:
         user_prompt = st.session_state.prompt_input
-        result = run_gpt(prompt, user_prompt)
         st.markdown("### 🔍 GPT Response")
-        st.write(result)
+        result = st.write_stream(stream_module_prompt(prompt, user_prompt, df))
 
         if df is not None:
             st.markdown("### 📊 Data Summary")
@@ -1,6 +1,11 @@
 import streamlit as st
+import pandas as pd
+from typing import Dict
+from datetime import datetime
 from utils.sami_integration import SAMIAnalyzer
-from utils.Web_Scraper import hybrid_scrape  # From previous implementation
+from utils.dedup import dedup_near_duplicates
+from utils.mention_store import get_mention_store
+from pages.enterprise_scraper import hybrid_scrape
 import json
 
 def display_sami_report(report: Dict):
@@ -53,8 +58,11 @@ def main():
     if st.button("✨ Generate SAMI Report"):
         with st.spinner("Conducting deep reputation analysis..."):
             try:
-                # Step 1: Data Collection
-                data = hybrid_scrape(company)
+                # Step 1: Data Collection (new mentions only, then the full stored history,
+                # collapsing near-duplicates stored on different runs)
+                store = get_mention_store()
+                hybrid_scrape(company, store=store)
+                data = dedup_near_duplicates(store.mentions(company), 'content')
                 
                 # Step 2: SAMI Analysis
                 analyzer = SAMIAnalyzer()
@@ -2,10 +2,13 @@
 import streamlit as st
 import pandas as pd
 import json
-from utils.gpt_helpers import run_gpt_prompt
+from utils.gpt_helpers import describe_data, stream_module_prompt
 from utils.visualizers import plot_bar_chart
 from utils.stats_helpers import summarize_dataframe
 from utils.export_helpers import export_csv, export_pdf
+from utils.upload_widgets import load_upload_with_options, upload_key
+from utils.summary_widgets import segment_summary_section
+from utils.drivers import driver_importance, guess_target
 
 st.set_page_config(layout="wide")
 st.title("🔑 SAMI Drivers AI")
@@ -14,6 +17,7 @@ st.write("Upload a dataset or enter a prompt to get started.")
 # Upload
 uploaded_file = st.file_uploader("Upload file (CSV, XLSX, or TXT)", type=["csv", "xlsx", "txt"])
 df = None
+driver_analysis = None
 
 # Load prompt template
 with open("prompts/SAMI_Drivers_AI_Finalized.json", "r") as f:
@@ -40,24 +44,47 @@ if prompt.get("prompt_suggestions"):
 # Process file
 if uploaded_file:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith(".txt"):
-            df = pd.read_csv(uploaded_file, delimiter="\t")
+        df = load_upload_with_options(uploaded_file)
         st.success(f"Loaded: {uploaded_file.name}")
         st.dataframe(df.head())
+        segment_summary_section(df)
     except Exception as e:
         st.error(f"Error reading file: {e}")
 
+# Driver importance: computed locally, then handed to GPT as ranked context
+if df is not None:
+    numeric_cols = list(df.select_dtypes(include='number').columns)
+    if len(numeric_cols) > 1:
+        st.markdown("### 🔑 Driver Importance")
+        guess = guess_target(numeric_cols)
+        target = st.selectbox("Outcome to explain (e.g. NPS, overall satisfaction):", numeric_cols,
+                              index=numeric_cols.index(guess) if guess else 0)
+        candidates = [c for c in numeric_cols if c != target]
+        drivers = st.multiselect("Candidate drivers (all other numeric columns if none selected):", candidates) or candidates
+        driver_key = upload_key(uploaded_file, df) + (target, tuple(drivers))
+        try:
+            if st.session_state.get("driver_key") != driver_key:
+                with st.spinner("Computing driver importance..."):
+                    st.session_state["driver_analysis"] = driver_importance(df, target, drivers)
+                st.session_state["driver_key"] = driver_key
+            driver_analysis = st.session_state["driver_analysis"]
+            st.caption(f"{driver_analysis.rows:,} complete responses ({driver_analysis.dropped:,} with missing values "
+                       f"left out) · R² = {driver_analysis.r_squared:.3f}")
+            st.dataframe(driver_analysis.table)
+            export_csv(driver_analysis.table, "driver_importance.csv")
+        except ValueError as e:
+            st.session_state.pop("driver_key", None)
+            st.warning(str(e))
+
 # GPT + chart + exports
 if st.button("Run Analysis"):
     if st.session_state.prompt_input:
         user_prompt = st.session_state.prompt_input
-        result = run_gpt(prompt, user_prompt)
         st.markdown("### 🔍 GPT Response")
-        st.write(result)
+        context = df
+        if df is not None and driver_analysis is not None:
+            context = describe_data(df) + "\n\n" + driver_analysis.prompt_context()
+        result = st.write_stream(stream_module_prompt(prompt, user_prompt, context))
 
         if df is not None:
             st.markdown("### 📊 Data Summary")
@@ -65,7 +92,10 @@ if st.button("Run Analysis"):
             st.dataframe(summary_df)
 
             num_cols = df.select_dtypes(include='number').columns
-            if len(num_cols) > 0:
+            if driver_analysis is not None:
+                plot_bar_chart(driver_analysis.table.head(15), x="driver", y="share",
+                               title=f"Share of explained variance in {driver_analysis.target} (%)")
+            elif len(num_cols) > 0:
                 x_col = df.columns[0]
                 y_col = num_cols[0]
                 plot_bar_chart(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
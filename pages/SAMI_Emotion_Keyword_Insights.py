@@ -2,69 +2,112 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from collections import Counter
-import re
+import io
+
+from utils.emotion_lexicon import get_emotion_lexicon
+from utils.export_helpers import export_csv
+from utils.ingest import STREAMABLE_TYPES, format_bytes, iter_upload_chunks, upload_columns
+from utils.lexicon import available_stopword_lists, get_stopwords, read_wordlist
+from utils.parallel_text import MAX_WORKERS, PARALLEL_MIN_ROWS, analyze_chunks, analyze_text
+from utils.segment_breakdown import annotate_feedback, emotion_breakdown, keyword_breakdown, segment_columns
+from utils.upload_widgets import load_upload_with_options
 
 st.set_page_config(layout="wide")
 st.title("🧠 Emotion & Keyword Insight Module")
 
 uploaded_file = st.file_uploader("Upload your feedback file (CSV, XLSX, or TXT)", type=["csv", "xlsx", "txt"])
 
-def extract_keywords(texts):
-    text_blob = " ".join(texts).lower()
-    words = re.findall(r"\b[a-zA-Z]{4,}\b", text_blob)
-    stopwords = set(pd.read_csv("https://raw.githubusercontent.com/stopwords-iso/stopwords-en/master/stopwords-en.txt", header=None)[0])
-    keywords = [word for word in words if word not in stopwords]
-    return Counter(keywords).most_common(20)
-
-def infer_emotion(text):
-    # Very simplified keyword-based detection
-    joy_words = ["happy", "delight", "love", "great"]
-    anger_words = ["angry", "frustrated", "bad", "hate"]
-    sadness_words = ["sad", "disappointed", "upset", "cry"]
-    trust_words = ["trust", "confident", "secure"]
-    
-    scores = {"Joy": 0, "Anger": 0, "Sadness": 0, "Trust": 0}
-    text = text.lower()
-    for word in joy_words:
-        if word in text:
-            scores["Joy"] += 1
-    for word in anger_words:
-        if word in text:
-            scores["Anger"] += 1
-    for word in sadness_words:
-        if word in text:
-            scores["Sadness"] += 1
-    for word in trust_words:
-        if word in text:
-            scores["Trust"] += 1
-    return scores
+with st.expander("Stopwords"):
+    languages = st.multiselect("Stopword languages", available_stopword_lists(), default=["en"])
+    custom_text = st.text_area("Extra stopwords (one per line)", "")
+    custom_file = st.file_uploader("Or upload a stopword list (.txt, one word per line)", type=["txt"], key="stopword_file")
+
+custom_words = read_wordlist(custom_text.splitlines())
+if custom_file is not None:
+    custom_words |= read_wordlist(custom_file)
+stopwords = get_stopwords(*languages, extra=custom_words) if languages else custom_words
+
+NGRAM_OPTIONS = {"Words": (1, 1), "Words + bigrams": (1, 2), "Words + bigrams + trigrams": (1, 3)}
+
+with st.expander("Emotion lexicon"):
+    lexicon_file = st.file_uploader("Custom emotion lexicon (CSV with term, emotion, weight columns)",
+                                    type=["csv"], key="emotion_lexicon")
+    st.caption("Defaults to the bundled Plutchik lexicon (joy, trust, fear, surprise, sadness, disgust, anger, anticipation).")
+
+@st.cache_resource(show_spinner=False)
+def load_lexicon(content: bytes = None):
+    return get_emotion_lexicon(io.BytesIO(content) if content else None)
+
+lexicon = load_lexicon(lexicon_file.getvalue() if lexicon_file is not None else None)
 
 if uploaded_file:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith(".txt"):
-            df = pd.read_csv(uploaded_file, delimiter="\t")
-        st.success("File loaded!")
+        # Streaming reads CSV/TXT in compact chunks and never holds the whole file as a frame
+        streaming = uploaded_file.name.lower().endswith(STREAMABLE_TYPES) and st.checkbox(
+            "Stream the file in chunks (very large CSV/TXT: low memory, totals only)")
+        if streaming:
+            columns = upload_columns(uploaded_file, uploaded_file.name)
+        else:
+            df = load_upload_with_options(uploaded_file)
+            st.success("File loaded!")
+            columns = list(df.columns)
+
+        text_col = st.selectbox("Select the column with open-ended feedback:", columns)
+
+        ngram_label = st.selectbox("Keyword terms:", list(NGRAM_OPTIONS))
+        segment_col = st.selectbox("Compare keywords across segment (optional):",
+                                   ["(none)"] + [c for c in columns if c != text_col])
+        segmented = segment_col != "(none)"
+        per_row = False
+        if not streaming:
+            workers = st.slider("Worker processes", 1, MAX_WORKERS, MAX_WORKERS,
+                                help=f"Files under {PARALLEL_MIN_ROWS:,} rows are analyzed in-process.") \
+                if MAX_WORKERS > 1 else 1
+            per_row = st.checkbox("Per-response analysis (attach emotion and keyword columns, segment breakdowns)")
 
-        text_col = st.selectbox("Select the column with open-ended feedback:", df.columns)
+        # Reuse the analysis across reruns (e.g. changing a breakdown column)
+        analysis_key = (uploaded_file.name, uploaded_file.size, streaming, text_col, segment_col, ngram_label,
+                        per_row, hash(stopwords), id(lexicon))
+        if st.session_state.get("emotion_keyword_key") != analysis_key:
+            if streaming:
+                progress = st.progress(0.0, text="Streaming file...")
+
+                def report(p):
+                    progress.progress(p.fraction, text=f"{p.rows:,} rows read · chunk {format_bytes(p.chunk_bytes)}"
+                                                       f" · process memory {format_bytes(p.memory_bytes)}")
+
+                chunks = iter_upload_chunks(uploaded_file, uploaded_file.name, keep=[text_col], progress=report)
+                st.session_state["emotion_keyword_analytics"] = analyze_chunks(
+                    chunks, text_col, segment_col if segmented else None, stopwords, NGRAM_OPTIONS[ngram_label],
+                    lexicon=lexicon)
+                progress.empty()
+            else:
+                with st.spinner("Analyzing feedback..."):
+                    st.session_state["emotion_keyword_analytics"] = analyze_text(
+                        df[text_col], df[segment_col] if segmented else None, stopwords, NGRAM_OPTIONS[ngram_label],
+                        lexicon=lexicon, workers=workers, row_keywords=per_row)
+            st.session_state["emotion_keyword_key"] = analysis_key
+        analytics = st.session_state["emotion_keyword_analytics"]
+        counter = analytics.keywords
+
+        if streaming:
+            st.success(f"Streamed {analytics.rows:,} rows.")
+            if not analytics.summary.empty:
+                st.markdown("### 🔢 Numeric Summary")
+                st.dataframe(analytics.summary)
 
         # Keyword clustering
-        keywords = extract_keywords(df[text_col].astype(str))
-        kw_df = pd.DataFrame(keywords, columns=["Keyword", "Frequency"])
+        kw_df = pd.DataFrame(counter.most_common(20), columns=["Keyword", "Frequency"])
         st.markdown("### 📌 Top Keywords")
         st.dataframe(kw_df)
         st.bar_chart(kw_df.set_index("Keyword"))
 
+        if segmented:
+            st.markdown(f"### 🧭 Distinctive Keywords by {segment_col} (TF-IDF)")
+            st.dataframe(counter.tfidf(top_n=10))
+
         # Emotion overlay
-        emotion_totals = {"Joy": 0, "Anger": 0, "Sadness": 0, "Trust": 0}
-        for feedback in df[text_col].dropna():
-            scores = infer_emotion(feedback)
-            for emo in emotion_totals:
-                emotion_totals[emo] += scores[emo]
+        emotion_totals = analytics.emotion_totals()
 
         emo_df = pd.DataFrame.from_dict(emotion_totals, orient="index", columns=["Count"]).reset_index()
         emo_df.columns = ["Emotion", "Count"]
@@ -72,6 +115,25 @@ if uploaded_file:
         fig = px.pie(emo_df, values="Count", names="Emotion", title="🎨 Emotion Profile")
         st.plotly_chart(fig)
 
+        if per_row:
+            annotated = annotate_feedback(df, analytics)
+            st.markdown("### 🧾 Emotions & Keywords per Response")
+            st.dataframe(annotated.head(500))
+            export_csv(annotated, "feedback_emotions_keywords.csv")
+
+            breakdown_cols = st.multiselect("Break down by segment:", segment_columns(df, exclude=[text_col]))
+            if breakdown_cols:
+                breakdown = emotion_breakdown(annotated, breakdown_cols, analytics.emotion_names)
+                st.markdown(f"### 🗂️ Emotions by {' × '.join(breakdown_cols)}")
+                st.dataframe(breakdown)
+                export_csv(breakdown, "emotion_breakdown.csv")
+
+                for col in breakdown_cols:
+                    st.markdown(f"#### Top keywords by {col}")
+                    keywords_by_segment = keyword_breakdown(annotated, col)
+                    st.dataframe(keywords_by_segment)
+                    export_csv(keywords_by_segment, f"keywords_by_{col}.csv")
+
     except Exception as e:
         st.error(f"Failed to read file: {e}")
 else:
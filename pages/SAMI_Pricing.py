@@ -2,9 +2,14 @@
 import streamlit as st
 import pandas as pd
 import json
-from utils.gpt_helpers import run_gpt_prompt
+from utils.gpt_helpers import describe_data, stream_module_prompt
+from utils.visualizers import plot_bar_chart, plot_line_chart
 from utils.stats_helpers import summarize_dataframe
 from utils.export_helpers import export_csv, export_pdf
+from utils.upload_widgets import load_upload_with_options
+from utils.summary_widgets import segment_summary_section
+from utils.pricing import (VW_LABELS, VW_QUESTIONS, column_price, detect_gabor_granger, detect_van_westendorp,
+                           format_price, gabor_granger, van_westendorp)
 
 st.set_page_config(layout="wide")
 st.title("💰 SAMI Pricing AI")
@@ -13,6 +18,8 @@ st.write("Upload a dataset or enter a prompt to get started.")
 # Upload
 uploaded_file = st.file_uploader("Upload file (CSV, XLSX, or TXT)", type=["csv", "xlsx", "txt"])
 df = None
+vw_result = None
+gg_result = None
 
 # Load prompt template
 with open("prompts/SAMI_Pricing_AI_Finalized.json", "r") as f:
@@ -39,24 +46,78 @@ if prompt.get("prompt_suggestions"):
 # Process file
 if uploaded_file:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith(".txt"):
-            df = pd.read_csv(uploaded_file, delimiter="\t")
+        df = load_upload_with_options(uploaded_file)
         st.success(f"Loaded: {uploaded_file.name}")
         st.dataframe(df.head())
+        segment_summary_section(df)
     except Exception as e:
         st.error(f"Error reading file: {e}")
 
+# Price sensitivity: computed locally, plotted, and handed to GPT as price ranges
+if df is not None:
+    st.markdown("### 💰 Price Sensitivity")
+    columns = list(df.columns)
+    none = "(none)"
+    detected = detect_van_westendorp(columns)
+    with st.expander("Van Westendorp questions", expanded=bool(detected)):
+        vw_cols = {q: st.selectbox(f"{VW_LABELS[q]} price:", [none] + columns, key=f"vw_{q}",
+                                   index=columns.index(detected[q]) + 1 if detected else 0) for q in VW_QUESTIONS}
+        consistent_only = st.checkbox("Leave out inconsistent answers (too cheap ≤ cheap ≤ expensive ≤ too expensive)",
+                                      value=True)
+    gg_detected = detect_gabor_granger(columns)
+    with st.expander("Gabor-Granger questions", expanded=bool(gg_detected)):
+        gg_cols = st.multiselect("Purchase-intent column per tested price (price read from the column name):",
+                                 columns, default=list(gg_detected))
+        gg_price_col = st.selectbox("...or the price each respondent was shown:", [none] + columns)
+        gg_response_col = st.selectbox("...and their purchase answer:", [none] + columns)
+
+    try:
+        if none not in vw_cols.values():
+            vw_result = van_westendorp(df, vw_cols, consistent_only)
+            points = vw_result.points
+            st.markdown("#### Van Westendorp")
+            for col, (name, value) in zip(st.columns(4), points.items()):
+                col.metric(name, format_price(value))
+            st.caption(f"Acceptable range {format_price(points['PMC'])}–{format_price(points['PME'])} · {vw_result.respondents:,} respondents"
+                       f" · {vw_result.dropped:,} incomplete and {vw_result.inconsistent:,} inconsistent left out")
+            plot_line_chart(vw_result.curves, x="price", title="Price sensitivity curves", ylabel="Share of respondents",
+                            y={"too_cheap": "Too cheap", "not_cheap": "Not cheap", "not_expensive": "Not expensive",
+                               "too_expensive": "Too expensive"}, markers=points)
+            export_csv(vw_result.curves, "van_westendorp_curves.csv")
+    except ValueError as e:
+        st.warning(str(e))
+
+    try:
+        if gg_price_col != none and gg_response_col != none:
+            gg_result = gabor_granger(df, price_col=gg_price_col, response_col=gg_response_col)
+        elif gg_cols:
+            prices = {c: column_price(c) for c in gg_cols}
+            missing = [c for c, price in prices.items() if price is None]
+            if missing:
+                st.warning(f"No price found in the name of: {', '.join(map(str, missing))}")
+            gg_result = gabor_granger(df, {c: price for c, price in prices.items() if price is not None})
+        if gg_result is not None:
+            st.markdown("#### Gabor-Granger")
+            st.caption(f"Revenue-maximising price ≈ {gg_result.optimal_price:,.2f} · {gg_result.respondents:,} respondents")
+            st.dataframe(gg_result.table)
+            plot_line_chart(gg_result.curve, x="price", y={"demand": "Demand (share who would buy)"},
+                            title="Demand curve", markers={"Max revenue": gg_result.optimal_price})
+            plot_line_chart(gg_result.curve, x="price", y={"revenue_index": "Revenue index (price × demand)"},
+                            title="Revenue curve", markers={"Max revenue": gg_result.optimal_price})
+            export_csv(gg_result.table, "gabor_granger.csv")
+    except ValueError as e:
+        st.warning(str(e))
+
 # GPT + chart + exports
 if st.button("Run Analysis"):
     if st.session_state.prompt_input:
         user_prompt = st.session_state.prompt_input
-        result = run_gpt(prompt, user_prompt)
         st.markdown("### 🔍 GPT Response")
-        st.write(result)
+        context = df
+        pricing_context = [r.prompt_context() for r in (vw_result, gg_result) if r is not None]
+        if df is not None and pricing_context:
+            context = "\n\n".join([describe_data(df)] + pricing_context)
+        result = st.write_stream(stream_module_prompt(prompt, user_prompt, context))
 
         if df is not None:
             st.markdown("### 📊 Data Summary")
@@ -64,7 +125,12 @@ if st.button("Run Analysis"):
             st.dataframe(summary_df)
 
             num_cols = df.select_dtypes(include='number').columns
-            if len(num_cols) > 0:
+            if vw_result is not None:
+                points = pd.DataFrame({"point": list(vw_result.points), "price": list(vw_result.points.values())}).dropna()
+                plot_bar_chart(points, x="point", y="price", title="Van Westendorp price points")
+            elif gg_result is not None:
+                plot_bar_chart(gg_result.table, x="price", y="revenue_index", title="Revenue index by tested price")
+            elif len(num_cols) > 0:
                 x_col = df.columns[0]
                 y_col = num_cols[0]
                 plot_bar_chart(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
@@ -0,0 +1,43 @@
+import streamlit as st
+import pandas as pd
+from utils.gpt_batch import run_all_modules
+from utils.export_helpers import export_csv
+from utils.upload_widgets import load_upload_with_options
+
+st.set_page_config(layout="wide")
+st.title("🚀 SAMI Run All Modules")
+st.write("Run one prompt and dataset through every SAMI module at once.")
+
+# Upload
+uploaded_file = st.file_uploader("Upload file (CSV, XLSX, or TXT)", type=["csv", "xlsx", "txt"])
+df = None
+
+if "prompt_input" not in st.session_state:
+    st.session_state.prompt_input = ""
+
+st.text_area("Enter your prompt here:", key="prompt_input", height=200)
+
+# Process file
+if uploaded_file:
+    try:
+        df = load_upload_with_options(uploaded_file)
+        st.success(f"Loaded: {uploaded_file.name}")
+        st.dataframe(df.head())
+    except Exception as e:
+        st.error(f"Error reading file: {e}")
+
+if st.button("Run All Modules"):
+    if st.session_state.prompt_input:
+        with st.spinner("Running every module in parallel..."):
+            results = run_all_modules(st.session_state.prompt_input, df)
+
+        for item in results:
+            with st.expander(f"{item['name']} ({item['elapsed']:.1f}s)"):
+                if item["error"]:
+                    st.error(f"Analysis failed: {item['error']}")
+                else:
+                    st.write(item["result"])
+
+        export_csv(pd.DataFrame(results), "all_modules.csv")
+    else:
+        st.warning("Please enter a prompt.")
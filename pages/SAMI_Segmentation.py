@@ -2,10 +2,13 @@
 import streamlit as st
 import pandas as pd
 import json
-from utils.gpt_helpers import run_gpt_prompt
+from utils.gpt_helpers import stream_module_prompt
 from utils.visualizers import plot_bar_chart
 from utils.stats_helpers import summarize_dataframe
 from utils.export_helpers import export_csv, export_pdf
+from utils.upload_widgets import load_upload_with_options, upload_key
+from utils.summary_widgets import segment_summary_section
+from utils.segmentation import K_RANGE, default_columns, segment
 
 st.set_page_config(layout="wide")
 st.title("🔍 SAMI Segmentation AI")
@@ -14,6 +17,7 @@ st.write("Upload a dataset or enter a prompt to get started.")
 # Upload
 uploaded_file = st.file_uploader("Upload file (CSV, XLSX, or TXT)", type=["csv", "xlsx", "txt"])
 df = None
+segmentation = None
 
 # Load prompt template
 with open("prompts/SAMI_Segmentation_AI_Finalized.json", "r") as f:
@@ -40,24 +44,50 @@ if prompt.get("prompt_suggestions"):
 # Process file
 if uploaded_file:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        elif uploaded_file.name.endswith(".xlsx"):
-            df = pd.read_excel(uploaded_file)
-        elif uploaded_file.name.endswith(".txt"):
-            df = pd.read_csv(uploaded_file, delimiter="\t")
+        df = load_upload_with_options(uploaded_file)
         st.success(f"Loaded: {uploaded_file.name}")
         st.dataframe(df.head())
+        segment_summary_section(df)
     except Exception as e:
         st.error(f"Error reading file: {e}")
 
+# Segments: clustered locally; only the compact profiles are sent to GPT
+if df is not None:
+    st.markdown("### 🧩 Segments")
+    data_key = upload_key(uploaded_file, df)
+    if st.session_state.get("segment_columns_key") != data_key:
+        st.session_state["segment_columns"] = default_columns(df)
+        st.session_state["segment_columns_key"] = data_key
+    candidates = [c for c in st.session_state["segment_columns"] if c in df.columns]
+    seg_cols = st.multiselect("Cluster on (numeric and low-cardinality columns):", list(df.columns), default=candidates)
+    auto_label = f"Auto (best silhouette, {K_RANGE[0]}–{K_RANGE[1]})"
+    k_choice = st.selectbox("Number of segments:", [auto_label] + list(range(2, 13)))
+    k = None if k_choice == auto_label else k_choice
+    segmentation_key = data_key + (tuple(seg_cols), k)
+    try:
+        if seg_cols and st.session_state.get("segmentation_key") != segmentation_key:
+            progress = st.progress(0.0, text="Fitting segments...")
+            st.session_state["segmentation"] = segment(
+                df, seg_cols, k, progress=lambda fraction, text: progress.progress(fraction, text=text))
+            st.session_state["segmentation_key"] = segmentation_key
+            progress.empty()
+        if seg_cols:
+            segmentation = st.session_state["segmentation"]
+            scores = ", ".join(f"k={c}: {v:.2f}" for c, v in segmentation.silhouette.items())
+            st.caption(f"{segmentation.k} segments · sampled silhouette {scores}")
+            st.dataframe(segmentation.profiles)
+            export_csv(segmentation.profiles, "segment_profiles.csv")
+    except ValueError as e:
+        st.session_state.pop("segmentation_key", None)
+        st.warning(str(e))
+
 # GPT + chart + exports
 if st.button("Run Analysis"):
     if st.session_state.prompt_input:
         user_prompt = st.session_state.prompt_input
-        result = run_gpt(prompt, user_prompt)
         st.markdown("### 🔍 GPT Response")
-        st.write(result)
+        context = segmentation.prompt_context() if segmentation is not None else df
+        result = st.write_stream(stream_module_prompt(prompt, user_prompt, context))
 
         if df is not None:
             st.markdown("### 📊 Data Summary")
@@ -65,7 +95,9 @@ if st.button("Run Analysis"):
             st.dataframe(summary_df)
 
             num_cols = df.select_dtypes(include='number').columns
-            if len(num_cols) > 0:
+            if segmentation is not None:
+                plot_bar_chart(segmentation.profiles, x="segment", y="share", title="Segment size (% of rows)")
+            elif len(num_cols) > 0:
                 x_col = df.columns[0]
                 y_col = num_cols[0]
                 plot_bar_chart(df, x=x_col, y=y_col, title=f"{y_col} by {x_col}")
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
 from utils.web_scraper_helpers import scrape_reddit_cybersecurity as scrape_reddit
-from utils.gpt_helpers import run_gpt_prompt
+from utils.gpt_helpers import stream_gpt_prompt
+from utils.map_reduce import map_reduce_comments
+import json
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -52,11 +54,14 @@ def main():
         if st.button("🤖 Generate Report"):
             df = st.session_state.company_data
             
-            # Prepare prompt
+            # Map-reduce over every comment, then prompt on the merged digest
+            with st.spinner(f"Analyzing {len(df)} comments..."):
+                digest = map_reduce_comments(df['comment'].dropna(), subject=company)
+
             prompt = f"""Analyze {company}'s reputation based on:
             
-            **Comments:**
-            {df['comment'].str.cat(sep='\n- ')[:3000]}
+            **Aggregated analysis of {digest['comments_analyzed']} comments:**
+            {json.dumps(digest)}
             
             **Provide:**
             1. Sentiment score (1-10)
@@ -64,10 +69,8 @@ def main():
             3. Top 3 complaints
             4. 50-word summary"""
             
-            with st.spinner("Analyzing..."):
-                analysis = run_gpt_prompt(prompt)
-                st.markdown("## 📊 Analysis Report")
-                st.write(analysis)
+            st.markdown("## 📊 Analysis Report")
+            analysis = st.write_stream(stream_gpt_prompt(prompt))
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,29 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 import time
-import random
 
-def get_google_news_rss(company_name, max_results=10):
+from utils.dedup import DEFAULT_THRESHOLD, dedup_near_duplicates
+from utils.http_fetch import fetch
+
+# Seconds each source may take before hybrid_scrape stops waiting for it
+SOURCE_DEADLINES = {
+    'get_google_news_rss': 15,
+    'scrape_nitter_twitter': 20,
+    'scrape_reddit_enterprise': 15
+}
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="scrape")
+
+def get_google_news_rss(company_name, max_results=10, since=None):
     """Scrape Google News RSS with enhanced parsing"""
     try:
-        url = f"https://news.google.com/rss/search?q={company_name}+stock&hl=en-US&gl=US&ceid=US:en"
-        response = requests.get(url, timeout=15)
+        query = f"{company_name}+stock"
+        if since is not None:
+            query += f"+after:{since:%Y-%m-%d}"  # only articles past the high-water mark
+        url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+        response = fetch(url, timeout=15)
         soup = BeautifulSoup(response.text, 'xml')
         
         articles = []
@@ -27,7 +41,7 @@ def get_google_news_rss(company_name, max_results=10):
         print(f"Google News RSS failed: {e}")
         return []
 
-def scrape_nitter_twitter(company_name, max_results=10):
+def scrape_nitter_twitter(company_name, max_results=10, since=None):
     """Scrape Twitter via Nitter with retries"""
     try:
         url = f"https://nitter.net/search?q={company_name}&f=tweets"
@@ -36,7 +50,7 @@ def scrape_nitter_twitter(company_name, max_results=10):
             'Accept-Language': 'en-US,en;q=0.5'
         }
         
-        response = requests.get(url, headers=headers, timeout=20)
+        response = fetch(url, headers=headers, timeout=20)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         tweets = []
@@ -46,23 +60,27 @@ def scrape_nitter_twitter(company_name, max_results=10):
                 'source': 'Twitter',
                 'date': datetime.now().strftime('%Y-%m-%d'),
                 'type': 'social',
-                'url': f"https://twitter.com{i/tweet.find_parent('a')['href']}" if tweet.find_parent('a') else ''
+                'url': f"https://twitter.com{tweet.find_parent('a')['href']}" if tweet.find_parent('a') else ''
             })
         return tweets
     except Exception as e:
         print(f"Nitter failed: {e}")
         return []
 
-def scrape_reddit_enterprise(company_name, max_results=10):
+def scrape_reddit_enterprise(company_name, max_results=10, since=None):
     """Scrape Reddit with enhanced error handling"""
     try:
         url = f"https://www.reddit.com/search.json?q={company_name}&limit={max_results}"
+        if since is not None:
+            url += "&sort=new"
         headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=15)
+        response = fetch(url, headers=headers, timeout=15)
         data = response.json()
         
         posts = []
         for post in data['data']['children']:
+            if since is not None and post['data']['created_utc'] <= since.timestamp():
+                continue
             posts.append({
                 'content': post['data']['title'],
                 'source': 'Reddit',
@@ -75,22 +93,70 @@ def scrape_reddit_enterprise(company_name, max_results=10):
         print(f"Reddit failed: {e}")
         return []
 
-def hybrid_scrape(company_name, max_results=15):
-    """Combined scraper with failover logic"""
-    sources = [
-        get_google_news_rss,
-        scrape_nitter_twitter, 
-        scrape_reddit_enterprise
-    ]
-    
-    all_results = []
-    for source in sources:
-        try:
-            results = source(company_name, max_results//len(sources))
-            if results:
-                all_results.extend(results)
-                time.sleep(random.uniform(1, 3))  # Be polite
-        except Exception as e:
-            print(f"Source {source.__name__} failed: {e}")
-    
-    return pd.DataFrame(all_results).drop_duplicates('content')
\ No newline at end of file
+SOURCES = [
+    get_google_news_rss,
+    scrape_nitter_twitter,
+    scrape_reddit_enterprise
+]
+
+def iter_hybrid_scrape(company_name, max_results=15, deadlines=None, since=None):
+    """Run every source concurrently, yielding (source name, results) as each finishes
+
+    Sources that miss their deadline are abandoned and yield nothing.
+    Politeness is enforced per host by host_limiter inside each source.
+    `since` maps source names to high-water marks for incremental scrapes.
+    """
+    deadlines = {**SOURCE_DEADLINES, **(deadlines or {})}
+    since = since or {}
+    per_source = max(max_results // len(SOURCES), 1)
+    start = time.monotonic()
+
+    futures = {
+        _executor.submit(source, company_name, per_source, since=since.get(source.__name__)): source.__name__
+        for source in SOURCES
+    }
+    pending = set(futures)
+    while pending:
+        elapsed = time.monotonic() - start
+        expired = {f for f in pending if elapsed >= deadlines.get(futures[f], 30)}
+        for future in expired:
+            future.cancel()
+            print(f"Source {futures[future]} missed its {deadlines.get(futures[future], 30)}s deadline")
+        pending -= expired
+        if not pending:
+            break
+
+        next_deadline = min(deadlines.get(futures[f], 30) for f in pending) - elapsed
+        done, pending = wait(pending, timeout=next_deadline, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                results = future.result()
+            except Exception as e:
+                print(f"Source {futures[future]} failed: {e}")
+                results = []
+            yield futures[future], results
+
+def hybrid_scrape(company_name, max_results=15, deadlines=None, store=None, dedup_threshold=DEFAULT_THRESHOLD):
+    """Combined scraper: sources run concurrently, wall time tracks the slowest
+
+    Syndicated near-duplicates (Jaccard >= dedup_threshold) are collapsed
+    across all sources first. With a MentionStore, each source only fetches
+    past its high-water mark, the remaining mentions are recorded and only
+    those not seen before are returned.
+    """
+    since = store.high_water_marks(company_name) if store is not None else None
+    sources, all_results = [], []
+    for name, results in iter_hybrid_scrape(company_name, max_results, deadlines, since):
+        sources.append(name)
+        all_results.extend(dict(r, scraper=name) for r in results)
+    all_results = dedup_near_duplicates(all_results, 'content', dedup_threshold)
+
+    if store is not None:
+        all_results = [record for name in sources for record in store.add_mentions(
+            company_name, [r for r in all_results if r['scraper'] == name], source=name)]
+    for record in all_results:
+        del record['scraper']
+
+    if not all_results:
+        return pd.DataFrame(columns=['content', 'source', 'date', 'type', 'url'])
+    return pd.DataFrame(all_results)
\ No newline at end of file
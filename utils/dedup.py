@@ -0,0 +1,155 @@
+import re
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_THRESHOLD = 0.7
+NUM_PERM = 128
+SHINGLE_SIZE = 5          # character shingles; robust to "- Reuters" style suffixes
+BLOCK_DOCS = 20_000       # documents hashed per block, bounds peak memory
+
+_NORMALIZE_RE = re.compile(r"[^\w]+", re.UNICODE)
+# Trailing outlet attribution on syndicated headlines: "... - Reuters", "... | CNBC"
+_OUTLET_SUFFIX_RE = re.compile(r"\s+[-|\u2013\u2014]\s+[^-|\u2013\u2014]{1,40}$")
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _normalize(text) -> str:
+    text = _OUTLET_SUFFIX_RE.sub("", str(text))
+    return _NORMALIZE_RE.sub(" ", text.lower()).strip()
+
+
+def _permutations(num_perm: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def _shingle_hashes(texts: Sequence[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash every k-byte shingle of every text in one vectorized pass.
+
+    Returns (hashes, starts): the shingle hashes of all documents laid end to
+    end, and the offset of each document's first shingle.
+    """
+    encoded = [t.encode("utf-8").ljust(k) for t in texts]  # short texts become one shingle
+    lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    # Polynomial hash of every k-byte window of the concatenated buffer
+    windows = np.lib.stride_tricks.sliding_window_view(buf, k)
+    powers = np.uint64(257) ** np.arange(k - 1, -1, -1, dtype=np.uint64)
+    window_hashes = (windows * powers).sum(axis=1, dtype=np.uint64) * _MIX
+
+    # Keep only windows that lie inside a single document
+    doc_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    counts = lengths - k + 1
+    doc_ids = np.repeat(np.arange(len(encoded)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    hashes = window_hashes[doc_starts[doc_ids] + offsets] >> np.uint64(32)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return hashes, starts
+
+
+def minhash_signatures(texts: Sequence[str], num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE,
+                       seed: int = 1) -> np.ndarray:
+    """MinHash signature matrix (n_texts x num_perm, uint32) of character shingles"""
+    a, b = _permutations(num_perm, seed)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    normalized = [_normalize(t) for t in texts]
+    for lo in range(0, len(normalized), BLOCK_DOCS):
+        hashes, starts = _shingle_hashes(normalized[lo:lo + BLOCK_DOCS], shingle_size)
+        permuted = np.empty_like(hashes)
+        for i in range(num_perm):
+            # Multiply-shift hashing: one permutation of the 32-bit shingle space
+            np.multiply(hashes, a[i], out=permuted)
+            np.add(permuted, b[i], out=permuted)
+            np.right_shift(permuted, np.uint64(32), out=permuted)
+            signatures[lo:lo + len(starts), i] = np.minimum.reduceat(permuted, starts)
+    return signatures
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """(bands, rows) whose S-curve crosses 50% closest to the Jaccard threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Smallest member index of each row's connected component"""
+    labels = np.arange(n)
+    while True:
+        previous = labels.copy()
+        low = np.minimum(labels[left], labels[right])
+        np.minimum.at(labels, left, low)
+        np.minimum.at(labels, right, low)
+        labels = labels[labels]  # pointer jumping
+        if np.array_equal(labels, previous):
+            return labels
+
+
+def near_duplicate_labels(texts: Sequence[str], threshold: float = DEFAULT_THRESHOLD,
+                          num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE) -> np.ndarray:
+    """For each text, the index of the first text it near-duplicates (itself if unique).
+
+    Texts are bucketed by LSH bands, each candidate is checked against its
+    bucket's first member by estimated Jaccard similarity, and accepted pairs
+    are merged transitively. Cost is linear in the number of texts.
+    """
+    n = len(texts)
+    if n < 2:
+        return np.arange(n)
+    signatures = minhash_signatures(texts, num_perm, shingle_size)
+    bands, rows = lsh_params(threshold, num_perm)
+
+    lefts, rights = [], []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse = np.unique(keys, return_inverse=True)
+        first = np.full(inverse.max() + 1, n)
+        np.minimum.at(first, inverse, np.arange(n))
+        rep = first[inverse]
+        candidates = np.nonzero(rep != np.arange(n))[0]
+        if len(candidates) == 0:
+            continue
+        similarity = (signatures[candidates] == signatures[rep[candidates]]).mean(axis=1)
+        accepted = candidates[similarity >= threshold]
+        lefts.append(accepted)
+        rights.append(rep[accepted])
+
+    if not lefts:
+        return np.arange(n)
+    return _components(n, np.concatenate(lefts), np.concatenate(rights))
+
+
+def dedup_near_duplicates(data: Union[pd.DataFrame, List[Dict]], column: str = "content",
+                          threshold: float = DEFAULT_THRESHOLD, **options):
+    """Drop near-duplicate mentions, keeping the first of each cluster.
+
+    Works on a DataFrame or a list of dicts and adds a `duplicates` count to
+    each kept row, so syndicated stories still carry their reach.
+    """
+    if isinstance(data, list):
+        # records stay dicts with their own keys (a DataFrame round trip would add NaN for missing ones)
+        if not any(column in record for record in data):
+            return data
+        labels = near_duplicate_labels([str(r.get(column) or "") for r in data], threshold, **options)
+        counts = np.bincount(labels, minlength=len(labels))
+        return [dict(r, duplicates=int(counts[i]) - 1) for i, r in enumerate(data) if labels[i] == i]
+
+    if data.empty or column not in data.columns:
+        return data
+    labels = near_duplicate_labels(data[column].fillna("").astype(str).tolist(), threshold, **options)
+    keep = labels == np.arange(len(labels))
+    result = data[keep].copy()
+    result["duplicates"] = np.bincount(labels, minlength=len(labels))[keep] - 1
+    return result
@@ -0,0 +1,152 @@
+from dataclasses import dataclass
+from itertools import combinations
+from math import factorial
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+DRIVER_BLOCK_ROWS = 65_536  # rows converted to float64 at a time for the cross-product
+SHAPLEY_MAX_DRIVERS = 12  # exact Shapley needs the R² of all 2^p driver subsets
+PROMPT_DRIVERS = 15
+TARGET_HINTS = ("nps", "overall", "satisf", "recommend", "loyal", "likel")
+
+
+@dataclass
+class DriverAnalysis:
+    """Driver importance for one target; `table` has one row per driver, strongest first"""
+    target: str
+    table: pd.DataFrame
+    correlations: pd.DataFrame
+    r_squared: float
+    rows: int
+    dropped: int
+
+    def prompt_context(self, top: int = PROMPT_DRIVERS) -> str:
+        """Ranked drivers as a few compact lines for a GPT prompt"""
+        rated = self.table.dropna(subset=["relative_weight"])
+        lines = [f"Driver analysis of '{self.target}': {self.rows:,} complete responses, "
+                 f"{len(rated)} drivers, R² = {self.r_squared:.3f}. "
+                 f"Top drivers by relative weight (share of explained variance):"]
+        for row in rated.head(top).itertuples(index=False):
+            line = f"{row.rank}. {row.driver}: share {row.share:.1f}%, r {row.correlation:+.2f}, beta {row.beta:+.2f}"
+            if "shapley" in self.table.columns:
+                line += f", Shapley R² {row.shapley:.3f}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def guess_target(columns: Sequence[str]) -> Optional[str]:
+    """First column whose name looks like an outcome (NPS, overall satisfaction, likelihood to recommend)"""
+    for column in columns:
+        if any(hint in str(column).lower() for hint in TARGET_HINTS):
+            return column
+    return None
+
+
+def correlation_matrix(df: pd.DataFrame, columns: Sequence[str],
+                       block_rows: int = DRIVER_BLOCK_ROWS) -> Tuple[np.ndarray, int, int]:
+    """Pearson correlations over the rows complete in every column, with the
+    number of rows used and dropped. One pass: each block of rows is turned
+    into a float64 matrix and added to a running X^T X (shifted by the first
+    block's means to avoid cancellation), so memory stays at one block."""
+    positions = [df.columns.get_loc(c) for c in columns]
+    shift, rows, dropped = None, 0, 0
+    total = np.zeros(len(columns))
+    cross = np.zeros((len(columns), len(columns)))
+    for start in range(0, len(df), block_rows):
+        block = df.iloc[start:start + block_rows, positions].to_numpy(dtype="float64", na_value=np.nan)
+        complete = ~np.isnan(block).any(axis=1)
+        dropped += int((~complete).sum())
+        block = block[complete]
+        if not len(block):
+            continue
+        if shift is None:
+            shift = block.mean(axis=0)
+        block -= shift
+        rows += len(block)
+        total += block.sum(axis=0)
+        cross += block.T @ block
+    if rows < 2:
+        return np.full((len(columns), len(columns)), np.nan), rows, dropped
+    mean = total / rows
+    covariance = cross / rows - np.outer(mean, mean)
+    sd = np.sqrt(np.clip(np.diag(covariance), 0, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = covariance / np.outer(sd, sd)
+    corr[:, sd == 0] = np.nan
+    corr[sd == 0, :] = np.nan
+    np.fill_diagonal(corr, np.where(sd > 0, 1.0, np.nan))
+    return np.clip(corr, -1, 1), rows, dropped
+
+
+def relative_weights(rxx: np.ndarray, rxy: np.ndarray) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Standardized betas, Johnson's relative weights and R² from correlations alone.
+
+    Both come from one eigendecomposition of the driver correlation matrix;
+    near-zero eigenvalues (collinear drivers) are dropped, as in a pseudo-inverse.
+    Relative weights sum to R²."""
+    eigenvalues, vectors = np.linalg.eigh(rxx)
+    keep = eigenvalues > eigenvalues.max() * 1e-10
+    inverse_root = np.where(keep, 1 / np.sqrt(np.where(keep, eigenvalues, 1)), 0)
+    beta = vectors @ ((inverse_root ** 2) * (vectors.T @ rxy))
+    root = (vectors * np.sqrt(np.clip(eigenvalues, 0, None))) @ vectors.T
+    beta_z = vectors @ (inverse_root * (vectors.T @ rxy))
+    weights = (root ** 2) @ (beta_z ** 2)
+    return beta, weights, float(beta @ rxy)
+
+
+def shapley_r2(rxx: np.ndarray, rxy: np.ndarray) -> np.ndarray:
+    """Exact Shapley decomposition of R² (LMG): the R² of every driver subset is
+    solved from the correlation matrix, one batched pinv per subset size"""
+    p = len(rxy)
+    r2 = np.zeros(2 ** p)
+    for size in range(1, p + 1):
+        subsets = np.array(list(combinations(range(p), size)))
+        sub = rxx[subsets[:, :, None], subsets[:, None, :]]
+        r = rxy[subsets]
+        beta = np.einsum("mij,mj->mi", np.linalg.pinv(sub, hermitian=True), r)
+        r2[(1 << subsets).sum(axis=1)] = (beta * r).sum(axis=1)
+    masks = np.arange(2 ** p)
+    sizes = np.array([bin(m).count("1") for m in masks])
+    order_weight = np.array([factorial(s) * factorial(p - s - 1) / factorial(p) for s in range(p)])
+    values = np.empty(p)
+    for j in range(p):
+        without = masks[(masks >> j) & 1 == 0]
+        values[j] = (order_weight[sizes[without]] * (r2[without | (1 << j)] - r2[without])).sum()
+    return values
+
+
+def driver_importance(df: pd.DataFrame, target: str, drivers: Optional[List[str]] = None,
+                      block_rows: int = DRIVER_BLOCK_ROWS, shapley_max: int = SHAPLEY_MAX_DRIVERS) -> DriverAnalysis:
+    """Correlation, standardized regression coefficient, relative weight and
+    (up to `shapley_max` drivers) Shapley R² share of every driver of `target`.
+
+    Rows missing the target or any driver are left out (listwise). Drivers
+    with no variance are reported with empty importance."""
+    if drivers is None:
+        drivers = [c for c in df.select_dtypes(include='number').columns if c != target]
+    drivers = [d for d in drivers if d != target]
+    if not drivers:
+        raise ValueError("Pick at least one numeric driver column")
+    corr, rows, dropped = correlation_matrix(df, [target] + drivers, block_rows)
+    if rows <= len(drivers) + 1 or np.isnan(corr[0, 0]):
+        raise ValueError(f"Not enough complete responses with variance in '{target}' to model {len(drivers)} drivers")
+
+    usable = ~np.isnan(corr[0, 1:])
+    if not usable.any():
+        raise ValueError("None of the selected drivers vary across the complete responses")
+    rxx = corr[1:, 1:][np.ix_(usable, usable)]
+    rxy = corr[0, 1:][usable]
+    beta, weights, r_squared = relative_weights(rxx, rxy)
+
+    table = pd.DataFrame({"driver": drivers, "correlation": corr[0, 1:]})
+    table.loc[usable, "beta"] = beta
+    table.loc[usable, "relative_weight"] = weights
+    table["share"] = table["relative_weight"] / r_squared * 100 if r_squared > 0 else np.nan
+    if usable.sum() <= shapley_max:
+        table.loc[usable, "shapley"] = shapley_r2(rxx, rxy)
+    table = table.sort_values("relative_weight", ascending=False, na_position="last").reset_index(drop=True)
+    table.insert(0, "rank", np.arange(1, len(table) + 1))
+    labels = [target] + drivers
+    return DriverAnalysis(target, table, pd.DataFrame(corr, index=labels, columns=labels), r_squared, rows, dropped)
@@ -0,0 +1,202 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.keywords import iter_chunks, tokenize
+from utils.lexicon import LEXICON_DIR
+
+# Plutchik's eight basic emotions, in wheel order
+EMOTIONS = ["Joy", "Trust", "Fear", "Surprise", "Sadness", "Disgust", "Anger", "Anticipation"]
+DEFAULT_LEXICON_PATH = os.path.join(LEXICON_DIR, "emotions", "plutchik.csv")
+SCORE_CHUNK_ROWS = 100_000
+
+
+def read_emotion_lexicon(source) -> pd.DataFrame:
+    """Lexicon as a (term, emotion, weight) frame.
+
+    `source` is a CSV path or upload with term,emotion[,weight] columns, a
+    DataFrame of the same shape, or a dict {emotion: [terms]} /
+    {emotion: {term: weight}}.
+    """
+    if isinstance(source, dict):
+        rows = []
+        for emotion, terms in source.items():
+            items = terms.items() if isinstance(terms, dict) else ((t, 1.0) for t in terms)
+            rows.extend((term, emotion, weight) for term, weight in items)
+        frame = pd.DataFrame(rows, columns=["term", "emotion", "weight"])
+    elif isinstance(source, pd.DataFrame):
+        frame = source.copy()
+    else:
+        frame = pd.read_csv(source, comment="#")
+    frame.columns = [str(c).strip().lower() for c in frame.columns]
+    if "weight" not in frame.columns:
+        frame["weight"] = 1.0
+    frame = frame.dropna(subset=["term", "emotion"])
+    frame["emotion"] = frame["emotion"].astype(str).str.strip().str.title()
+    frame["weight"] = pd.to_numeric(frame["weight"], errors="coerce").fillna(1.0)
+    return frame[["term", "emotion", "weight"]]
+
+
+class EmotionLexicon:
+    """An emotion lexicon compiled into one Aho-Corasick automaton over words.
+
+    The automaton's alphabet is the lexicon's vocabulary (every other word
+    is one "other" symbol), so terms only ever match whole words and
+    multi-word phrases ("let down", "can't wait") match as sequences. A
+    column is scored by stepping every row through the automaton at once
+    with NumPy, one token position at a time.
+    """
+
+    def __init__(self, lexicon=None, emotions: Sequence[str] = EMOTIONS):
+        frame = read_emotion_lexicon(DEFAULT_LEXICON_PATH if lexicon is None else lexicon)
+        extra = [e for e in dict.fromkeys(frame["emotion"]) if e not in emotions]
+        self.emotions = list(emotions) + extra
+        self.terms = len(frame)
+
+        phrases = tokenize(frame["term"].astype(str)).to_pylist()
+        self._vocab = pa.array(sorted({word for words in phrases for word in words}), type=pa.large_string())
+        symbol = {word: i + 1 for i, word in enumerate(self._vocab.to_pylist())}  # 0 = any other word
+        column = {emotion: i for i, emotion in enumerate(self.emotions)}
+        patterns = [
+            (tuple(symbol[w] for w in words), column[emotion], float(weight))
+            for words, emotion, weight in zip(phrases, frame["emotion"], frame["weight"]) if words
+        ]
+        self._build(patterns, len(symbol) + 1)
+
+    def _build(self, patterns: List[Tuple[Tuple[int, ...], int, float]], alphabet: int):
+        goto: List[Dict[int, int]] = [{}]
+        weights: List[Dict[int, float]] = [{}]
+        for symbols, emotion, weight in patterns:
+            state = 0
+            for sym in symbols:
+                if sym not in goto[state]:
+                    goto.append({})
+                    weights.append({})
+                    goto[state][sym] = len(goto) - 1
+                state = goto[state][sym]
+            weights[state][emotion] = weights[state].get(emotion, 0.0) + weight
+
+        n_states = len(goto)
+        fail = [0] * n_states
+        # Transitions that differ from the root's, inherited along fail links
+        exceptions: List[Dict[int, int]] = [{} for _ in range(n_states)]
+        output = np.zeros((n_states, len(self.emotions)), dtype=np.float32)
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for emotion, weight in weights[state].items():
+                output[state, emotion] += weight
+            output[state] += output[fail[state]]
+            exceptions[state] = {**exceptions[fail[state]], **goto[state]}
+            for sym, child in goto[state].items():
+                target = fail[state]
+                while target and sym not in goto[target]:
+                    target = fail[target]
+                fail[child] = goto[target].get(sym, 0)
+                queue.append(child)
+
+        self.states = n_states
+        self._alphabet = alphabet
+        self._root = np.zeros(alphabet, dtype=np.int32)
+        for sym, child in goto[0].items():
+            self._root[sym] = child
+        keys, targets = [], []
+        for state, table in enumerate(exceptions):
+            for sym, target in table.items():
+                if target != self._root[sym]:
+                    keys.append(state * alphabet + sym)
+                    targets.append(target)
+        order = np.argsort(keys)
+        self._exception_keys = np.asarray(keys, dtype=np.int64)[order]
+        self._exception_targets = np.asarray(targets, dtype=np.int32)[order]
+        self._output = output
+        self._has_output = output.any(axis=1)
+
+    def _step(self, states: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+        nxt = self._root[symbols]
+        if len(self._exception_keys):
+            keys = states.astype(np.int64) * self._alphabet + symbols
+            pos = np.minimum(np.searchsorted(self._exception_keys, keys), len(self._exception_keys) - 1)
+            found = self._exception_keys[pos] == keys
+            nxt[found] = self._exception_targets[pos[found]]
+        return nxt
+
+    def score_chunk(self, texts) -> np.ndarray:
+        """Emotion matrix for one chunk (Series, list or Arrow array)"""
+        lists = tokenize(texts)
+        scores = np.zeros((len(lists), len(self.emotions)), dtype=np.float32)
+        index = pc.index_in(pc.list_flatten(lists), value_set=self._vocab)
+        symbols = pc.fill_null(pc.add(index, 1), 0).to_numpy(zero_copy_only=False).astype(np.int32)
+        rows = pc.list_parent_indices(lists).to_numpy()
+
+        # Words outside the lexicon all send the automaton back to the root,
+        # so only the first of each run of them (and none at a row's start)
+        # needs stepping through
+        previous_known = np.zeros(len(symbols), dtype=bool)
+        previous_known[1:] = (symbols[:-1] != 0) & (rows[1:] == rows[:-1])
+        keep = (symbols != 0) | previous_known
+        symbols, rows = symbols[keep], rows[keep]
+        if not len(symbols):
+            return scores
+        lengths = np.bincount(rows, minlength=len(lists))
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        # Longest rows first, so the rows still active at position k are a
+        # prefix and the automaton state lives in one contiguous array
+        order = np.argsort(-lengths, kind="stable")
+        descending = -lengths[order]
+        starts = starts[order]
+        state = np.zeros(len(order), dtype=np.int32)
+        hit_rows, hit_states = [], []
+        for k in range(int(lengths.max())):
+            active = np.searchsorted(descending, -k, side="left")
+            state[:active] = self._step(state[:active], symbols[starts[:active] + k])
+            hit = np.flatnonzero(self._has_output[state[:active]])
+            hit_rows.append(hit)
+            hit_states.append(state[hit])
+
+        hit_rows = order[np.concatenate(hit_rows)]
+        hit_states = np.concatenate(hit_states)
+        for column in range(len(self.emotions)):
+            scores[:, column] = np.bincount(hit_rows, weights=self._output[hit_states, column], minlength=len(lists))
+        return scores
+
+    def score(self, texts, chunk_size: int = SCORE_CHUNK_ROWS) -> np.ndarray:
+        """Per-row emotion matrix (rows x emotions, float32) of weighted term hits"""
+        chunks = [self.score_chunk(chunk) for chunk in iter_chunks(texts, chunk_size)]
+        if not chunks:
+            return np.zeros((0, len(self.emotions)), dtype=np.float32)
+        return np.concatenate(chunks)
+
+    def score_frame(self, texts, chunk_size: int = SCORE_CHUNK_ROWS) -> pd.DataFrame:
+        index = texts.index if isinstance(texts, pd.Series) else None
+        return pd.DataFrame(self.score(texts, chunk_size), columns=self.emotions, index=index)
+
+    def totals(self, texts, chunk_size: int = SCORE_CHUNK_ROWS) -> Dict[str, float]:
+        """Summed emotion scores over a column, one chunk in memory at a time"""
+        total = np.zeros(len(self.emotions), dtype=np.float64)
+        for chunk in iter_chunks(texts, chunk_size):
+            total += self.score_chunk(chunk).sum(axis=0)
+        return dict(zip(self.emotions, total.tolist()))
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_emotion_lexicon(lexicon: Optional[object] = None) -> EmotionLexicon:
+    """Compile a custom lexicon, or return the shared bundled Plutchik lexicon"""
+    global _default
+    if lexicon is not None:
+        return EmotionLexicon(lexicon)
+    with _default_lock:
+        if _default is None:
+            _default = EmotionLexicon()
+        return _default
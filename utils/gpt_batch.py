@@ -0,0 +1,153 @@
+import asyncio
+import glob
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from utils.gpt_cache import cached_completion_async
+from utils.gpt_client import create_async_client, model_timeout
+from utils.gpt_helpers import build_module_messages, describe_data
+from utils.tokens import count_tokens
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+MODULE_PROMPT_PATTERN = os.path.join("prompts", "*_Finalized.json")
+
+
+@dataclass
+class GPTJob:
+    """One module analysis: a prompt template, the user's prompt and optional data"""
+    template: Dict
+    user_prompt: str
+    data: Any = None  # DataFrame or a pre-rendered description string
+    model: str = DEFAULT_MODEL
+    temperature: float = 0.7
+    name: str = ""
+    completion_tokens: int = 800  # expected reply size, reserved against the TPM budget
+    response_format: Any = None
+    messages: List[Dict] = field(default_factory=list, repr=False)
+
+
+class RateLimiter:
+    """Token bucket for requests-per-minute and tokens-per-minute limits"""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    async def acquire(self, tokens: int):
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                )
+                await asyncio.sleep(wait)
+
+
+class GPTBatchEngine:
+    """Runs many GPT jobs concurrently and returns results in job order"""
+
+    def __init__(self, max_concurrency: int = 16, requests_per_minute: float = 500,
+                 tokens_per_minute: float = 150_000):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+    async def _run_job(self, client, job: GPTJob, semaphore, limiter) -> Dict:
+        prompt_tokens = sum(count_tokens(m["content"], job.model) for m in job.messages)
+        await limiter.acquire(prompt_tokens + job.completion_tokens)
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await cached_completion_async(
+                    client.with_options(timeout=model_timeout(job.model)),
+                    model=job.model,
+                    messages=job.messages,
+                    temperature=job.temperature,
+                    response_format=job.response_format,
+                )
+                error = None
+            except Exception as e:
+                result, error = None, str(e)
+            return {
+                "name": job.name,
+                "result": result,
+                "error": error,
+                "elapsed": time.perf_counter() - start,
+            }
+
+    async def run_async(self, jobs: List[GPTJob]) -> List[Dict]:
+        # Render each distinct dataset once, however many modules share it
+        rendered = {}
+        for job in jobs:
+            if job.data is not None and not isinstance(job.data, str):
+                if id(job.data) not in rendered:
+                    rendered[id(job.data)] = describe_data(job.data)
+                job.data = rendered[id(job.data)]
+            if not job.messages:
+                job.messages = build_module_messages(job.template, job.user_prompt, job.data, job.model)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+        client = create_async_client()
+        try:
+            # gather keeps results in the order jobs were submitted
+            return await asyncio.gather(*(self._run_job(client, job, semaphore, limiter) for job in jobs))
+        finally:
+            await client.close()
+
+    def run(self, jobs: List[GPTJob]) -> List[Dict]:
+        """Blocking entry point, safe to call from a Streamlit script"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async(jobs))
+
+        # Already inside an event loop (e.g. a notebook): run on a helper thread
+        results = []
+        worker = threading.Thread(target=lambda: results.append(asyncio.run(self.run_async(jobs))))
+        worker.start()
+        worker.join()
+        return results[0]
+
+
+def load_module_templates(pattern: str = MODULE_PROMPT_PATTERN) -> Dict[str, Dict]:
+    """All module prompt templates keyed by module name"""
+    templates = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r") as f:
+            template = json.load(f)
+        templates[template.get("name") or os.path.basename(path)] = template
+    return templates
+
+
+def run_all_modules(user_prompt: str, data=None, model: str = DEFAULT_MODEL,
+                    pattern: str = MODULE_PROMPT_PATTERN, **engine_options) -> List[Dict]:
+    """Fan one prompt and upload out across every module prompt template"""
+    if data is not None and not isinstance(data, str):
+        data = describe_data(data)
+    jobs = [
+        GPTJob(template=template, user_prompt=user_prompt, data=data, model=model, name=name)
+        for name, template in load_module_templates(pattern).items()
+    ]
+    return GPTBatchEngine(**engine_options).run(jobs)
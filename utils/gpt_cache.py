@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+CACHE_PATH = os.getenv("SAMI_GPT_CACHE_PATH", os.path.join(".sami_cache", "gpt_responses.sqlite"))
+CACHE_TTL = float(os.getenv("SAMI_GPT_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.getenv("SAMI_GPT_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+CACHE_ENABLED = os.getenv("SAMI_GPT_CACHE", "1") != "0"
+
+
+def make_key(model: str, messages: List[Dict], temperature=None, response_format=None) -> str:
+    """Content hash of everything that determines a completion"""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature,
+         "response_format": response_format},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed completion cache with TTL, a byte cap and LRU eviction"""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created = row
+            if now - created > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        """Drop expired rows, then least recently used rows until under the cap"""
+        cur = self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+        self.evictions += max(cur.rowcount, 0)
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed ASC"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    """Process-wide response cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+
+def _request_params(model, messages, temperature, response_format) -> Dict:
+    params = {"model": model, "messages": messages}
+    if temperature is not None:
+        params["temperature"] = temperature
+    if response_format is not None:
+        params["response_format"] = response_format
+    return params
+
+
+def cached_completion(client, model: str, messages: List[Dict], temperature=None,
+                      response_format=None) -> str:
+    """Return the completion text for a request, serving repeats from the cache"""
+    key = make_key(model, messages, temperature, response_format)
+    cache = get_cache() if CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = client.chat.completions.create(**_request_params(model, messages, temperature, response_format))
+    content = response.choices[0].message.content
+
+    if cache is not None and content is not None:
+        cache.set(key, content)
+    return content
+
+
+async def cached_completion_async(client, model: str, messages: List[Dict], temperature=None,
+                                  response_format=None) -> str:
+    """Async variant of cached_completion for an AsyncOpenAI client"""
+    key = make_key(model, messages, temperature, response_format)
+    cache = get_cache() if CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    response = await client.chat.completions.create(**_request_params(model, messages, temperature, response_format))
+    content = response.choices[0].message.content
+
+    if cache is not None and content is not None:
+        cache.set(key, content)
+    return content
@@ -0,0 +1,111 @@
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+import openai
+
+# Pool settings, overridable from the environment
+MAX_CONNECTIONS = int(os.getenv("SAMI_OPENAI_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SAMI_OPENAI_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("SAMI_OPENAI_KEEPALIVE_EXPIRY", "90"))
+CONNECT_TIMEOUT = float(os.getenv("SAMI_OPENAI_CONNECT_TIMEOUT", "10"))
+DEFAULT_TIMEOUT = float(os.getenv("SAMI_OPENAI_TIMEOUT", "60"))
+
+# Read timeouts per model; larger models take longer to finish a report
+MODEL_TIMEOUTS: Dict[str, float] = {
+    "gpt-3.5-turbo": 60.0,
+    "gpt-4-turbo": 120.0,
+    "gpt-4": 120.0,
+    "gpt-4o": 90.0,
+    "gpt-4o-mini": 60.0,
+}
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[Optional[str], Optional[str]], openai.OpenAI] = {}
+
+
+def configure_pool(max_connections=None, max_keepalive_connections=None,
+                   keepalive_expiry=None, model_timeouts=None):
+    """Change pool limits or model timeouts; existing clients are closed"""
+    global MAX_CONNECTIONS, MAX_KEEPALIVE_CONNECTIONS, KEEPALIVE_EXPIRY
+    if max_connections is not None:
+        MAX_CONNECTIONS = max_connections
+    if max_keepalive_connections is not None:
+        MAX_KEEPALIVE_CONNECTIONS = max_keepalive_connections
+    if keepalive_expiry is not None:
+        KEEPALIVE_EXPIRY = keepalive_expiry
+    if model_timeouts:
+        MODEL_TIMEOUTS.update(model_timeouts)
+    close_clients()
+
+
+def model_timeout(model: Optional[str]) -> httpx.Timeout:
+    """Timeout for a model, falling back to the default read timeout"""
+    read = MODEL_TIMEOUTS.get(model, DEFAULT_TIMEOUT) if model else DEFAULT_TIMEOUT
+    return httpx.Timeout(read, connect=CONNECT_TIMEOUT)
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _build_http_client() -> httpx.Client:
+    return httpx.Client(limits=_pool_limits(), timeout=model_timeout(None))
+
+
+def get_client(model: Optional[str] = None, api_key: Optional[str] = None,
+               base_url: Optional[str] = None) -> openai.OpenAI:
+    """Return the shared OpenAI client, reusing its keep-alive connection pool.
+
+    Clients are registered per (api_key, base_url) so every caller in the
+    process talks to the API over the same pool. When a model is given the
+    returned client carries that model's timeout but still shares the pool.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    key = (api_key, base_url)
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = openai.OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=_build_http_client(),
+            )
+            _clients[key] = client
+
+    if model:
+        return client.with_options(timeout=model_timeout(model))
+    return client
+
+
+def create_async_client(api_key: Optional[str] = None,
+                        base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+    """New AsyncOpenAI client with the same pool limits.
+
+    Async connections are bound to the event loop that opened them, so the
+    caller owns this client for the lifetime of its loop and closes it.
+    """
+    return openai.AsyncOpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=base_url or os.getenv("OPENAI_BASE_URL"),
+        http_client=httpx.AsyncClient(limits=_pool_limits(), timeout=model_timeout(None)),
+    )
+
+
+def close_clients():
+    """Close every pooled client (used on reconfiguration and in benchmarks)"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            print(f"Closing OpenAI client failed: {e}")
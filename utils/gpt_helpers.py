@@ -1,22 +1,97 @@
-import openai
-import os
 from datetime import datetime
 import csv
 
+from utils.gpt_cache import CACHE_ENABLED, cached_completion, get_cache, make_key
+from utils.gpt_client import get_client
+from utils.prompt_budget import fit_text, prompt_budget
+from utils.stats_helpers import summarize_dataframe
+from utils.tokens import count_tokens
+
+ANALYST_SYSTEM_PROMPT = "You are a business intelligence analyst."
+
+def _fit_messages(system, user, model):
+    """Trim the user message so the request fits the model's context window"""
+    budget = prompt_budget(model) - count_tokens(system, model)
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": fit_text(user, model, budget)}
+    ]
+
+def _analyst_messages(prompt, model):
+    return _fit_messages(ANALYST_SYSTEM_PROMPT, prompt, model)
+
 def run_gpt_prompt(prompt, model="gpt-3.5-turbo", temperature=0.7):
     """Handle GPT analysis with error handling"""
     try:
-        client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        client = get_client(model)
         
-        response = client.chat.completions.create(
+        return cached_completion(
+            client,
             model=model,
-            messages=[
-                {"role": "system", "content": "You are a business intelligence analyst."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=_analyst_messages(prompt, model),
             temperature=temperature
         )
-        
-        return response.choices[0].message.content
     except Exception as e:
         return f"Analysis failed: {str(e)}"
+
+def stream_gpt_messages(messages, model="gpt-3.5-turbo", temperature=0.7):
+    """Yield the completion text as it arrives; the full text is cached once complete"""
+    key = make_key(model, messages, temperature)
+    cache = get_cache() if CACHE_ENABLED else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    parts = []
+    try:
+        stream = get_client(model).chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+    except Exception as e:
+        yield f"Analysis failed: {str(e)}"
+        return
+
+    if cache is not None and parts:
+        cache.set(key, "".join(parts))
+
+def stream_gpt_prompt(prompt, model="gpt-3.5-turbo", temperature=0.7):
+    """Streaming counterpart of run_gpt_prompt"""
+    return stream_gpt_messages(_analyst_messages(prompt, model), model, temperature)
+
+def stream_module_prompt(template, user_prompt, data=None, model="gpt-3.5-turbo", temperature=0.7):
+    """Stream a SAMI module analysis for a prompt template and optional dataset"""
+    return stream_gpt_messages(build_module_messages(template, user_prompt, data, model), model, temperature)
+
+def describe_data(df, sample_rows=5):
+    """Compact text description of an uploaded dataset for a GPT prompt"""
+    parts = [f"Dataset: {len(df)} rows, columns: {', '.join(map(str, df.columns))}"]
+    summary = summarize_dataframe(df)
+    if not summary.empty:
+        parts.append("Summary statistics:\n" + summary.round(3).to_string())
+    parts.append("Sample rows:\n" + df.head(sample_rows).to_csv(index=False))
+    return "\n\n".join(parts)
+
+def build_module_messages(template, user_prompt, data=None, model="gpt-3.5-turbo"):
+    """Chat messages for a SAMI module prompt template (prompts/*.json)"""
+    system = f"You are {template.get('name', 'a SAMI module')}. {template.get('description', '')}"
+    if template.get("instructions"):
+        system += f"\n{template['instructions']}"
+
+    user = user_prompt
+    if data is not None:
+        context = data if isinstance(data, str) else describe_data(data)
+        user += f"\n\n{context}"
+
+    return _fit_messages(system, user, model)
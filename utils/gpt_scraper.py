@@ -1,5 +1,3 @@
-import openai
-import os
 import json
 import requests
 from bs4 import BeautifulSoup
@@ -7,6 +5,12 @@ from datetime import datetime
 from typing import List, Dict
 import random
 
+from utils.gpt_cache import cached_completion
+from utils.dedup import dedup_near_duplicates
+from utils.gpt_client import get_client
+from utils.prompt_budget import pack_records, prompt_budget
+from utils.stats_helpers import as_float
+
 # ✅ Import the scrapers from web_scraper_helpers
 from utils.web_scraper_helpers import (
     scrape_google_news_rss,
@@ -15,7 +19,9 @@ from utils.web_scraper_helpers import (
 
 class EnterpriseScraper:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.model = "gpt-4-turbo"
+        self.client = get_client(self.model)
+        self.max_prompt_tokens = 12000  # cost cap, well inside the context window
         self.fallback_data = {
             "Apple": [
                 {"content": "Apple releases new iPhone with innovative camera features", "source": "News", "date": "2023-09-15", "sentiment": 8},
@@ -58,13 +64,25 @@ class EnterpriseScraper:
             print(f"Reddit scrape failed: {e}")
             return []
 
-    def scrape_enterprise_data(self, company: str) -> List[Dict]:
-        """Main enterprise scraper with multi-layered fallback"""
+    def scrape_enterprise_data(self, company: str, store=None) -> List[Dict]:
+        """Main enterprise scraper with multi-layered fallback
+
+        With a MentionStore, results are recorded and only mentions not seen
+        before for this company are returned.
+        """
+        source, results = self._collect(company)
+        results = dedup_near_duplicates(results, 'content')
+        if store is not None:
+            return store.add_mentions(company, results, source=source)
+        return results
+
+    def _collect(self, company: str):
+        """Run the fallback chain; returns (layer name, results)"""
 
         # Attempt GPT-based scraping
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+                model=self.model,
                 messages=[{
                     "role": "user",
                     "content": f"""
@@ -77,26 +95,26 @@ class EnterpriseScraper:
             )
             data = json.loads(response.choices[0].message.content)
             if data.get('results'):
-                return data['results']
+                return "gpt", data['results']
         except Exception as e:
             print(f"GPT scraping failed: {e}")
 
         # Fallback 1: Pre-loaded data
         if company in self.fallback_data:
-            return self.fallback_data[company]
+            return "fallback", self.fallback_data[company]
 
         # Fallback 2: Google News
         news_results = self._scrape_google_news(company)
         if news_results:
-            return news_results
+            return "google_news", news_results
 
         # Fallback 3: Reddit
         reddit_results = self._scrape_reddit(company)
         if reddit_results:
-            return reddit_results
+            return "reddit", reddit_results
 
         # Final fallback: Nothing found
-        return []
+        return None, []
 
     def analyze_sentiment(self, data: List[Dict]) -> Dict:
         """Run sentiment analysis using GPT"""
@@ -104,13 +122,21 @@ class EnterpriseScraper:
             return {"error": "No data to analyze"}
 
         try:
-            analysis = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+            # Most opinionated mentions first: they carry the most signal
+            packed = pack_records(
+                data,
+                self.model,
+                prompt_budget(self.model, max_prompt_tokens=self.max_prompt_tokens) - 200,
+                priority=lambda d: abs(as_float(d.get('sentiment'), 5) - 5)
+            )
+            content = cached_completion(
+                self.client,
+                model=self.model,
                 messages=[{
                     "role": "user",
                     "content": f"""
-                    Analyze this enterprise data:
-                    {json.dumps(data)}
+                    Analyze this enterprise data (one JSON record per line):
+                    {packed.text}
 
                     Return JSON with:
                     - overall_score (1–10)
@@ -121,6 +147,9 @@ class EnterpriseScraper:
                 }],
                 response_format={"type": "json_object"}
             )
-            return json.loads(analysis.choices[0].message.content)
+            analysis = json.loads(content)
+            analysis['records_analyzed'] = packed.included
+            analysis['records_dropped'] = packed.dropped
+            return analysis
         except Exception as e:
             return {"error": str(e)}
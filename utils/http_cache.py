@@ -0,0 +1,123 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+HTTP_CACHE_PATH = os.getenv("SAMI_HTTP_CACHE_PATH", os.path.join(".sami_cache", "http_cache.sqlite"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("SAMI_HTTP_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Freshness per host when the server sends no Cache-Control max-age
+FRESHNESS_TTLS: Dict[str, float] = {
+    "news.google.com": 15 * 60,
+    "www.reddit.com": 10 * 60,
+    "www.google.com": 30 * 60,
+    "nitter.net": 10 * 60,
+}
+DEFAULT_TTL = float(os.getenv("SAMI_HTTP_CACHE_TTL", "0"))
+
+_MAX_AGE_RE = re.compile(r"(?:s-)?max-age\s*=\s*(\d+)")
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lower-case scheme and host, sorted query, no fragment"""
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if parts.scheme == "http" and netloc.endswith(":80"):
+        netloc = netloc[:-3]
+    elif parts.scheme == "https" and netloc.endswith(":443"):
+        netloc = netloc[:-4]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path or "/", query, ""))
+
+
+def freshness_lifetime(url: str, headers: Dict[str, str], ttls: Dict[str, float] = FRESHNESS_TTLS) -> Optional[float]:
+    """Seconds a response may be served without revalidation, or None if it must not be stored"""
+    cache_control = next((v for k, v in headers.items() if k.lower() == "cache-control"), "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    if match:
+        return float(match.group(1))
+    return ttls.get(urlsplit(url).netloc.lower(), DEFAULT_TTL)
+
+
+class DiskStore:
+    """Persistent SQLite store of zlib-compressed HTTP responses with an LRU size cap"""
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                key TEXT PRIMARY KEY,
+                meta TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_accessed ON http_cache(accessed)")
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT meta, body FROM http_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+        entry = json.loads(row[0])
+        entry["content"] = zlib.decompress(row[1])
+        return entry
+
+    def set(self, key: str, entry: Dict):
+        content = entry["content"]
+        body = zlib.compress(content, 6)
+        meta = json.dumps({k: v for k, v in entry.items() if k != "content"})
+        size = len(body) + len(meta)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, meta, body, size, raw_size, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, meta, body, size, len(content), time.time()),
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM http_cache ORDER BY accessed ASC"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM http_cache WHERE key = ?", stale)
+        self.evictions += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+
+    def usage(self) -> Dict:
+        with self._lock:
+            entries, stored, raw = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(raw_size), 0) FROM http_cache"
+            ).fetchone()
+        return {"entries": entries, "stored_bytes": stored, "raw_bytes": raw, "evictions": self.evictions}
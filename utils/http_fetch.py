@@ -0,0 +1,183 @@
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+
+from utils.http_cache import DiskStore, freshness_lifetime, normalize_url
+from utils.politeness import host_limiter
+
+DEFAULT_TIMEOUT = (5, 15)  # (connect, read) seconds
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; SAMI-GPTS/1.0)"}
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+BODY_HEADERS = ("content-length", "content-encoding", "transfer-encoding")  # describe a 304's empty body, not ours
+
+
+class FetchedResponse:
+    """The parts of an HTTP response the scrapers use, live or from the cache"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str],
+                 from_cache: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def encoding(self) -> Optional[str]:
+        """Charset from Content-Type, with requests' defaults (ISO-8859-1 for text/*, UTF-8 for JSON)"""
+        return get_encoding_from_headers(CaseInsensitiveDict(self.headers))
+
+    @property
+    def text(self) -> str:
+        """Body decoded with the declared charset; without one, UTF-8 if it decodes, else a detected charset"""
+        encoding = self.encoding
+        if encoding is None:
+            try:
+                return self.content.decode("utf-8")
+            except UnicodeDecodeError:
+                encoding = chardet.detect(self.content)["encoding"] or "utf-8"
+        try:
+            return self.content.decode(encoding, errors="replace")
+        except LookupError:
+            return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def _build_session(pool_connections: int = 16, pool_maxsize: int = 8, retries: int = 3,
+                   backoff_factor: float = 0.5) -> requests.Session:
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class Fetcher:
+    """Shared GET layer: pooled keep-alive connections, retries with
+    exponential backoff, a default timeout, a persistent response cache and
+    ETag/Last-Modified revalidation"""
+
+    def __init__(self, store=None, timeout=DEFAULT_TIMEOUT, limiter=host_limiter, ttls=None, **session_options):
+        self.session = _build_session(**session_options)
+        self.store = store if store is not None else DiskStore()
+        self.timeout = timeout
+        self.limiter = limiter
+        self.ttls = ttls
+        self.fresh_hits = 0
+        self.not_modified = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counter: str, saved: int = 0):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.bytes_saved += saved
+
+    def _lifetime(self, url, headers):
+        if self.ttls is None:
+            return freshness_lifetime(url, headers)
+        return freshness_lifetime(url, headers, self.ttls)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, params=None,
+            timeout=None) -> FetchedResponse:
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        key = normalize_url(url)
+        request_headers = dict(headers or {})
+
+        cached = self.store.get(key)
+        if cached is not None:
+            if time.time() - cached["fetched_at"] < cached.get("ttl", 0):
+                self._count("fresh_hits", len(cached["content"]))
+                return FetchedResponse(url, cached["status"], cached["content"], cached["headers"], from_cache=True)
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        if self.limiter is not None:
+            self.limiter.wait(url)
+        response = self.session.get(url, headers=request_headers, timeout=timeout or self.timeout)
+
+        if response.status_code == 304 and cached is not None:
+            self._count("not_modified", len(cached["content"]))
+            # a 304 updates the stored headers; names are case-insensitive (HTTP/2 sends them lower-case)
+            headers = CaseInsensitiveDict(cached["headers"])
+            headers.update((k, v) for k, v in response.headers.items() if k.lower() not in BODY_HEADERS)
+            ttl = self._lifetime(url, headers)
+            cached["headers"] = dict(headers)
+            cached["etag"] = headers.get("ETag")
+            cached["last_modified"] = headers.get("Last-Modified")
+            cached["fetched_at"] = time.time()
+            cached["ttl"] = ttl or 0.0
+            self.store.set(key, cached)
+            return FetchedResponse(url, cached["status"], cached["content"], cached["headers"], from_cache=True)
+
+        self._count("misses")
+        result = FetchedResponse(url, response.status_code, response.content, dict(response.headers))
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        ttl = self._lifetime(url, response.headers)
+        if response.status_code == 200 and ttl is not None and (ttl > 0 or etag or last_modified):
+            self.store.set(key, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "status": response.status_code,
+                "content": response.content,
+                "headers": dict(response.headers),
+                "fetched_at": time.time(),
+                "ttl": ttl,
+            })
+        return result
+
+    def stats(self) -> Dict:
+        """Hit rate and bytes not downloaded thanks to the cache"""
+        lookups = self.fresh_hits + self.not_modified + self.misses
+        stats = {
+            "fresh_hits": self.fresh_hits,
+            "revalidated": self.not_modified,
+            "misses": self.misses,
+            "hit_rate": (self.fresh_hits + self.not_modified) / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+        if hasattr(self.store, "usage"):
+            stats.update(self.store.usage())
+        return stats
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> Fetcher:
+    """Process-wide fetcher shared by every scraper"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher()
+        return _fetcher
+
+
+def fetch(url: str, headers: Optional[Dict[str, str]] = None, params=None, timeout=None) -> FetchedResponse:
+    """GET url through the shared fetcher"""
+    return get_fetcher().get(url, headers=headers, params=params, timeout=timeout)
@@ -0,0 +1,428 @@
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.xlsx_reader import read_xlsx
+
+INGEST_CACHE_DIR = os.getenv("SAMI_INGEST_CACHE_DIR", os.path.join(".sami_cache", "uploads"))
+INGEST_MEMORY_BYTES = int(os.getenv("SAMI_INGEST_MEMORY_BYTES", str(1024 * 1024 * 1024)))
+INGEST_DISK_BYTES = int(os.getenv("SAMI_INGEST_DISK_BYTES", str(4 * 1024 * 1024 * 1024)))
+STREAM_CHUNK_ROWS = int(os.getenv("SAMI_STREAM_CHUNK_ROWS", "100000"))
+CATEGORY_MAX_RATIO = 0.5  # string columns with at most this share of distinct values become categories
+STREAMABLE_TYPES = (".csv", ".txt")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def read_upload(data: bytes, name: str, sheet=None, usecols: Optional[Sequence] = None) -> pd.DataFrame:
+    """Parse CSV, XLSX or tab-delimited TXT bytes; `sheet` only applies to XLSX"""
+    buffer = io.BytesIO(data)
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        return pd.read_csv(buffer, usecols=usecols)
+    if lower.endswith(".xlsx"):
+        return read_xlsx(data, sheet, usecols)
+    if lower.endswith(".txt"):
+        return pd.read_csv(buffer, delimiter="\t", usecols=usecols)
+    raise ValueError(f"Unsupported file type: {name}")
+
+
+def options_key(sheet=None, usecols: Optional[Sequence] = None) -> str:
+    """Cache-key suffix for a sheet/column selection ("" for the whole default sheet)"""
+    if sheet is None and usecols is None:
+        return ""
+    return "-" + hashlib.blake2b(repr((sheet, list(usecols or []))).encode(), digest_size=6).hexdigest()
+
+
+@dataclass
+class LoadReport:
+    """How one upload was loaded: parsed, or served from the memory or disk cache"""
+    name: str
+    source: str
+    seconds: float
+    peak_bytes: int
+    rows: int
+    columns: int
+
+    def describe(self) -> str:
+        how = "Parsed" if self.source == "parsed" else f"Loaded from the {self.source} cache"
+        return (f"{how} in {self.seconds:.2f} s · peak memory +{format_bytes(self.peak_bytes)} · "
+                f"{self.rows:,} rows × {self.columns} columns")
+
+
+class PeakMemory:
+    """Context manager sampling this process's RSS on a background thread;
+    `peak_bytes` is the highest rise above the RSS on entry"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        self._peak = max(self._peak, process_memory_bytes())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._start = self._peak = process_memory_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        self.peak_bytes = self._peak - self._start
+
+
+class FrameCache:
+    """In-memory LRU of parsed DataFrames with a byte budget"""
+
+    def __init__(self, max_bytes: int = INGEST_MEMORY_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, df: pd.DataFrame):
+        size = frame_bytes(df)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                self.bytes -= self._frames.pop(key)[1]
+            self._frames[key] = (df, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+
+class IngestCache:
+    """Parse each distinct upload once.
+
+    Uploads are keyed by a hash of their bytes (plus file type). Parsed
+    frames live in a memory LRU and are also written to Parquet (Feather
+    when Parquet cannot store a column) so a restarted server or another
+    worker skips parsing too.
+    """
+
+    def __init__(self, directory: str = INGEST_CACHE_DIR, memory_bytes: int = INGEST_MEMORY_BYTES,
+                 disk_bytes: int = INGEST_DISK_BYTES):
+        self.directory = directory
+        self.disk_bytes = disk_bytes
+        self.memory = FrameCache(memory_bytes)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.parses = 0
+        self._upload_keys: Dict[str, str] = {}
+        self.reports: Dict[str, LoadReport] = {}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def key_for(self, data, name: str, upload_id: Optional[str] = None) -> str:
+        """Content key; hashing is skipped for an upload already seen this session"""
+        if upload_id is not None and upload_id in self._upload_keys:
+            return self._upload_keys[upload_id]
+        data = data() if callable(data) else data
+        extension = os.path.splitext(name)[1].lower().lstrip(".")
+        key = f"{content_hash(data)}-{extension}"
+        if upload_id is not None:
+            with self._lock:
+                self._upload_keys[upload_id] = key
+        return key
+
+    def _disk_paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".parquet", base + ".feather"
+
+    def _read_disk(self, key: str, columns: Optional[Sequence] = None) -> Optional[pd.DataFrame]:
+        parquet, feather = self._disk_paths(key)
+        for path, reader in ((parquet, pd.read_parquet), (feather, pd.read_feather)):
+            if os.path.exists(path):
+                try:
+                    df = reader(path, columns=list(columns) if columns is not None else None)
+                    os.utime(path)  # LRU order for disk eviction
+                    return df
+                except Exception as e:
+                    print(f"Ingest cache read failed for {path}: {e}")
+        return None
+
+    def _write_disk(self, key: str, df: pd.DataFrame):
+        parquet, feather = self._disk_paths(key)
+        for path, writer in ((parquet, df.to_parquet), (feather, df.to_feather)):
+            tmp = path + ".tmp"
+            try:
+                writer(tmp)
+                os.replace(tmp, path)
+                self._evict_disk()
+                return
+            except Exception as e:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                print(f"Ingest cache could not write {os.path.basename(path)}: {e}")
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith((".parquet", ".feather")):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def _cached(self, key: str):
+        """(frame, "memory" | "disk") from the cache, or (None, None)"""
+        df = self.memory.get(key)
+        if df is not None:
+            self._count("memory_hits")
+            return df, "memory"
+        df = self._read_disk(key)
+        if df is not None:
+            self._count("disk_hits")
+            self.memory.set(key, df)
+            return df, "disk"
+        return None, None
+
+    def _subset(self, base_key: str, sheet, usecols: Sequence):
+        """A column subset cut from the cached whole sheet, without parsing.
+        On disk this reads only those columns of the Parquet file."""
+        full_key = base_key + options_key(sheet, None)
+        df = self.memory.get(full_key)
+        if df is not None and set(usecols) <= set(df.columns):
+            self._count("memory_hits")
+            return df[list(usecols)], "memory"
+        df = self._read_disk(full_key, columns=usecols)
+        if df is not None:
+            self._count("disk_hits")
+            return df, "disk"
+        return None, None
+
+    def load(self, data, name: str, upload_id: Optional[str] = None, sheet=None,
+             usecols: Optional[Sequence] = None) -> pd.DataFrame:
+        """DataFrame for the upload; callers get a shallow copy they may modify.
+
+        `data` is the file's bytes or a callable returning them, so a rerun
+        that hits the cache by upload_id never touches the bytes at all.
+        `sheet` and `usecols` pick an XLSX sheet and a column subset before
+        parsing; each selection is cached under its own key. Every load is
+        timed and recorded in `reports`.
+        """
+        start = time.perf_counter()
+        base_key = self.key_for(data, name, upload_id)
+        key = base_key + options_key(sheet, usecols)
+        with PeakMemory() as memory:
+            df, source = self._cached(key)
+            if df is None and usecols is not None:
+                df, source = self._subset(base_key, sheet, usecols)
+                if df is not None:
+                    self.memory.set(key, df)
+            if df is None:
+                df = read_upload(data() if callable(data) else data, name, sheet, usecols)
+                if usecols is not None:  # the caller's column order, as a cached subset would have
+                    df = df[list(usecols)]
+                source = "parsed"
+                self._count("parses")
+                self._write_disk(key, df)
+                self.memory.set(key, df)
+        report = LoadReport(name, source, time.perf_counter() - start, memory.peak_bytes, len(df), len(df.columns))
+        self.reports[key] = report
+        if source == "parsed":
+            print(f"Ingest: {name} {report.describe()}")
+        return df.copy(deep=False)
+
+    def report(self, data, name: str, upload_id: Optional[str] = None, sheet=None,
+               usecols: Optional[Sequence] = None) -> Optional[LoadReport]:
+        """The most recent LoadReport for this upload and selection"""
+        return self.reports.get(self.key_for(data, name, upload_id) + options_key(sheet, usecols))
+
+    def stats(self) -> Dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "parses": self.parses,
+            "memory_entries": len(self.memory._frames),
+            "memory_bytes": self.memory.bytes,
+            "memory_evictions": self.memory.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ingest_cache() -> IngestCache:
+    """Process-wide ingest cache shared by every page and session"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = IngestCache()
+        return _cache
+
+
+def load_upload(uploaded_file, sheet=None, usecols: Optional[Sequence] = None) -> pd.DataFrame:
+    """Parse a Streamlit upload once and serve every rerun from the cache"""
+    return get_ingest_cache().load(uploaded_file.getvalue, uploaded_file.name,
+                                   getattr(uploaded_file, "file_id", None), sheet, usecols)
+
+
+def upload_report(uploaded_file, sheet=None, usecols: Optional[Sequence] = None) -> Optional[LoadReport]:
+    return get_ingest_cache().report(uploaded_file.getvalue, uploaded_file.name,
+                                     getattr(uploaded_file, "file_id", None), sheet, usecols)
+
+
+@dataclass
+class StreamProgress:
+    """Where a streamed upload has got to, reported after every chunk"""
+    rows: int
+    chunks: int
+    bytes_read: int
+    total_bytes: int
+    chunk_bytes: int
+    memory_bytes: int
+
+    @property
+    def fraction(self) -> float:
+        return min(self.bytes_read / self.total_bytes, 1.0) if self.total_bytes else 1.0
+
+
+def process_memory_bytes() -> int:
+    """Resident memory of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except (ImportError, AttributeError):
+        return 0
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def compact_dtypes(df: pd.DataFrame, category_ratio: float = CATEGORY_MAX_RATIO,
+                   keep: Sequence[str] = ()) -> pd.DataFrame:
+    """Smallest dtypes that hold the same values: integers downcast, floats
+    to float32 when lossless, repetitive strings to category. Columns in
+    `keep` are left as they are."""
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        if col in keep:
+            continue
+        if pd.api.types.is_bool_dtype(s):
+            continue
+        if pd.api.types.is_integer_dtype(s):
+            columns[col] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s) and s.dtype != np.float32:
+            small = s.astype(np.float32)
+            if (small.astype(s.dtype) == s).sum() == s.count():
+                columns[col] = small
+        elif pd.api.types.is_string_dtype(s) or s.dtype == object:
+            if s.nunique(dropna=True) <= len(s) * category_ratio:
+                columns[col] = s.astype("category")
+    return df.assign(**columns) if columns else df
+
+
+def _open_source(source):
+    """A readable binary buffer for bytes, a path or a file-like upload, and its size"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, "rb"), os.path.getsize(source)
+    source.seek(0, io.SEEK_END)
+    size = source.tell()
+    source.seek(0)
+    return source, size
+
+
+def _reader_options(name: str) -> Dict:
+    lower = name.lower()
+    if lower.endswith(".csv"):
+        return {}
+    if lower.endswith(".txt"):
+        return {"delimiter": "\t"}
+    raise ValueError(f"Streaming supports CSV and TXT files, not {name}")
+
+
+def upload_columns(source, name: str) -> List[str]:
+    """Column names of a CSV/TXT upload, reading only its header"""
+    buffer, _ = _open_source(source)
+    try:
+        return list(pd.read_csv(buffer, nrows=0, **_reader_options(name)).columns)
+    finally:
+        if buffer is not source:
+            buffer.close()
+
+
+def iter_upload_chunks(source, name: str, chunksize: int = STREAM_CHUNK_ROWS, usecols: Optional[Sequence[str]] = None,
+                       compact: bool = True, keep: Sequence[str] = (),
+                       progress: Optional[Callable[[StreamProgress], None]] = None) -> Iterator[pd.DataFrame]:
+    """Stream a CSV/TXT upload as DataFrame chunks of `chunksize` rows.
+
+    `source` is the file's bytes, a path, or a file-like upload. Only one
+    chunk is held at a time; with `compact`, each chunk gets compact dtypes
+    (see compact_dtypes). `usecols` skips parsing the other columns, and
+    `progress` is called after every chunk with a StreamProgress.
+    """
+    buffer, total = _open_source(source)
+    rows = chunks = 0
+    try:
+        with pd.read_csv(buffer, chunksize=chunksize, usecols=usecols, **_reader_options(name)) as reader:
+            for chunk in reader:
+                if compact:
+                    chunk = compact_dtypes(chunk, keep=keep)
+                rows += len(chunk)
+                chunks += 1
+                if progress is not None:
+                    progress(StreamProgress(rows, chunks, buffer.tell(), total, frame_bytes(chunk),
+                                            process_memory_bytes()))
+                yield chunk
+    finally:
+        if buffer is not source:
+            buffer.close()
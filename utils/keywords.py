@@ -0,0 +1,233 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.lexicon import get_stopwords
+
+CHUNK_ROWS = 50_000
+MIN_WORD_LENGTH = 4
+ALL_SEGMENTS = "__all__"
+ROW_KEYWORDS = 10  # keywords kept per row by update_rows
+
+
+# ASCII and common typographic punctuation; RE2 syntax for pyarrow.compute
+PUNCTUATION_RE = r"[!-/:-@\[-`{-~\x{00A1}\x{00AB}\x{00BB}\x{00BF}\x{2010}-\x{201F}\x{2026}]+"
+
+
+def iter_chunks(texts, chunk_size: int = CHUNK_ROWS):
+    """Slice a Series/list into chunk_size pieces; iterables of chunks pass through"""
+    if isinstance(texts, (pd.Series, list, tuple, np.ndarray)):
+        for lo in range(0, len(texts), chunk_size):
+            chunk = texts.iloc[lo:lo + chunk_size] if isinstance(texts, pd.Series) else texts[lo:lo + chunk_size]
+            yield pd.Series(chunk)
+    else:
+        for chunk in texts:
+            yield pd.Series(chunk)
+
+
+def _as_arrow(texts, fill: str = "") -> pa.Array:
+    """A text column as one large_string Arrow array (Arrow input is not copied)"""
+    if isinstance(texts, pa.ChunkedArray):
+        texts = texts.combine_chunks()
+    if not isinstance(texts, pa.Array):
+        texts = pd.Series(texts)
+        if isinstance(texts.dtype, pd.CategoricalDtype):  # compact streamed chunks
+            texts = texts.astype(object)
+        if texts.dtype != "str":
+            texts = texts.fillna(fill).astype(str)
+        texts = pa.array(texts, type=pa.large_string(), from_pandas=True)
+    elif texts.type != pa.large_string():
+        texts = texts.cast(pa.large_string())
+    return texts.fill_null(fill)
+
+
+def tokenize(texts) -> pa.ListArray:
+    """Lower-cased word lists per row: punctuation becomes a separator, then split on whitespace"""
+    return pc.utf8_split_whitespace(pc.replace_substring_regex(pc.utf8_lower(_as_arrow(texts)), PUNCTUATION_RE, " "))
+
+
+def stopword_array(stopwords) -> pa.Array:
+    return pa.array(sorted(stopwords), type=pa.large_string())
+
+
+def chunk_terms(texts, stopwords: Optional[pa.Array] = None, ngram_range: Tuple[int, int] = (1, 1),
+                min_length: int = MIN_WORD_LENGTH) -> pa.Table:
+    """Tokenize one chunk into a (row, term) table holding every n-gram.
+
+    Runs entirely in Arrow compute kernels. Words are runs of letters
+    (accents included) of at least min_length. Stopwords are removed before
+    n-grams are formed, so "waited for support" yields the bigram
+    "waited support" (the same as scikit-learn).
+    """
+    lists = tokenize(texts)
+    words = pc.list_flatten(lists)
+    rows = pc.list_parent_indices(lists)
+    keep = pc.and_(pc.utf8_is_alpha(words), pc.greater_equal(pc.utf8_length(words), min_length))
+    if stopwords is not None and len(stopwords):
+        keep = pc.and_(keep, pc.invert(pc.is_in(words, value_set=stopwords)))
+    words = pc.filter(words, keep)
+    rows = pc.filter(rows, keep)
+
+    terms, positions = [], []
+    lo, hi = ngram_range
+    for n in range(lo, hi + 1):
+        span = len(words) - n + 1
+        if span <= 0:
+            continue
+        if n == 1:
+            terms.append(words)
+            positions.append(rows)
+            continue
+        # Tokens of one row are contiguous, so an n-gram is valid when its
+        # first and last tokens come from the same row
+        same_row = pc.equal(rows.slice(0, span), rows.slice(n - 1, span))
+        grams = pc.binary_join_element_wise(*(words.slice(k, span) for k in range(n)), pa.scalar(" ", pa.large_string()))
+        terms.append(pc.filter(grams, same_row))
+        positions.append(pc.filter(rows.slice(0, span), same_row))
+
+    if not terms:
+        return pa.table({"row": pa.array([], pa.int64()), "term": pa.array([], pa.large_string())})
+    return pa.table({"row": pa.concat_arrays(positions).cast(pa.int64()),
+                     "term": pa.concat_arrays([t.cast(pa.large_string()) for t in terms])})
+
+
+def row_keywords(table: pa.Table, rows: int, per_row: int = ROW_KEYWORDS) -> pa.Array:
+    """Per-row "kw1, kw2" strings from a chunk_terms table ("" for rows without keywords)"""
+    if table.num_rows == 0:
+        return pa.array([""] * rows, type=pa.large_string())
+    encoded = pc.dictionary_encode(table["term"]).combine_chunks()
+    codes = encoded.indices.to_numpy().astype(np.int64)
+    row = table["row"].to_numpy()
+    # First occurrence of each (row, term) pair, grouped by row in text order
+    _, first = np.unique(row * len(encoded.dictionary) + codes, return_index=True)
+    first = first[np.lexsort((first, row[first]))]
+    offsets = np.zeros(rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(row[first], minlength=rows), out=offsets[1:])
+    terms = pc.take(encoded.dictionary, pa.array(codes[first]))
+    lists = pa.LargeListArray.from_arrays(pa.array(offsets), terms)
+    return pc.binary_join(pc.list_slice(lists, 0, per_row), pa.scalar(", ", pa.large_string())).fill_null("")
+
+
+class KeywordCounter:
+    """Streaming term counts, overall and per segment.
+
+    Feed it chunks with update(); memory is bounded by the chunk size plus
+    the vocabulary. Counters from separate runs combine with merge().
+    """
+
+    def __init__(self, stopwords=None, ngram_range: Tuple[int, int] = (1, 1),
+                 min_length: int = MIN_WORD_LENGTH):
+        self.stopwords = get_stopwords() if stopwords is None else frozenset(stopwords)
+        self.ngram_range = ngram_range
+        self.min_length = min_length
+        self._stopword_array = stopword_array(self.stopwords)
+        self.rows = 0
+        self.segments: Dict[str, Counter] = defaultdict(Counter)
+
+    def update(self, texts, segments=None):
+        """Count one chunk: a Series/list, or an Arrow array (used by the process pool)"""
+        texts = _as_arrow(texts)
+        self._count(chunk_terms(texts, self._stopword_array, self.ngram_range, self.min_length), segments)
+        self.rows += len(texts)
+        return self
+
+    def update_rows(self, texts, segments=None, per_row: int = ROW_KEYWORDS) -> pa.Array:
+        """Count one chunk and also return each row's distinct keywords as a
+        comma-separated string (first per_row of them, in text order)"""
+        texts = _as_arrow(texts)
+        table = chunk_terms(texts, self._stopword_array, self.ngram_range, self.min_length)
+        self._count(table, segments)
+        self.rows += len(texts)
+        return row_keywords(table, len(texts), per_row)
+
+    def _count(self, table: pa.Table, segments=None):
+        if table.num_rows == 0:
+            return
+        if segments is None:
+            counts = pc.value_counts(table["term"])
+            self.segments[ALL_SEGMENTS].update(dict(zip(counts.field("values").to_pylist(),
+                                                        counts.field("counts").to_pylist())))
+            return
+        labels = _as_arrow(segments, fill="(missing)")
+        table = table.append_column("segment", pc.take(labels, table["row"]))
+        counts = table.group_by(["segment", "term"]).aggregate([([], "count_all")]).to_pydict()
+        for segment, term, count in zip(counts["segment"], counts["term"], counts["count_all"]):
+            self.segments[segment][term] += count
+
+    def merge(self, other: "KeywordCounter"):
+        self.rows += other.rows
+        for segment, counter in other.segments.items():
+            self.segments[segment].update(counter)
+        return self
+
+    def totals(self) -> Counter:
+        if len(self.segments) == 1:
+            return next(iter(self.segments.values()))
+        total = Counter()
+        for counter in self.segments.values():
+            total.update(counter)
+        return total
+
+    def most_common(self, n: int = 20, ngram: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Top terms overall, optionally only n-grams of one length"""
+        totals = self.totals()
+        if ngram is None:
+            return totals.most_common(n)
+        return Counter({t: c for t, c in totals.items() if t.count(" ") == ngram - 1}).most_common(n)
+
+    def tfidf(self, top_n: int = 10) -> pd.DataFrame:
+        """Most distinctive terms per segment.
+
+        Each segment is treated as one document: tf is the term's share of
+        the segment's terms and idf = ln((1 + segments) / (1 + segments
+        containing the term)) + 1.
+        """
+        segments = {s: c for s, c in self.segments.items() if s != ALL_SEGMENTS}
+        if not segments:
+            return pd.DataFrame(columns=["segment", "term", "count", "tf", "tfidf"])
+        document_frequency = Counter()
+        for counter in segments.values():
+            document_frequency.update(counter.keys())
+
+        n_segments = len(segments)
+        frames = []
+        for segment, counter in segments.items():
+            terms = np.array(list(counter.keys()), dtype=object)
+            counts = np.fromiter(counter.values(), dtype=np.float64, count=len(counter))
+            dfs = np.fromiter((document_frequency[t] for t in terms), dtype=np.float64, count=len(terms))
+            tf = counts / counts.sum()
+            scores = tf * (np.log((1 + n_segments) / (1 + dfs)) + 1)
+            top = np.argsort(-scores, kind="stable")[:top_n]
+            frames.append(pd.DataFrame({"segment": segment, "term": terms[top], "count": counts[top].astype(int),
+                                        "tf": tf[top], "tfidf": scores[top]}))
+        return pd.concat(frames, ignore_index=True)
+
+
+def count_keywords(texts, segments=None, stopwords=None, ngram_range: Tuple[int, int] = (1, 1),
+                   min_length: int = MIN_WORD_LENGTH, chunk_size: int = CHUNK_ROWS) -> KeywordCounter:
+    """Count terms over a text column chunk by chunk"""
+    counter = KeywordCounter(stopwords, ngram_range, min_length)
+    if segments is None:
+        for chunk in iter_chunks(texts, chunk_size):
+            counter.update(chunk)
+        return counter
+    for chunk, segment_chunk in zip(iter_chunks(texts, chunk_size), iter_chunks(segments, chunk_size)):
+        counter.update(chunk, segment_chunk)
+    return counter
+
+
+def extract_keywords(texts, stopwords=None, top_n: int = 20, ngram_range: Tuple[int, int] = (1, 1),
+                     min_length: int = MIN_WORD_LENGTH,
+                     chunk_size: int = CHUNK_ROWS) -> List[Tuple[str, int]]:
+    """Top (keyword, frequency) pairs of a text column"""
+    return count_keywords(texts, None, stopwords, ngram_range, min_length, chunk_size).most_common(top_n)
+
+
+def segment_keywords(texts, segments, stopwords=None, top_n: int = 10, ngram_range: Tuple[int, int] = (1, 1),
+                     min_length: int = MIN_WORD_LENGTH, chunk_size: int = CHUNK_ROWS) -> pd.DataFrame:
+    """Most distinctive keywords of each segment, ranked by TF-IDF"""
+    return count_keywords(texts, segments, stopwords, ngram_range, min_length, chunk_size).tfidf(top_n)
@@ -0,0 +1,67 @@
+import os
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lexicons")
+STOPWORD_DIR = os.path.join(LEXICON_DIR, "stopwords")
+DEFAULT_LANGUAGE = "en"
+
+
+def read_wordlist(source) -> FrozenSet[str]:
+    """One word per line, '#' comments and blank lines ignored, lower-cased.
+
+    `source` is a path, an open text/binary file (e.g. a Streamlit upload)
+    or an iterable of words.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    elif hasattr(source, "read"):
+        raw = source.read()
+        lines = (raw.decode("utf-8", errors="replace") if isinstance(raw, bytes) else raw).splitlines()
+    else:
+        lines = source
+    words = (str(line).split("#", 1)[0].strip().lower() for line in lines)
+    return frozenset(w for w in words if w)
+
+
+def _load_bundled() -> Dict[str, FrozenSet[str]]:
+    lists = {}
+    for name in sorted(os.listdir(STOPWORD_DIR)):
+        if name.endswith(".txt"):
+            lists[name[:-4]] = read_wordlist(os.path.join(STOPWORD_DIR, name))
+    return lists
+
+
+# Loaded once at import; lookups never touch the disk or the network
+_stopwords: Dict[str, FrozenSet[str]] = _load_bundled()
+_lock = threading.Lock()
+
+
+def available_stopword_lists():
+    return sorted(_stopwords)
+
+
+def register_stopwords(name: str, words: Iterable[str], extend: bool = False) -> FrozenSet[str]:
+    """Add (or replace) a named stopword list, e.g. a client's brand terms"""
+    words = read_wordlist(words)
+    with _lock:
+        if extend and name in _stopwords:
+            words = _stopwords[name] | words
+        _stopwords[name] = words
+    return words
+
+
+def get_stopwords(*names: str, extra: Optional[Iterable[str]] = None) -> FrozenSet[str]:
+    """Union of the named lists (default English) plus any extra words"""
+    names = names or (DEFAULT_LANGUAGE,)
+    unknown = [n for n in names if n not in _stopwords]
+    if unknown:
+        print(f"Unknown stopword lists ignored: {', '.join(unknown)}")
+    lists = [_stopwords[n] for n in names if n in _stopwords]
+    if len(lists) == 1 and not extra:
+        return lists[0]
+    result = frozenset().union(*lists)
+    if extra:
+        result |= read_wordlist(extra)
+    return result
@@ -0,0 +1,159 @@
+import json
+from collections import Counter, defaultdict
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from utils.gpt_batch import GPTBatchEngine, GPTJob
+from utils.tokens import count_tokens, truncate_to_tokens
+
+DEFAULT_MODEL = "gpt-3.5-turbo"
+CHUNK_TOKENS = 2500      # comment tokens per map call
+CHUNKS_PER_WINDOW = 32   # map calls in flight before partials are folded in
+TOP_ITEMS = 10
+
+MAP_INSTRUCTIONS = """You analyze a batch of customer comments about {subject}.
+Return JSON with exactly these keys:
+- sentiment_breakdown: {{"positive": n, "negative": n, "neutral": n}} (number of comments in each class)
+- strengths: list of short phrases customers praise
+- weaknesses: list of short phrases customers complain about
+- emotional_analysis: list of {{"emotion": name, "strength": 0-10}}"""
+
+
+def chunk_comments(comments: Iterable[str], max_tokens: int = CHUNK_TOKENS,
+                   model: str = DEFAULT_MODEL) -> Iterator[List[str]]:
+    """Group comments into chunks of at most max_tokens tokens, lazily"""
+    chunk, used = [], 0
+    for comment in comments:
+        if comment is None:
+            continue
+        comment = str(comment).strip()
+        if not comment:
+            continue
+        tokens = count_tokens(comment, model) + 2  # "- " bullet and newline
+        if tokens > max_tokens:
+            comment = truncate_to_tokens(comment, max_tokens - 2, model)
+            tokens = max_tokens
+        if chunk and used + tokens > max_tokens:
+            yield chunk
+            chunk, used = [], 0
+        chunk.append(comment)
+        used += tokens
+    if chunk:
+        yield chunk
+
+
+class PartialMerger:
+    """Folds per-chunk JSON analyses into one running report"""
+
+    def __init__(self):
+        self.comments = 0
+        self.chunks = 0
+        self.failed_chunks = 0
+        self.sentiment = Counter()
+        self.strengths = Counter()
+        self.weaknesses = Counter()
+        self.emotion_weight = defaultdict(float)
+        self.emotion_comments = defaultdict(int)
+
+    def add(self, partial: Dict, n_comments: int):
+        self.chunks += 1
+        self.comments += n_comments
+
+        # Normalise to shares of this chunk so counts and percentages both work
+        breakdown = partial.get("sentiment_breakdown") or {}
+        values = {k: _number(breakdown.get(k)) for k in ("positive", "negative", "neutral")}
+        total = sum(values.values())
+        if total > 0:
+            for label, value in values.items():
+                self.sentiment[label] += value / total * n_comments
+
+        for item in partial.get("strengths") or []:
+            self.strengths[_phrase(item)] += n_comments
+        for item in partial.get("weaknesses") or []:
+            self.weaknesses[_phrase(item)] += n_comments
+
+        for item in partial.get("emotional_analysis") or []:
+            if isinstance(item, dict) and item.get("emotion"):
+                emotion = str(item["emotion"]).strip().lower()
+                self.emotion_weight[emotion] += _number(item.get("strength")) * n_comments
+                self.emotion_comments[emotion] += n_comments
+
+    def fail(self, n_comments: int):
+        self.failed_chunks += 1
+        self.comments += n_comments
+
+    def report(self, top: int = TOP_ITEMS) -> Dict:
+        total = sum(self.sentiment.values())
+        breakdown = {
+            label: round(self.sentiment[label] / total * 100, 1) if total else 0.0
+            for label in ("positive", "negative", "neutral")
+        }
+        emotions = sorted(
+            ({"emotion": e, "strength": round(self.emotion_weight[e] / self.emotion_comments[e], 2)}
+             for e in self.emotion_weight),
+            key=lambda item: -item["strength"],
+        )
+        return {
+            "comments_analyzed": self.comments,
+            "chunks": self.chunks,
+            "failed_chunks": self.failed_chunks,
+            "sentiment_breakdown": breakdown,
+            "strengths": [phrase for phrase, _ in self.strengths.most_common(top) if phrase],
+            "weaknesses": [phrase for phrase, _ in self.weaknesses.most_common(top) if phrase],
+            "emotional_analysis": emotions[:top],
+        }
+
+
+def _number(value) -> float:
+    try:
+        return float(str(value).rstrip("%"))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _phrase(item) -> str:
+    return str(item).strip().rstrip(".").lower()
+
+
+def map_reduce_comments(comments: Iterable[str], subject: str = "the brand",
+                        model: str = DEFAULT_MODEL, chunk_tokens: int = CHUNK_TOKENS,
+                        window: int = CHUNKS_PER_WINDOW, engine: GPTBatchEngine = None) -> Dict:
+    """Analyze every comment with concurrent map calls and merge the partial reports.
+
+    Chunks are produced lazily and processed a window at a time, so memory
+    stays bounded by the window size rather than the number of comments.
+    """
+    engine = engine or GPTBatchEngine()
+    merger = PartialMerger()
+    system = MAP_INSTRUCTIONS.format(subject=subject)
+    chunks = chunk_comments(comments, chunk_tokens, model)
+
+    while True:
+        batch = list(islice(chunks, window))
+        if not batch:
+            break
+        jobs = [
+            GPTJob(
+                template={},
+                user_prompt="",
+                model=model,
+                temperature=0.2,
+                name=f"chunk {merger.chunks + merger.failed_chunks + i}",
+                response_format={"type": "json_object"},
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": "\n".join(f"- {c}" for c in chunk)},
+                ],
+            )
+            for i, chunk in enumerate(batch)
+        ]
+        for chunk, outcome in zip(batch, engine.run(jobs)):
+            try:
+                if outcome["error"]:
+                    raise ValueError(outcome["error"])
+                merger.add(json.loads(outcome["result"]), len(chunk))
+            except Exception as e:
+                print(f"Chunk analysis failed: {e}")
+                merger.fail(len(chunk))
+
+    return merger.report()
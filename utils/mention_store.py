@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.stats_helpers import StatsAccumulator, as_float
+
+MENTION_STORE_PATH = os.getenv("SAMI_MENTION_STORE_PATH", os.path.join(".sami_data", "mentions.sqlite"))
+
+_SPACE_RE = re.compile(r"\s+")
+COLUMNS = ["brand", "source", "content", "date", "published", "url", "type", "sentiment", "content_hash", "first_seen"]
+STATS_QUERY = "SELECT sentiment, LENGTH(content) AS content_length FROM mentions WHERE brand = ?"
+
+
+def content_hash(text: str) -> str:
+    """Hash of the normalised mention text, used to recognise repeats"""
+    normalized = _SPACE_RE.sub(" ", str(text or "")).strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_published(values: Iterable) -> List[Optional[str]]:
+    """Parse mixed scraper date strings (RSS, ISO, Y-m-d) to sortable UTC ISO strings"""
+    parsed = pd.to_datetime(pd.Series(list(values), dtype="object"), utc=True, errors="coerce", format="mixed")
+    return [None if pd.isna(ts) else ts.isoformat() for ts in parsed]
+
+
+class MentionStore:
+    """Persistent store of every scraped mention with per-brand, per-source high-water marks"""
+
+    def __init__(self, path: str = MENTION_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS mentions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                brand TEXT NOT NULL,
+                source TEXT,
+                content TEXT NOT NULL,
+                date TEXT,
+                published TEXT,
+                url TEXT,
+                type TEXT,
+                sentiment REAL,
+                content_hash TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                UNIQUE (brand, content_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_mentions_brand_published ON mentions(brand, published);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                brand TEXT NOT NULL,
+                source TEXT NOT NULL,
+                published TEXT,
+                updated REAL NOT NULL,
+                PRIMARY KEY (brand, source)
+            );
+            CREATE TABLE IF NOT EXISTS mention_stats (
+                brand TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                updated REAL NOT NULL
+            );
+        """)
+
+    @staticmethod
+    def _brand(brand: str) -> str:
+        return brand.strip().lower()
+
+    def add_mentions(self, brand: str, records: List[Dict], source: Optional[str] = None) -> List[Dict]:
+        """Store records and return only the ones not seen before for this brand.
+
+        The high-water mark is kept per `source` when given (e.g. the scraper
+        name), otherwise per each record's own 'source' field. The brand's
+        running sentiment/length statistics are extended with the new records.
+        """
+        brand = self._brand(brand)
+        records = [r for r in records if r.get("content")]
+        if not records:
+            return []
+        published = parse_published(r.get("date") for r in records)
+        now = time.time()
+
+        new, marks = [], {}
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                stats = self._stats(brand)
+                for record, when in zip(records, published):
+                    key = source or record.get("source") or "unknown"
+                    if when and (marks.get(key) is None or when > marks[key]):
+                        marks[key] = when
+                    cur = self._conn.execute(
+                        "INSERT OR IGNORE INTO mentions "
+                        "(brand, source, content, date, published, url, type, sentiment, content_hash, first_seen) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (brand, record.get("source"), record["content"], record.get("date"), when,
+                         record.get("url"), record.get("type"), as_float(record.get("sentiment")),
+                         content_hash(record["content"]), now),
+                    )
+                    if cur.rowcount:
+                        new.append(record)
+                for key, when in marks.items():
+                    self._conn.execute(
+                        "INSERT INTO watermarks (brand, source, published, updated) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(brand, source) DO UPDATE SET "
+                        "published = MAX(COALESCE(published, ''), excluded.published), updated = excluded.updated",
+                        (brand, key, when, now),
+                    )
+                if new:
+                    stats.update(pd.DataFrame({
+                        "sentiment": np.array([as_float(r.get("sentiment")) for r in new], dtype=np.float64),
+                        "content_length": [len(r["content"]) for r in new],
+                    }))
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO mention_stats (brand, state, updated) VALUES (?, ?, ?)",
+                        (brand, json.dumps(stats.to_dict()), now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return new
+
+    def high_water_mark(self, brand: str, source: str) -> Optional[pd.Timestamp]:
+        """Latest publish time stored for a brand from one source"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT published FROM watermarks WHERE brand = ? AND source = ?", (self._brand(brand), source)
+            ).fetchone()
+        return pd.Timestamp(row[0]) if row and row[0] else None
+
+    def high_water_marks(self, brand: str) -> Dict[str, pd.Timestamp]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, published FROM watermarks WHERE brand = ?", (self._brand(brand),)
+            ).fetchall()
+        return {source: pd.Timestamp(when) for source, when in rows if when}
+
+    def mentions(self, brand: str, since: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Stored mentions for a brand in the order they were first seen"""
+        frame = self.frame(brand, since, limit).drop(columns=["brand", "content_hash", "published", "first_seen"])
+        return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+    def frame(self, brand: str, since: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
+        query = f"SELECT {', '.join(COLUMNS)} FROM mentions WHERE brand = ?"
+        params = [self._brand(brand)]
+        if since:
+            query += " AND published > ?"
+            params.append(_utc_iso(since))
+        query += " ORDER BY id"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return pd.read_sql_query(query, self._conn, params=params)
+
+    def _stats(self, brand: str) -> StatsAccumulator:
+        row = self._conn.execute("SELECT state FROM mention_stats WHERE brand = ?", (brand,)).fetchone()
+        if row:
+            return StatsAccumulator.from_dict(json.loads(row[0]))
+        # mentions stored before statistics were kept: scan them once
+        stored = pd.read_sql_query(STATS_QUERY, self._conn, params=[brand])
+        stats = StatsAccumulator()
+        return stats.update(stored.astype("float64")) if len(stored) else stats
+
+    def stats(self, brand: str) -> StatsAccumulator:
+        """Running statistics (sentiment, content length) over every stored mention of a brand,
+        kept up to date by add_mentions without rescanning; .to_frame() gives the summary"""
+        with self._lock:
+            return self._stats(self._brand(brand))
+
+    def count(self, brand: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM mentions WHERE brand = ?", (self._brand(brand),)
+            ).fetchone()[0]
+
+
+def _utc_iso(value) -> str:
+    ts = pd.Timestamp(value)
+    return (ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")).isoformat()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_mention_store() -> MentionStore:
+    """Process-wide mention store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MentionStore()
+        return _store
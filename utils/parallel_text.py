@@ -0,0 +1,200 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from utils.emotion_lexicon import EmotionLexicon, get_emotion_lexicon
+from utils.keywords import CHUNK_ROWS, MIN_WORD_LENGTH, KeywordCounter, _as_arrow
+from utils.stats_helpers import StatsAccumulator
+
+MAX_WORKERS = int(os.getenv("SAMI_TEXT_WORKERS", str(min(os.cpu_count() or 1, 8))))
+PARALLEL_MIN_ROWS = 100_000  # below this, process start-up costs more than it saves
+SHARDS_PER_WORKER = 4
+# Shared scratch space: tmpfs when available, so memory maps never touch disk
+SCRATCH_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+@dataclass
+class TextAnalytics:
+    """Keyword counts and per-row emotion scores for one text column"""
+    keywords: KeywordCounter
+    emotions: np.ndarray
+    emotion_names: List[str]
+    workers: int
+    row_keywords: Optional[pa.Array] = None
+
+    def emotion_totals(self):
+        return dict(zip(self.emotion_names, self.emotions.sum(axis=0).tolist()))
+
+    def emotion_frame(self, index=None) -> pd.DataFrame:
+        return pd.DataFrame(self.emotions, columns=self.emotion_names, index=index)
+
+
+@dataclass
+class StreamedAnalytics:
+    """Keyword counts, emotion totals and a numeric summary of a streamed
+    upload; no per-row results are kept"""
+    keywords: KeywordCounter
+    totals: Dict[str, float]
+    summary: pd.DataFrame
+    rows: int
+    stats: StatsAccumulator
+
+    def emotion_totals(self):
+        return self.totals
+
+
+def _analyze_batches(batches, counter: KeywordCounter, lexicon: EmotionLexicon, out: np.ndarray,
+                     segments: bool, keep_rows: bool = False) -> Optional[pa.Array]:
+    row, keywords = 0, []
+    for batch in batches:
+        texts = batch.column(0)
+        labels = batch.column(1) if segments else None
+        if keep_rows:
+            keywords.append(counter.update_rows(texts, labels))
+        else:
+            counter.update(texts, labels)
+        out[row:row + len(texts)] = lexicon.score_chunk(texts)
+        row += len(texts)
+    if not keep_rows:
+        return None
+    return pa.concat_arrays(keywords) if keywords else pa.array([], type=pa.large_string())
+
+
+def _keywords_path(scratch: str, lo: int) -> str:
+    return os.path.join(scratch, f"keywords-{lo:012d}.arrow")
+
+
+def _analyze_shard(scratch: str, lo: int, hi: int, total_rows: int, lexicon: EmotionLexicon,
+                   stopwords, ngram_range, min_length, segments: bool, keep_rows: bool) -> KeywordCounter:
+    """Worker: memory-map the shared Arrow file, analyze rows [lo, hi) and
+    write their emotion scores straight into the shared output matrix"""
+    counter = KeywordCounter(stopwords, ngram_range, min_length)
+    out = np.memmap(os.path.join(scratch, "emotions.f32"), dtype=np.float32, mode="r+",
+                    shape=(total_rows, len(lexicon.emotions)))
+    with pa.memory_map(os.path.join(scratch, "texts.arrow")) as source:
+        table = pa.ipc.open_file(source).read_all().slice(lo, hi - lo)
+        keywords = _analyze_batches(table.to_batches(max_chunksize=CHUNK_ROWS), counter, lexicon, out[lo:hi],
+                                    segments, keep_rows)
+        del table
+    out.flush()
+    del out
+    if keywords is not None:
+        _write_arrow(pa.table({"keywords": keywords}), _keywords_path(scratch, lo))
+    return counter
+
+
+def _write_arrow(table: pa.Table, path: str):
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=CHUNK_ROWS)
+
+
+def _read_arrow(path: str) -> pa.Table:
+    with pa.OSFile(path) as source:  # read into memory: the scratch dir is removed afterwards
+        return pa.ipc.open_file(source).read_all()
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int = MAX_WORKERS) -> ProcessPoolExecutor:
+    """Long-lived worker pool shared across Streamlit reruns (spawned, not forked,
+    so workers never inherit the server's threads)"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _shards(rows: int, workers: int) -> List[Tuple[int, int]]:
+    size = max(-(-rows // (workers * SHARDS_PER_WORKER)), 1)
+    return [(lo, min(lo + size, rows)) for lo in range(0, rows, size)]
+
+
+def analyze_text(texts, segments=None, stopwords=None, ngram_range: Tuple[int, int] = (1, 1),
+                 min_length: int = MIN_WORD_LENGTH, lexicon: Optional[EmotionLexicon] = None,
+                 workers: Optional[int] = None, row_keywords: bool = False) -> TextAnalytics:
+    """Keyword counts and emotion scores for a text column, sharded across processes.
+
+    The column is written once as an Arrow IPC file in shared memory; each
+    worker memory-maps it, so no strings are pickled. Workers write emotion
+    rows into a shared float32 matrix and return their keyword counters,
+    which are merged here. Small inputs, or workers=1, run in-process.
+    With row_keywords, each row's keywords are also returned as strings.
+    """
+    lexicon = lexicon or get_emotion_lexicon()
+    workers = MAX_WORKERS if workers is None else max(int(workers), 1)
+    column = _as_arrow(texts)
+    rows = len(column)
+    counter = KeywordCounter(stopwords, ngram_range, min_length)
+    arrays, names = [column], ["text"]
+    if segments is not None:
+        arrays.append(_as_arrow(segments, fill="(missing)"))
+        names.append("segment")
+    table = pa.Table.from_arrays(arrays, names=names)
+
+    if workers == 1 or rows < PARALLEL_MIN_ROWS:
+        emotions = np.zeros((rows, len(lexicon.emotions)), dtype=np.float32)
+        keywords = _analyze_batches(table.to_batches(max_chunksize=CHUNK_ROWS), counter, lexicon, emotions,
+                                    segments is not None, row_keywords)
+        return TextAnalytics(counter, emotions, list(lexicon.emotions), 1, keywords)
+
+    scratch = tempfile.mkdtemp(prefix="sami-text-", dir=SCRATCH_DIR)
+    try:
+        emotions_path = os.path.join(scratch, "emotions.f32")
+        _write_arrow(table, os.path.join(scratch, "texts.arrow"))
+        np.memmap(emotions_path, dtype=np.float32, mode="w+", shape=(rows, len(lexicon.emotions))).flush()
+
+        pool = get_process_pool(workers)
+        shards = _shards(rows, workers)
+        futures = [
+            pool.submit(_analyze_shard, scratch, lo, hi, rows, lexicon, counter.stopwords, ngram_range,
+                        min_length, segments is not None, row_keywords)
+            for lo, hi in shards
+        ]
+        for future in futures:
+            counter.merge(future.result())
+        emotions = np.array(np.memmap(emotions_path, dtype=np.float32, mode="r",
+                                      shape=(rows, len(lexicon.emotions))))
+        keywords = None
+        if row_keywords:
+            keywords = pa.concat_arrays([
+                _read_arrow(_keywords_path(scratch, lo)).column("keywords").combine_chunks() for lo, _ in shards
+            ])
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return TextAnalytics(counter, emotions, list(lexicon.emotions), workers, keywords)
+
+
+def analyze_chunks(chunks: Iterable[pd.DataFrame], text_col: str, segment_col: Optional[str] = None,
+                   stopwords=None, ngram_range: Tuple[int, int] = (1, 1), min_length: int = MIN_WORD_LENGTH,
+                   lexicon: Optional[EmotionLexicon] = None,
+                   stats: Optional[StatsAccumulator] = None) -> StreamedAnalytics:
+    """Single pass over streamed chunks (see utils.ingest.iter_upload_chunks):
+    keyword counts, summed emotion scores and the numeric StatsAccumulator
+    are all updated chunk by chunk, so the full frame never exists. Pass a
+    restored `stats` to extend an earlier summary with new rows only."""
+    lexicon = lexicon or get_emotion_lexicon()
+    counter = KeywordCounter(stopwords, ngram_range, min_length)
+    totals = np.zeros(len(lexicon.emotions), dtype=np.float64)
+    stats = stats or StatsAccumulator()
+    for chunk in chunks:
+        texts = _as_arrow(chunk[text_col])
+        counter.update(texts, chunk[segment_col] if segment_col else None)
+        totals += lexicon.score_chunk(texts).sum(axis=0)
+        stats.update(chunk)
+    return StreamedAnalytics(counter, dict(zip(lexicon.emotions, totals.tolist())), stats.to_frame(), counter.rows, stats)
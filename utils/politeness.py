@@ -0,0 +1,39 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host by a minimum interval.
+
+    Threads hitting different hosts never wait on each other; threads hitting
+    the same host each reserve the next free slot and sleep until it.
+    """
+
+    def __init__(self, min_interval: float = 1.0, intervals: Optional[Dict[str, float]] = None):
+        self.min_interval = min_interval
+        self.intervals = intervals or {}
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Block until a request to url's host is allowed; returns the delay"""
+        host = urlparse(url).netloc.lower()
+        interval = self.intervals.get(host, self.min_interval)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+# Shared by every scraper in the process
+host_limiter = HostRateLimiter(intervals={
+    "www.google.com": 2.0,
+    "www.reddit.com": 2.0,
+    "nitter.net": 1.5,
+})
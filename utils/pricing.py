@@ -0,0 +1,236 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+GRID_POINTS = 2000  # price grid resolution for the Van Westendorp curves
+TOP_BOX = 2  # on a rating scale, the top two answers count as "would buy"
+VW_QUESTIONS = ("too_cheap", "cheap", "expensive", "too_expensive")
+VW_LABELS = {"too_cheap": "Too cheap", "cheap": "Cheap", "expensive": "Expensive", "too_expensive": "Too expensive"}
+
+# matched against lower-cased column names with _ and - turned into spaces; the "too" questions are tried first
+VW_PATTERNS = {
+    "too_cheap": re.compile(r"\btoo (cheap|low|inexpensive)|\bso (cheap|low|inexpensive)|question (its|the) quality"),
+    "too_expensive": re.compile(r"\btoo (expensive|high|pricey|costly)|\bso (expensive|high)|prohibitive|never (buy|consider)"),
+    "cheap": re.compile(r"\bcheap|bargain|good value|\binexpensive"),
+    "expensive": re.compile(r"\bexpensive|pricey|high side|costly"),
+}
+NUMBER = r"(?<![a-z\d])\d[\d,]*(?:\.\d+)?"  # not glued to letters, so "q7" is not a price
+# a number right after a currency sign or "at", or right before a currency code; else the last number in the name
+GG_PRICE_RE = re.compile(rf"(?:[$€£¥]|\bat)\s*({NUMBER})|({NUMBER})\s*(?:[$€£¥]|\b(?:usd|eur|gbp|dollars?|euros?))")
+GG_NUMBER_RE = re.compile(NUMBER)
+GG_NAME_RE = re.compile(r"buy|purchase|pay|subscribe|would you|likel")
+YES_VALUES = {"yes", "y", "true", "1", "definitely", "probably", "would buy"}
+
+
+def _column_text(column) -> str:
+    return re.sub(r"[_\-]+", " ", str(column)).lower()
+
+
+def price_values(series: pd.Series) -> np.ndarray:
+    """Numeric prices from a column, stripping currency symbols and thousands separators from text"""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.to_numpy(dtype="float64", na_value=np.nan)
+    cleaned = series.astype("str").str.replace(r"[^\d.\-]", "", regex=True)
+    return pd.to_numeric(cleaned.where(series.notna()), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+
+def format_price(value: float) -> str:
+    """A price point for display or a prompt; NaN (curves that never cross) reads as not found"""
+    return "not found" if pd.isna(value) else f"{value:,.2f}"
+
+
+def detect_van_westendorp(columns: Sequence) -> Dict[str, str]:
+    """Map too_cheap/cheap/expensive/too_expensive to column names; empty unless all four are found"""
+    found, taken = {}, set()
+    for question in ("too_cheap", "too_expensive", "cheap", "expensive"):
+        for column in columns:
+            if column not in taken and VW_PATTERNS[question].search(_column_text(column)):
+                found[question] = column
+                taken.add(column)
+                break
+    return found if len(found) == 4 else {}
+
+
+def column_price(column) -> Optional[float]:
+    """The price in a column name such as 'Q7 Would buy at $1,299.99', if any: the number
+    after a currency sign or "at", else the last number, so question numbers and years are
+    skipped. Commas are thousands separators, as in price_values."""
+    text = _column_text(column)
+    match = GG_PRICE_RE.search(text)
+    if match:
+        number = match.group(1) or match.group(2)
+    else:
+        numbers = GG_NUMBER_RE.findall(text)
+        if not numbers:
+            return None
+        number = numbers[-1]
+    return float(number.replace(",", ""))
+
+
+def detect_gabor_granger(columns: Sequence) -> Dict[str, float]:
+    """Purchase-intent columns named after a price -> {column: price}; at least two price points"""
+    prices = {c: column_price(c) for c in columns if GG_NAME_RE.search(_column_text(c)) and column_price(c) is not None}
+    return prices if len(set(prices.values())) >= 2 else {}
+
+
+@dataclass
+class VanWestendorp:
+    """Van Westendorp price sensitivity: cumulative curves on a price grid and the four intersections"""
+    curves: pd.DataFrame
+    points: Dict[str, float]
+    respondents: int
+    dropped: int
+    inconsistent: int
+
+    @property
+    def acceptable_range(self):
+        return self.points["PMC"], self.points["PME"]
+
+    def prompt_context(self) -> str:
+        pmc, pme = self.acceptable_range
+        return (f"Van Westendorp price sensitivity ({self.respondents:,} respondents"
+                f"{f', {self.inconsistent:,} inconsistent answers left out' if self.inconsistent else ''}): "
+                f"acceptable price range {format_price(pmc)} (PMC) to {format_price(pme)} (PME); "
+                f"optimal price point {format_price(self.points['OPP'])}; "
+                f"indifference price point {format_price(self.points['IPP'])}.")
+
+
+@dataclass
+class GaborGranger:
+    """Gabor-Granger demand and revenue: `table` per tested price, `curve` interpolated on a grid"""
+    table: pd.DataFrame
+    curve: pd.DataFrame
+    optimal_price: float
+    respondents: int
+
+    def prompt_context(self) -> str:
+        points = ", ".join(f"{row.price:.2f}: {row.demand * 100:.0f}%" for row in self.table.itertuples(index=False))
+        best = self.table.loc[self.table["revenue_index"].idxmax()]
+        return (f"Gabor-Granger ({self.respondents:,} respondents), share who would buy at each price: {points}. "
+                f"Revenue peaks at {best.price:.2f} among tested prices (about {self.optimal_price:.2f} interpolated).")
+
+
+def _crossing(grid: np.ndarray, a: np.ndarray, b: np.ndarray) -> float:
+    """Price where curve a - b first changes sign, linearly interpolated between grid points"""
+    diff = a - b
+    sign = np.sign(diff)
+    change = np.flatnonzero(sign[:-1] * sign[1:] <= 0)
+    change = change[(sign[change] != 0) | (sign[change + 1] != 0)]
+    if not len(change):
+        return float("nan")
+    i = change[0]
+    if diff[i] == diff[i + 1]:
+        return float(grid[i])
+    return float(grid[i] + (grid[i + 1] - grid[i]) * diff[i] / (diff[i] - diff[i + 1]))
+
+
+def van_westendorp(df: pd.DataFrame, columns: Dict[str, str], consistent_only: bool = True,
+                   grid_points: int = GRID_POINTS) -> VanWestendorp:
+    """Cumulative Van Westendorp curves over a fine price grid and their intersections.
+
+    Too cheap / cheap are shares naming a price at or above p, expensive / too
+    expensive shares at or below p; each curve is one searchsorted of the sorted
+    answers against the grid. OPP = too cheap x too expensive, IPP = cheap x
+    expensive, PMC = too cheap x not cheap, PME = too expensive x not expensive.
+    Respondents missing an answer, or (with consistent_only) not answering
+    too cheap <= cheap <= expensive <= too expensive, are left out."""
+    answers = np.column_stack([price_values(df[columns[q]]) for q in VW_QUESTIONS])
+    complete = ~np.isnan(answers).any(axis=1)
+    ordered = complete & (np.diff(answers, axis=1) >= 0).all(axis=1)
+    keep = ordered if consistent_only else complete
+    answers = answers[keep]
+    if len(answers) < 2:
+        raise ValueError("Not enough complete Van Westendorp answers to compute the curves")
+    sorted_answers = np.sort(answers, axis=0)
+    grid = np.linspace(sorted_answers[0].min(), sorted_answers[-1].max(), grid_points)
+    n = len(answers)
+    at_or_above = {q: 1 - np.searchsorted(sorted_answers[:, i], grid, side="left") / n for i, q in enumerate(VW_QUESTIONS)}
+    at_or_below = {q: np.searchsorted(sorted_answers[:, i], grid, side="right") / n for i, q in enumerate(VW_QUESTIONS)}
+    curves = pd.DataFrame({
+        "price": grid,
+        "too_cheap": at_or_above["too_cheap"],
+        "cheap": at_or_above["cheap"],
+        "expensive": at_or_below["expensive"],
+        "too_expensive": at_or_below["too_expensive"],
+    })
+    curves["not_cheap"] = 1 - curves["cheap"]
+    curves["not_expensive"] = 1 - curves["expensive"]
+    c = {name: curves[name].to_numpy() for name in curves.columns}
+    points = {
+        "PMC": _crossing(grid, c["too_cheap"], c["not_cheap"]),
+        "OPP": _crossing(grid, c["too_cheap"], c["too_expensive"]),
+        "IPP": _crossing(grid, c["cheap"], c["expensive"]),
+        "PME": _crossing(grid, c["too_expensive"], c["not_expensive"]),
+    }
+    return VanWestendorp(curves, points, n, int((~complete).sum()), int((complete & ~ordered).sum()) if consistent_only else 0)
+
+
+def purchase_intent(values: pd.Series, scale_max: Optional[float] = None) -> np.ndarray:
+    """1 = would buy, 0 = would not, NaN = no answer. Yes/no and 0/1 answers are
+    read directly, 1/2 codes as 1 = yes, 2 = no; on a rating scale (top answer 3
+    or more) the top TOP_BOX answers count as buying. Other numeric codes with a
+    top answer of 2 are ambiguous and raise ValueError."""
+    if pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype="float64", na_value=np.nan)
+    if pd.api.types.is_numeric_dtype(values):
+        numbers = values.to_numpy(dtype="float64", na_value=np.nan)
+        missing = np.isnan(numbers)
+        top = scale_max if scale_max is not None else np.nanmax(numbers, initial=0)
+        if top <= 1:
+            return numbers
+        if top < 3:
+            if set(np.unique(numbers[~missing]).tolist()) <= {1.0, 2.0}:
+                return np.where(missing, np.nan, numbers == 1)
+            raise ValueError(f"Can't tell who would buy from the codes in '{values.name}': use 0/1, "
+                             f"1 = yes / 2 = no, yes/no or a rating scale of 3 or more points")
+        return np.where(missing, np.nan, numbers > top - TOP_BOX)
+    text = values.astype("str").str.strip().str.lower()
+    return np.where(values.isna(), np.nan, text.isin(YES_VALUES)).astype("float64")
+
+
+def gabor_granger(df: pd.DataFrame, prices: Optional[Dict[str, float]] = None, price_col: Optional[str] = None,
+                  response_col: Optional[str] = None, grid_points: int = GRID_POINTS) -> GaborGranger:
+    """Demand (share who would buy) and revenue index (price x demand) per tested price.
+
+    Wide data: `prices` maps one purchase-intent column per price point
+    ({"Buy at $10": 10, ...}). Long data: `price_col` holds the price each
+    respondent was shown and `response_col` their answer. Demand is also
+    interpolated on a fine grid to locate the revenue-maximising price."""
+    if price_col and response_col:
+        price = price_values(df[price_col])
+        intent = purchase_intent(df[response_col])
+        valid = ~np.isnan(price) & ~np.isnan(intent)
+        frame = pd.DataFrame({"price": price[valid], "intent": intent[valid]})
+        grouped = frame.groupby("price")["intent"]
+        table = pd.DataFrame({"respondents": grouped.size(), "demand": grouped.mean()}).reset_index()
+        respondents = int(valid.sum())
+    elif prices:
+        columns = list(prices)
+        numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        scale_max = float(np.nanmax(df[numeric].to_numpy(dtype="float64", na_value=np.nan), initial=0)) if numeric else None
+        intent = np.column_stack([purchase_intent(df[c], scale_max) for c in columns])
+        answered = ~np.isnan(intent)
+        table = pd.DataFrame({
+            "price": [prices[c] for c in columns],
+            "respondents": answered.sum(axis=0),
+            "demand": np.nansum(intent, axis=0) / np.maximum(answered.sum(axis=0), 1),
+        }).groupby("price", as_index=False).agg(respondents=("respondents", "sum"), demand=("demand", "mean"))
+        respondents = int(answered.any(axis=1).sum())
+    else:
+        raise ValueError("Give either price point columns or a price and a response column")
+    table = table[table["respondents"] > 0].sort_values("price").reset_index(drop=True)
+    if len(table) < 2:
+        raise ValueError("Gabor-Granger needs answers at two or more price points")
+    table["revenue_index"] = table["price"] * table["demand"]
+    # arc (midpoint) elasticity from the previous tested price
+    demand_change = table["demand"].diff() / table["demand"].rolling(2).mean()
+    price_change = table["price"].diff() / table["price"].rolling(2).mean()
+    table["elasticity"] = (demand_change / price_change).replace([np.inf, -np.inf], np.nan)
+    grid = np.linspace(table["price"].iloc[0], table["price"].iloc[-1], grid_points)
+    demand = np.interp(grid, table["price"], table["demand"])
+    curve = pd.DataFrame({"price": grid, "demand": demand, "revenue_index": grid * demand})
+    optimal = float(grid[np.argmax(curve["revenue_index"].to_numpy())])
+    return GaborGranger(table, curve, optimal, respondents)
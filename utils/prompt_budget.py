@@ -0,0 +1,122 @@
+import json
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# Context windows in tokens (prompt + completion)
+MODEL_CONTEXT_WINDOWS: Dict[str, int] = {
+    "gpt-3.5-turbo": 16_385,
+    "gpt-4": 8_192,
+    "gpt-4-turbo": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4o-mini": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+RESERVED_COMPLETION_TOKENS = 1_000
+
+# Short names for the keys our scrapers emit
+FIELD_ALIASES: Dict[str, str] = {
+    "content": "c",
+    "comment": "m",
+    "title": "h",
+    "source": "s",
+    "date": "d",
+    "sentiment": "v",
+    "type": "t",
+    "url": "u",
+}
+DROP_KEYS = ("url",)
+
+
+@dataclass
+class PackedRecords:
+    """Serialized records that fit a token budget"""
+    text: str
+    tokens: int
+    included: int
+    dropped: int
+
+
+def context_window(model: str) -> int:
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def prompt_budget(model: str, reserved: int = RESERVED_COMPLETION_TOKENS,
+                  max_prompt_tokens: Optional[int] = None) -> int:
+    """Tokens available for the prompt once the completion is reserved"""
+    budget = context_window(model) - reserved
+    if max_prompt_tokens is not None:
+        budget = min(budget, max_prompt_tokens)
+    return max(budget, 0)
+
+
+def fit_text(text: str, model: str, budget: int) -> str:
+    """Truncate free text to the budget, saying so at the end"""
+    if count_tokens(text, model) <= budget:
+        return text
+    note = "\n[...truncated to fit the model context]"
+    return truncate_to_tokens(text, budget - count_tokens(note, model), model) + note
+
+
+def compact_records(records: List[Dict], drop_keys: Iterable[str] = DROP_KEYS,
+                    aliases: Dict[str, str] = FIELD_ALIASES):
+    """Shorten records for a prompt.
+
+    Drops empty values and the given keys, renames keys to their aliases and
+    hoists values shared by every record into one header dict. Returns
+    (common, rows, legend).
+    """
+    drop_keys = set(drop_keys)
+    rows, legend = [], {}
+    for record in records:
+        row = {}
+        for key, value in record.items():
+            if key in drop_keys or value is None or value == "":
+                continue
+            alias = aliases.get(key, key)
+            if alias != key:
+                legend.setdefault(alias, key)
+            row[alias] = value
+        rows.append(row)
+
+    common = {}
+    if len(rows) > 1:
+        for key, value in rows[0].items():
+            if all(key in row and row[key] == value for row in rows[1:]):
+                common[key] = value
+        for row in rows:
+            for key in common:
+                del row[key]
+
+    return common, rows, legend
+
+
+def pack_records(records: List[Dict], model: str, budget: int,
+                 priority: Optional[Callable[[Dict], float]] = None,
+                 drop_keys: Iterable[str] = DROP_KEYS) -> PackedRecords:
+    """Serialize as many records as fit in budget tokens, highest priority first"""
+    records = [dict(r) for r in records]
+    if priority is not None:
+        records = sorted(records, key=priority, reverse=True)
+
+    common, rows, legend = compact_records(records, drop_keys)
+    header = []
+    if legend:
+        header.append("Fields: " + ", ".join(f"{a}={k}" for a, k in legend.items()))
+    if common:
+        header.append("All records: " + json.dumps(common, ensure_ascii=False, separators=(",", ":"), default=str))
+    header_text = "\n".join(header)
+    used = count_tokens(header_text, model) + 1 if header_text else 0
+
+    lines = []
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=str)
+        tokens = count_tokens(line, model) + 1
+        if used + tokens > budget:
+            continue  # a shorter record further down may still fit
+        lines.append(line)
+        used += tokens
+
+    text = "\n".join(([header_text] if header_text else []) + lines)
+    return PackedRecords(text=text, tokens=used, included=len(lines), dropped=len(rows) - len(lines))
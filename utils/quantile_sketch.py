@@ -0,0 +1,107 @@
+from typing import Sequence
+
+import numpy as np
+
+DEFAULT_K = 1024  # exact up to this many values; rank error about 0.2% beyond
+COMPACTOR_DECAY = 2 / 3
+
+
+def _merge_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Merge two sorted arrays in linear time"""
+    if not len(a):
+        return b
+    if not len(b):
+        return a
+    out = np.empty(len(a) + len(b), dtype=np.float64)
+    positions = np.searchsorted(a, b, side="right") + np.arange(len(b))
+    taken = np.zeros(len(out), dtype=bool)
+    taken[positions] = True
+    out[positions] = b
+    out[~taken] = a
+    return out
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin, Lang & Liberty's KLL).
+
+    Values go into level 0; a level over capacity is compacted by promoting
+    every other item (random offset) to the level above, where each item
+    counts double. Levels are kept sorted, so a sorted batch is absorbed
+    without re-sorting. Below `k` values the sketch is exact.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: int = 0):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        return max(int(np.ceil(self.k * COMPACTOR_DECAY ** (len(self.levels) - level - 1))), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                even = len(items) - len(items) % 2
+                promoted = items[int(self._rng.integers(2)):even:2]
+                self.levels[level] = items[even:]
+                self.levels[level + 1] = _merge_sorted(self.levels[level + 1], promoted)
+            level += 1
+
+    def update(self, values, is_sorted: bool = False) -> "KLLSketch":
+        """Add a batch of values (NaN ignored). Pass is_sorted for an
+        ascending batch without NaN to skip the sort."""
+        values = np.asarray(values, dtype=np.float64)
+        if not is_sorted:
+            values = np.sort(values[~np.isnan(values)])
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = _merge_sorted(self.levels[0], values)
+            self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = _merge_sorted(self.levels[level], items)
+        self.n += other.n
+        self._compress()
+        return self
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state; from_dict restores it"""
+        return {"k": self.k, "n": self.n, "levels": [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state: dict, seed: int = 0) -> "KLLSketch":
+        sketch = cls(state["k"], seed)
+        sketch.n = state["n"]
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state["levels"]] or sketch.levels
+        return sketch
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Quantiles like np.quantile (linear interpolation) while exact, else
+        the weighted inverse CDF of the retained items"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        if self.exact:
+            return np.quantile(self.levels[0], qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, qs * self.n, side="left")
+        return items[order][np.minimum(index, len(items) - 1)]
+
+    def quantile(self, q: float) -> float:
+        return float(self.quantiles([q])[0])
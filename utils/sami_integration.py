@@ -1,8 +1,13 @@
 import json
-import openai
 from typing import Dict, List
 from datetime import datetime
 
+from utils.gpt_cache import cached_completion
+from utils.gpt_client import get_client
+from utils.map_reduce import map_reduce_comments
+from utils.prompt_budget import pack_records, prompt_budget
+from utils.tokens import count_tokens
+
 class SAMIAnalyzer:
     def __init__(self):
         self.config = {
@@ -10,32 +15,46 @@ class SAMIAnalyzer:
             "instructions": "...",  # Your existing instructions
             "prompt_suggestions": [...]  # Your existing suggestions
         }
-        self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.model = "gpt-4-turbo"
+        self.client = get_client(self.model)
+        self.max_prompt_tokens = 12000
+        self.records_dropped = 0
 
     def generate_report(self, scraped_data: List[Dict], analysis_type: str) -> Dict:
         """Generate SAMI-style reports from scraped data"""
-        prompt = self._build_sami_prompt(scraped_data, analysis_type)
+        if hasattr(scraped_data, "to_dict"):  # hybrid_scrape returns a DataFrame
+            scraped_data = scraped_data.to_dict("records")
+        digest = map_reduce_comments((d.get('content') for d in scraped_data))
+        prompt = self._build_sami_prompt(scraped_data, analysis_type, digest)
         
-        response = self.client.chat.completions.create(
-            model="gpt-4-turbo",
+        content = cached_completion(
+            self.client,
+            model=self.model,
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.3
         )
         
-        return self._format_sami_output(json.loads(response.choices[0].message.content))
+        return self._format_sami_output(json.loads(content))
 
-    def _build_sami_prompt(self, data: List[Dict], analysis_type: str) -> str:
+    def _build_sami_prompt(self, data: List[Dict], analysis_type: str, digest: Dict) -> str:
         """Construct SAMI-compatible prompt"""
         base = self.config['instructions']
-        examples = "\n".join(f"- {d['content'][:100]}..." for d in data[:5])
+        digest_text = json.dumps(digest)
+        # The digest covers everything; raw mentions fill whatever budget is left
+        budget = prompt_budget(self.model, max_prompt_tokens=self.max_prompt_tokens)
+        budget -= count_tokens(base + digest_text, self.model) + 300
+        sample = pack_records(data, self.model, max(budget, 0))
+        self.records_dropped = sample.dropped
         
         return f"""
         {base}
         
         ANALYSIS REQUEST: {analysis_type}
-        DATA SAMPLE:
-        {examples}
+        AGGREGATED ANALYSIS OF ALL {digest['comments_analyzed']} MENTIONS:
+        {digest_text}
+        DATA SAMPLE ({sample.included} of {len(data)} mentions, one JSON record per line):
+        {sample.text}
         
         RESPONSE FORMAT:
         {{
@@ -53,6 +72,7 @@ class SAMIAnalyzer:
             "title": self.config['title'],
             "timestamp": datetime.now().isoformat(),
             "analysis": raw,
+            "records_dropped": self.records_dropped,
             "visual_metaphors": [
                 "chess_piece" if raw.get('sentiment_breakdown', {}).get('positive', 0) > 60 else "warning_sign",
                 "thermometer" if any(e['emotion'] == 'frustration' for e in raw.get('emotional_analysis', [])) else "sun"
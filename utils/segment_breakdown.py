@@ -0,0 +1,63 @@
+from typing import List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from utils.keywords import _as_arrow
+
+MAX_SEGMENT_LEVELS = 200  # columns with more distinct values are not offered as segments
+
+
+def emotion_column(name: str) -> str:
+    return f"emotion_{name.lower().replace(' ', '_')}"
+
+
+def annotate_feedback(df: pd.DataFrame, analytics) -> pd.DataFrame:
+    """The uploaded frame plus one score column per emotion, the dominant
+    emotion and the row's keywords (when analyze_text ran with row_keywords)"""
+    columns = {emotion_column(name): analytics.emotions[:, i] for i, name in enumerate(analytics.emotion_names)}
+    names = np.array(analytics.emotion_names + ["None"], dtype=object)
+    strongest = analytics.emotions.argmax(axis=1) if len(analytics.emotion_names) else np.zeros(len(df), dtype=int)
+    has_emotion = analytics.emotions.any(axis=1) if len(analytics.emotion_names) else np.zeros(len(df), dtype=bool)
+    columns["dominant_emotion"] = names[np.where(has_emotion, strongest, len(names) - 1)]
+    if analytics.row_keywords is not None:
+        columns["keywords"] = analytics.row_keywords.to_numpy(zero_copy_only=False)
+    # a re-uploaded export already carries these columns: replace them rather than duplicate them
+    existing = df.drop(columns=[c for c in columns if c in df.columns])
+    return pd.concat([existing.reset_index(drop=True), pd.DataFrame(columns)], axis=1)
+
+
+def segment_columns(df: pd.DataFrame, exclude: Sequence[str] = ()) -> List[str]:
+    """Columns usable as segments: few distinct values (region, product, NPS band)"""
+    exclude = set(exclude)
+    return [c for c in df.columns if c not in exclude and df[c].nunique(dropna=True) <= MAX_SEGMENT_LEVELS]
+
+
+def emotion_breakdown(annotated: pd.DataFrame, by: Union[str, List[str]], emotion_names: Sequence[str]) -> pd.DataFrame:
+    """Responses, mean emotion scores and dominant emotion per segment"""
+    keys = [annotated[c] for c in ([by] if isinstance(by, str) else by)]
+    scores = annotated[[emotion_column(name) for name in emotion_names]].set_axis(list(emotion_names), axis=1)
+    grouped = scores.groupby(keys, observed=True, dropna=False)
+    means = grouped.mean()
+    breakdown = pd.DataFrame({
+        "responses": grouped.size(),
+        "with_emotion_%": (scores.gt(0).any(axis=1).groupby(keys, observed=True, dropna=False).mean() * 100).round(1),
+    }).join(means.round(3))
+    breakdown["dominant_emotion"] = means.idxmax(axis=1).where(means.max(axis=1) > 0, "None")
+    return breakdown.reset_index()
+
+
+def keyword_breakdown(annotated: pd.DataFrame, by: str, top_n: int = 5) -> pd.DataFrame:
+    """Most frequent keywords per segment, counted over the per-row keyword column"""
+    if "keywords" not in annotated.columns:
+        return pd.DataFrame(columns=[by, "keyword", "responses"])
+    lists = pc.split_pattern(_as_arrow(annotated["keywords"]), ", ")
+    keywords = pc.list_flatten(lists)
+    segments = pc.take(_as_arrow(annotated[by], fill="(missing)"), pc.list_parent_indices(lists))
+    table = pa.table({by: segments, "keyword": keywords}).filter(pc.not_equal(keywords, ""))
+    counts = table.group_by([by, "keyword"]).aggregate([([], "count_all")]).to_pandas()
+    counts = counts.rename(columns={"count_all": "responses"})
+    return (counts.sort_values([by, "responses", "keyword"], ascending=[True, False, True])
+            .groupby(by, sort=False).head(top_n).reset_index(drop=True))
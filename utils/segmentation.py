@@ -0,0 +1,256 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+MAX_ONE_HOT_LEVELS = 20  # text columns with more distinct values are not one-hot encoded
+BATCH_ROWS = 4096  # rows drawn per mini-batch update
+MAX_ITERATIONS = 150
+CENTER_TOLERANCE = 1e-4  # stop once no center moves more than this (in standard deviations)
+MAX_NO_IMPROVEMENT = 10  # ...or once the smoothed batch inertia has not improved for this many batches
+SILHOUETTE_SAMPLE = 2000  # rows used for k-means++ seeding and the silhouette score
+LABEL_BLOCK_ROWS = 65_536  # rows transformed at a time when labelling the whole file
+K_RANGE = (2, 8)
+PROMPT_FEATURES = 3
+
+_ID_RE = re.compile(r"(^|[_\s])id$", re.IGNORECASE)
+
+
+@dataclass
+class FeatureSpec:
+    """How to turn rows of the upload into the clustering space: numeric columns
+    standardized (missing -> mean), text columns one-hot over their levels"""
+    numeric: List[str]
+    means: np.ndarray
+    stds: np.ndarray
+    categorical: Dict[str, list]
+    names: List[str] = field(init=False)
+
+    def __post_init__(self):
+        self.names = list(self.numeric) + [f"{col}={level}" for col, levels in self.categorical.items() for level in levels]
+
+
+class EncodedRows:
+    """The upload's clustering columns, encoded once: numeric columns as NumPy
+    arrays (views of the frame where the dtype allows) and text columns as
+    level codes. take() builds the dense standardized/one-hot matrix for just
+    the requested rows, so the full feature matrix never exists."""
+
+    def __init__(self, df: pd.DataFrame, spec: FeatureSpec):
+        self.spec = spec
+        self.numeric = [df[c].to_numpy(dtype="float64", na_value=np.nan)
+                        if pd.api.types.is_extension_array_dtype(df[c]) else df[c].to_numpy() for c in spec.numeric]
+        self.codes = [pd.Categorical(df[c], categories=levels).codes for c, levels in spec.categorical.items()]
+        self.rows = len(df)
+
+    def take(self, index) -> np.ndarray:
+        spec = self.spec
+        columns = [values[index] for values in self.numeric] + [codes[index] for codes in self.codes]
+        out = np.zeros((len(columns[0]), len(spec.names)), dtype=np.float32)
+        for j, values in enumerate(columns[:len(spec.numeric)]):
+            out[:, j] = (values - spec.means[j]) / spec.stds[j]
+        np.nan_to_num(out[:, :len(spec.numeric)], copy=False)
+        offset = len(spec.numeric)
+        rows = np.arange(len(out))
+        for codes, levels in zip(columns[len(spec.numeric):], spec.categorical.values()):
+            hit = codes >= 0
+            out[rows[hit], offset + codes[hit]] = 1
+            offset += len(levels)
+        return out
+
+
+@dataclass
+class Segmentation:
+    """Mini-batch k-means result: one label per row (1 = largest segment) and per-segment profiles"""
+    k: int
+    labels: np.ndarray
+    profiles: pd.DataFrame
+    silhouette: Dict[int, float]
+    inertia: float
+    spec: FeatureSpec
+    lift: Dict[int, List[str]]
+
+    def prompt_context(self) -> str:
+        """Compact segment profiles for a GPT prompt (no raw rows)"""
+        n = len(self.labels)
+        lines = [f"Segmentation: {self.k} segments of {n:,} rows (mini-batch k-means on "
+                 f"{len(self.spec.numeric)} standardized numeric and {len(self.spec.names) - len(self.spec.numeric)} "
+                 f"one-hot features, silhouette {self.silhouette.get(self.k, float('nan')):.2f})."]
+        for row in self.profiles.itertuples(index=False):
+            lines.append(f"Segment {row.segment} ({row.share:.1f}%, {row.size:,} rows): " + "; ".join(self.lift[row.segment]))
+        return "\n".join(lines)
+
+
+def default_columns(df: pd.DataFrame, max_levels: int = MAX_ONE_HOT_LEVELS) -> List[str]:
+    """Numeric columns plus low-cardinality text columns, skipping ID-like names"""
+    columns = []
+    for col in df.columns:
+        if _ID_RE.search(str(col)):
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            columns.append(col)
+        elif df[col].nunique(dropna=True) <= max_levels:
+            columns.append(col)
+    return columns
+
+
+def feature_spec(df: pd.DataFrame, columns: Sequence[str], max_levels: int = MAX_ONE_HOT_LEVELS) -> FeatureSpec:
+    numeric = [c for c in columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    categorical = {}
+    for col in columns:
+        if col not in numeric:
+            counts = df[col].value_counts(dropna=True)
+            if len(counts):
+                categorical[col] = list(counts.index[:max_levels])
+    means = df[numeric].mean().to_numpy(dtype="float32") if numeric else np.zeros(0, dtype=np.float32)
+    stds = df[numeric].std().fillna(0).to_numpy(dtype="float32") if numeric else np.zeros(0, dtype=np.float32)
+    return FeatureSpec(numeric, means, np.where(stds > 0, stds, 1).astype(np.float32), categorical)
+
+
+def _assign(x: np.ndarray, centers: np.ndarray):
+    """Nearest center and squared distance for every row"""
+    distances = (x ** 2).sum(axis=1)[:, None] - 2 * x @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    labels = distances.argmin(axis=1)
+    return labels, np.maximum(distances[np.arange(len(x)), labels], 0)
+
+
+def _kmeans_pp(x: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = [x[rng.integers(len(x))]]
+    closest = ((x - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = closest.sum()
+        pick = rng.choice(len(x), p=closest / total) if total > 0 else rng.integers(len(x))
+        centers.append(x[pick])
+        closest = np.minimum(closest, ((x - x[pick]) ** 2).sum(axis=1))
+    return np.array(centers, dtype=np.float32)
+
+
+def minibatch_kmeans(rows: EncodedRows, k: int, seed_rows: np.ndarray,
+                     batch_rows: int = BATCH_ROWS, max_iterations: int = MAX_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """Sculley's mini-batch k-means: each step transforms `batch_rows` random rows
+    and moves every center toward the mean of its rows by 1/(rows seen so far),
+    so memory is one batch however large the file. Stops early when the centers
+    settle or the smoothed batch inertia stops improving. Returns the centers."""
+    rng = np.random.default_rng(seed)
+    centers = _kmeans_pp(seed_rows, k, rng)
+    seen = np.zeros(k)
+    smoothed, best, stale = None, np.inf, 0
+    for _ in range(max_iterations):
+        batch = rows.take(np.sort(rng.integers(0, rows.rows, min(batch_rows, rows.rows))))
+        labels, distances = _assign(batch, centers)
+        inertia = distances.mean()
+        smoothed = inertia if smoothed is None else 0.9 * smoothed + 0.1 * inertia
+        if smoothed < best:
+            best, stale = smoothed, 0
+        else:
+            stale += 1
+            if stale >= MAX_NO_IMPROVEMENT:
+                break
+        counts = np.bincount(labels, minlength=k)
+        members = np.zeros((k, len(batch)), dtype=np.float32)
+        members[labels, np.arange(len(batch))] = 1
+        sums = members @ batch
+        seen += counts
+        moved = counts > 0
+        step = (counts[moved] / seen[moved])[:, None]
+        previous = centers.copy()
+        centers[moved] += step * (sums[moved] / counts[moved][:, None] - centers[moved])
+        if np.abs(centers - previous).max() < CENTER_TOLERANCE:
+            break
+    return centers
+
+
+def silhouette_score(x: np.ndarray, labels: np.ndarray, distances: Optional[np.ndarray] = None) -> float:
+    """Mean silhouette of sampled rows, from one pairwise distance matrix:
+    per-cluster distance sums are a single matrix product"""
+    if distances is None:
+        squared = (x ** 2).sum(axis=1)
+        distances = np.sqrt(np.maximum(squared[:, None] - 2 * x @ x.T + squared[None, :], 0))
+    k = labels.max() + 1
+    members = np.zeros((len(x), k), dtype=distances.dtype)
+    members[np.arange(len(x)), labels] = 1
+    sizes = members.sum(axis=0)
+    totals = distances @ members
+    own = sizes[labels] - 1
+    a = np.where(own > 0, totals[np.arange(len(x)), labels] / np.maximum(own, 1), 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        others = np.where(members.astype(bool) | (sizes == 0)[None, :], np.inf, totals / sizes[None, :])
+    b = others.min(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s = np.where((own > 0) & np.isfinite(b), (b - a) / np.maximum(a, b), 0)
+    return float(np.nan_to_num(s).mean())
+
+
+def _profiles(df: pd.DataFrame, spec: FeatureSpec, labels: np.ndarray, k: int):
+    """Size, share, numeric means and top level of each text column per segment (pandas groupby),
+    plus each segment's most distinctive features for the prompt"""
+    sizes = np.bincount(labels, minlength=k)
+    profiles = pd.DataFrame({"segment": np.arange(1, k + 1), "size": sizes, "share": sizes / len(labels) * 100})
+    lift = {segment: [] for segment in range(1, k + 1)}
+    if spec.numeric:
+        means = df[spec.numeric].groupby(labels).mean().reindex(range(k))
+        for col in spec.numeric:
+            profiles[col] = means[col].to_numpy()
+        z = (means.to_numpy(dtype="float64") - spec.means) / spec.stds
+        for i in range(k):
+            for j in np.argsort(-np.abs(np.nan_to_num(z[i])))[:PROMPT_FEATURES]:
+                if abs(z[i, j]) >= 0.1:
+                    lift[i + 1].append(f"{spec.numeric[j]} {z[i, j]:+.1f} sd")
+    for col in spec.categorical:
+        shares = df[col].groupby(labels).value_counts(normalize=True).unstack(fill_value=0).reindex(range(k), fill_value=0)
+        overall = df[col].value_counts(normalize=True)
+        top = shares.idxmax(axis=1)
+        profiles[f"{col} (top)"] = [f"{level} ({shares.loc[i, level] * 100:.0f}%)" if shares.loc[i].sum() else ""
+                                    for i, level in zip(range(k), top)]
+        gain = shares - overall.reindex(shares.columns, fill_value=0)
+        for i in range(k):
+            level = gain.loc[i].idxmax() if len(gain.columns) else None
+            if level is not None and gain.loc[i, level] >= 0.05:
+                lift[i + 1].append(f"{col}={level} {shares.loc[i, level] * 100:.0f}% (vs {overall[level] * 100:.0f}% overall)")
+    return profiles, lift
+
+
+def segment(df: pd.DataFrame, columns: Optional[Sequence[str]] = None, k: Optional[int] = None,
+            k_range: Sequence[int] = K_RANGE, seed: int = 0, progress=None) -> Segmentation:
+    """Cluster the upload's rows with mini-batch k-means on standardized numeric and
+    one-hot text columns. With k=None every k in `k_range` is fitted and the one
+    with the best sampled silhouette kept. Rows are labelled block by block."""
+    columns = list(columns) if columns else default_columns(df)
+    if not columns:
+        raise ValueError("No numeric or low-cardinality columns to segment on")
+    if len(df) < 3:
+        raise ValueError("Need at least 3 rows to segment")
+    spec = feature_spec(df, columns)
+    if not spec.names:
+        raise ValueError("The selected columns have no values to segment on")
+    rows = EncodedRows(df, spec)
+    rng = np.random.default_rng(seed)
+    sample = rows.take(np.sort(rng.choice(len(df), min(SILHOUETTE_SAMPLE, len(df)), replace=False)))
+    squared = (sample ** 2).sum(axis=1)
+    distances = np.sqrt(np.maximum(squared[:, None] - 2 * sample @ sample.T + squared[None, :], 0))
+
+    candidates = [k] if k else list(range(k_range[0], min(k_range[1], len(sample) - 1) + 1))
+    scores, fitted = {}, {}
+    for i, candidate in enumerate(candidates):
+        fitted[candidate] = minibatch_kmeans(rows, candidate, sample, seed=seed)
+        scores[candidate] = silhouette_score(sample, _assign(sample, fitted[candidate])[0], distances)
+        if progress:
+            progress((i + 1) / (len(candidates) + 1), f"k={candidate}: silhouette {scores[candidate]:.3f}")
+    best = max(scores, key=lambda c: (round(scores[c], 3), -c))
+    centers = fitted[best]
+
+    labels = np.empty(len(df), dtype=np.int32)
+    inertia = 0.0
+    for start in range(0, len(df), LABEL_BLOCK_ROWS):
+        block_labels, block_distances = _assign(rows.take(slice(start, start + LABEL_BLOCK_ROWS)), centers)
+        labels[start:start + len(block_labels)] = block_labels
+        inertia += float(block_distances.sum())
+    # number segments by size, largest first
+    order = np.argsort(-np.bincount(labels, minlength=best), kind="stable")
+    labels = np.argsort(order).astype(np.int32)[labels]
+    profiles, lift = _profiles(df, spec, labels, best)
+    if progress:
+        progress(1.0, f"{best} segments")
+    return Segmentation(best, labels + 1, profiles, scores, inertia, spec, lift)
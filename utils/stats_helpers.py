@@ -1,13 +1,245 @@
 
+import numpy as np
 import pandas as pd
 
+from utils.quantile_sketch import KLLSketch
+
+QUANTILES = {"median": 0.5, "p90": 0.9, "p99": 0.99}
+SUMMARY_COLUMNS = ["count", "nulls", "mean", "std", "min", "max"] + list(QUANTILES)
+
+def as_float(value, default=None):
+    """value as a float, or default when it is missing or not numeric (e.g. a "positive" sentiment)"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
 def summarize_dataframe(df):
-    summary = {}
-    for col in df.select_dtypes(include='number').columns:
-        summary[col] = {
-            "mean": df[col].mean(),
-            "std": df[col].std(),
-            "min": df[col].min(),
-            "max": df[col].max(),
-        }
-    return pd.DataFrame(summary).T
+    """count, nulls, mean, std, min, max, median, p90 and p99 per numeric column.
+
+    One vectorized pass over the numeric block; quantiles come from a KLL
+    sketch (exact up to a thousand-odd values), the same code path
+    summarize_chunks merges across chunks. Also accepts an iterable of chunks.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return summarize_chunks(df)
+    moments, sketches = _block_summary(df)
+    return _summary_frame(moments, sketches)
+
+def _block_summary(df):
+    """Per-column moments (n, nulls, mean, M2, min, max) and quantile sketches for one frame"""
+    numeric = df.select_dtypes(include='number')
+    values = numeric.to_numpy(dtype="float64", na_value=np.nan)
+    ordered = np.sort(values, axis=0)  # NaN last; also feeds the sketches without re-sorting
+    count = (~np.isnan(values)).sum(axis=0)
+    last = np.maximum(count - 1, 0)
+    columns = np.arange(values.shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.nansum(values, axis=0) / count
+        m2 = np.nansum((values - mean) ** 2, axis=0)
+    has_values = count > 0
+    moments = pd.DataFrame({
+        "n": count,
+        "nulls": len(values) - count,
+        "mean": mean,
+        "m2": np.where(has_values, m2, np.nan),
+        "min": np.where(has_values, ordered[0] if len(values) else np.nan, np.nan),
+        "max": np.where(has_values, ordered[last, columns] if len(values) else np.nan, np.nan),
+    }, index=numeric.columns)
+    sketches = {col: KLLSketch().update(ordered[:count[i], i], is_sorted=True) for i, col in enumerate(numeric.columns)}
+    return moments, sketches
+
+def _merge_moments(a, b):
+    """Combine two chunks' count/mean/M2 (Chan et al.) plus nulls and min/max, column by column"""
+    index = a.index.append(b.index.difference(a.index, sort=False))
+    a, b = a.reindex(index), b.reindex(index)
+    a["n"], b["n"] = a["n"].fillna(0), b["n"].fillna(0)
+    n = a["n"] + b["n"]
+    delta = b["mean"].fillna(0) - a["mean"].fillna(0)
+    share = (b["n"] / n).fillna(0)
+    return pd.DataFrame({
+        "n": n,
+        "nulls": a["nulls"].fillna(0) + b["nulls"].fillna(0),
+        "mean": (a["mean"].fillna(0) + delta * share).where(n > 0),
+        "m2": a["m2"].fillna(0) + b["m2"].fillna(0) + delta ** 2 * a["n"] * share,
+        "min": np.fmin(a["min"], b["min"]),
+        "max": np.fmax(a["max"], b["max"]),
+    })
+
+def _summary_frame(moments, sketches):
+    if moments.empty:
+        return pd.DataFrame()
+    n = moments["n"]
+    summary = pd.DataFrame({
+        "count": n.astype("int64"),
+        "nulls": moments["nulls"].astype("int64"),
+        "mean": moments["mean"],
+        "std": np.sqrt(moments["m2"] / (n - 1)).where(n > 1),
+        "min": moments["min"],
+        "max": moments["max"],
+    })
+    quantiles = np.array([sketches[col].quantiles(list(QUANTILES.values())) for col in moments.index])
+    for i, name in enumerate(QUANTILES):
+        summary[name] = quantiles[:, i]
+    return summary
+
+class StatsAccumulator:
+    """Running summarize_dataframe: update() with chunks as they arrive, merge() partial
+    accumulators (other processes, earlier sessions), to_frame() for the summary.
+
+    Moments are merged per chunk with Chan et al.'s update, the batched form of
+    Welford's algorithm; to_dict()/from_dict() round-trip through JSON so a
+    dashboard can persist the state and add only new rows later.
+    """
+
+    def __init__(self):
+        self.moments = None
+        self.sketches = {}
+        self.rows = 0
+
+    def update(self, chunk):
+        moments, sketches = _block_summary(chunk)
+        self.rows += len(chunk)
+        return self._absorb(moments, sketches)
+
+    def merge(self, other):
+        self.rows += other.rows
+        if other.moments is None:
+            return self
+        return self._absorb(other.moments, {col: KLLSketch.from_dict(s.to_dict()) for col, s in other.sketches.items()})
+
+    def _absorb(self, moments, sketches):
+        self.moments = moments if self.moments is None else _merge_moments(self.moments, moments)
+        for col, sketch in sketches.items():
+            self.sketches[col] = self.sketches[col].merge(sketch) if col in self.sketches else sketch
+        return self
+
+    def to_frame(self):
+        if self.moments is None:
+            return pd.DataFrame()
+        return _summary_frame(self.moments, self.sketches)
+
+    def to_dict(self):
+        columns = []
+        if self.moments is not None:
+            for col, row in self.moments.iterrows():
+                columns.append({"column": col, **{k: float(v) for k, v in row.items()}, "sketch": self.sketches[col].to_dict()})
+        return {"rows": self.rows, "columns": columns}
+
+    @classmethod
+    def from_dict(cls, state):
+        accumulator = cls()
+        accumulator.rows = state.get("rows", 0)
+        columns = state.get("columns", [])
+        if columns:
+            accumulator.moments = pd.DataFrame(
+                [{k: v for k, v in c.items() if k not in ("column", "sketch")} for c in columns],
+                index=[c["column"] for c in columns],
+            )
+            accumulator.sketches = {c["column"]: KLLSketch.from_dict(c["sketch"]) for c in columns}
+        return accumulator
+
+def summarize_chunks(chunks):
+    """summarize_dataframe over an iterable of DataFrame chunks, one chunk in memory at a time"""
+    accumulator = StatsAccumulator()
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.to_frame()
+
+def _weighted_quantiles(x, w, counts, totals, starts, qs):
+    """Weighted quantiles per group, linearly interpolated: row k of a group sits at
+    (weight before it) / (group weight - last row's weight), which is pandas' default
+    'linear' rule when every weight is 1. x and w are sorted by group then value, with
+    each group's usable rows first (unusable rows carry zero weight)."""
+    before = np.cumsum(w) - w
+    base = before[starts]
+    last = starts + np.maximum(counts, 1) - 1
+    span = totals - w[last]
+    out = np.full((len(starts), len(qs)), np.nan)
+    for i, q in enumerate(qs):
+        target = base + q * span
+        index = np.clip(np.searchsorted(before, target, side="right") - 1, starts, last)
+        following = np.minimum(index + 1, last)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.where(following > index, np.clip((target - before[index]) / w[index], 0, 1), 0.0)
+        out[:, i] = x[index] + (x[following] - x[index]) * fraction
+    out[counts == 0] = np.nan
+    return out
+
+def _group_order(codes, x):
+    """Permutation sorting rows by group, then value (NaN last): argsort the values once,
+    then plain-sort a group * n + rank key; over twice as fast as np.lexsort."""
+    by_value = np.argsort(x)
+    key = codes[by_value].astype(np.int64) * len(x) + np.arange(len(x))
+    return by_value[np.sort(key) % len(x)]
+
+def summarize_groups(df, by=None, weights=None, columns=None):
+    """Weighted count, mean, std, min, max, median, p90 and p99 per segment and numeric column.
+
+    Tidy output: one row per segment × column, with the segment columns first,
+    then column, count (usable rows), weight (sum of weights), effective_n
+    (Kish) and the statistics. Segments are numbered in a single groupby pass
+    and every statistic is a bincount or one sort over all groups at once.
+    Rows with a missing value or weight, or a zero weight, are left out per
+    column; std uses reliability weights and quantiles interpolate linearly
+    between cumulative weights, so both equal pandas' std and quantile when
+    unweighted. Negative weights raise ValueError.
+    """
+    by = [by] if isinstance(by, str) else list(by or [])
+    if columns is None:
+        columns = [c for c in df.select_dtypes(include='number').columns if c not in by and c != weights]
+    if not len(df):
+        columns = []
+    if by:
+        grouped = df.groupby(by, observed=True, dropna=False, sort=True)
+        codes = grouped.ngroup().to_numpy()
+        keys = grouped.size().index
+    else:
+        codes = np.zeros(len(df), dtype=np.intp)
+        keys = None
+    groups = len(keys) if keys is not None else 1
+    if weights is None:
+        w = np.ones(len(df))
+    else:
+        w = df[weights].to_numpy(dtype="float64", na_value=np.nan)
+        if (w < 0).any():
+            raise ValueError(f"Weight column '{weights}' has negative values")
+        w = np.nan_to_num(w, nan=0.0)
+
+    parts = []
+    for col in columns:
+        x = df[col].to_numpy(dtype="float64", na_value=np.nan)
+        usable = ~np.isnan(x) & (w > 0)
+        x = np.where(usable, x, np.nan)
+        wx = np.where(usable, w, 0.0)
+        counts = np.bincount(codes, weights=usable, minlength=groups).astype("int64")
+        totals = np.bincount(codes, weights=wx, minlength=groups)
+        squares = np.bincount(codes, weights=wx ** 2, minlength=groups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.bincount(codes, weights=wx * np.nan_to_num(x), minlength=groups) / totals
+            m2 = np.bincount(codes, weights=wx * (np.nan_to_num(x) - np.nan_to_num(mean)[codes]) ** 2, minlength=groups)
+            std = np.sqrt(m2 / (totals - squares / totals))
+            effective_n = totals ** 2 / squares
+        order = _group_order(codes, x)
+        sizes = np.bincount(codes, minlength=groups)
+        starts = np.cumsum(sizes) - sizes
+        ordered = x[order]
+        has_values = counts > 0
+        part = pd.DataFrame({
+            "column": col,
+            "count": counts,
+            "weight": totals,
+            "effective_n": np.where(has_values, effective_n, np.nan),
+            "mean": np.where(has_values, mean, np.nan),
+            "std": np.where(counts > 1, std, np.nan),
+            "min": np.where(has_values, ordered[starts], np.nan),
+            "max": np.where(has_values, ordered[starts + np.maximum(counts, 1) - 1], np.nan),
+        }, index=keys)
+        quantiles = _weighted_quantiles(ordered, wx[order], counts, totals, starts, list(QUANTILES.values()))
+        for i, name in enumerate(QUANTILES):
+            part[name] = quantiles[:, i]
+        parts.append(part)
+    if not parts:
+        return pd.DataFrame(columns=by + ["column", "count", "weight", "effective_n"] + SUMMARY_COLUMNS[2:])
+    table = pd.concat(parts)
+    return table.reset_index() if keys is not None else table.reset_index(drop=True)
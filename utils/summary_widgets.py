@@ -0,0 +1,31 @@
+import streamlit as st
+
+from utils.export_helpers import export_csv
+from utils.segment_breakdown import segment_columns
+from utils.stats_helpers import summarize_groups
+from utils.visualizers import plot_bar_chart
+
+NO_WEIGHT = "(unweighted)"
+
+def segment_summary_section(df, key="segment_summary"):
+    """Expander with per-segment, optionally weighted, numeric summaries: table, chart of means and CSV export"""
+    numeric = list(df.select_dtypes(include='number').columns)
+    with st.expander("📐 Segment & weighted summary"):
+        by = st.multiselect("Segment by", segment_columns(df), key=f"{key}_by")
+        weight = st.selectbox("Weight column", [NO_WEIGHT] + numeric, key=f"{key}_weight")
+        weight = None if weight == NO_WEIGHT else weight
+        if not by and weight is None:
+            st.caption("Pick segment columns and/or a weight column (e.g. a survey weight).")
+            return None
+        candidates = [c for c in numeric if c not in by and c != weight]
+        columns = st.multiselect("Numeric columns (all if none selected)", candidates, key=f"{key}_columns") or candidates
+        table = summarize_groups(df, by, weight, columns)
+        st.dataframe(table)
+        st.caption("Median, p90 and p99 interpolate linearly between cumulative weights (pandas' quantile when unweighted).")
+        if by and len(table):
+            metric = st.selectbox("Chart mean of", columns, key=f"{key}_metric")
+            chart = table[table["column"] == metric].copy()
+            chart["segment"] = chart[by].astype(str).agg(" × ".join, axis=1)
+            plot_bar_chart(chart, x="segment", y="mean", title=f"{'Weighted mean' if weight else 'Mean'} {metric} by {' × '.join(by)}")
+        export_csv(table, "segment_summary.csv")
+        return table
@@ -0,0 +1,46 @@
+import re
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; offline we estimate
+        print(f"Tokenizer unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Count tokens locally with tiktoken, or estimate when it is unavailable"""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Words and punctuation average about 1.3 BPE tokens in English text
+    return int(len(_WORD_RE.findall(text)) * 1.3) + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-3.5-turbo") -> str:
+    """Cut text down to at most max_tokens tokens"""
+    encoding = _encoding(model)
+    if encoding is not None:
+        ids = encoding.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else encoding.decode(ids[:max_tokens])
+    while count_tokens(text, model) > max_tokens:
+        text = text[:int(len(text) * 0.8)]
+    return text
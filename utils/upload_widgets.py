@@ -0,0 +1,29 @@
+import streamlit as st
+
+from utils.ingest import get_ingest_cache, load_upload, upload_report
+from utils.xlsx_reader import xlsx_columns, xlsx_sheets
+
+def load_upload_with_options(uploaded_file, key="upload"):
+    """load_upload, with sheet and column pickers for workbooks (applied before parsing) and a load report"""
+    sheet = usecols = None
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        with st.expander("Workbook options"):
+            sheets = xlsx_sheets(uploaded_file)
+            if len(sheets) > 1:
+                sheet = st.selectbox("Sheet", sheets, key=f"{key}_sheet")
+            columns = xlsx_columns(uploaded_file, sheet)
+            usecols = st.multiselect("Columns to load (all if none selected)", columns, key=f"{key}_columns") or None
+    df = load_upload(uploaded_file, sheet, usecols)
+    report = upload_report(uploaded_file, sheet, usecols)
+    if report is not None:
+        st.caption(report.describe())
+    return df
+
+def upload_key(uploaded_file, df, key="upload"):
+    """Identifies the loaded data for caching results: the upload's content hash (the ingest
+    cache key, hashed once per upload), the sheet and columns picked in
+    load_upload_with_options, and the shape and headers of what was loaded"""
+    content = get_ingest_cache().key_for(uploaded_file.getvalue, uploaded_file.name,
+                                         getattr(uploaded_file, "file_id", None))
+    usecols = st.session_state.get(f"{key}_columns") or ()
+    return (content, st.session_state.get(f"{key}_sheet"), tuple(usecols), len(df), tuple(df.columns))
@@ -11,6 +11,22 @@ def plot_bar_chart(df, x, y, title="Chart"):
     df.plot(kind='bar', x=x, y=y, legend=False, ax=ax)
     st.pyplot(fig)
 
+def plot_line_chart(df, x, y, title="Chart", markers=None, ylabel=None):
+    """Lines for each column in y against x; markers ({label: x value}) are drawn as dotted verticals"""
+    st.markdown(f"#### {title}")
+    fig, ax = plt.subplots()
+    for col, label in (y.items() if isinstance(y, dict) else ((c, c) for c in y)):
+        ax.plot(df[x], df[col], label=label)
+    for label, value in (markers or {}).items():
+        if pd.notna(value):
+            ax.axvline(value, linestyle=":", color="grey")
+            ax.annotate(f"{label} {value:,.2f}", (value, ax.get_ylim()[1]), rotation=90, va="top", ha="right", fontsize=8)
+    ax.set_xlabel(x)
+    if ylabel:
+        ax.set_ylabel(ylabel)
+    ax.legend()
+    st.pyplot(fig)
+
 def plot_radar_chart(data_dict, title="Radar Chart"):
     categories = list(data_dict.keys())
     values = list(data_dict.values())
@@ -2,11 +2,12 @@
 
 from typing import List, Dict
 from datetime import datetime
-import requests
 from bs4 import BeautifulSoup
 import feedparser
 import urllib.parse
 
+from utils.http_fetch import fetch
+
 
 def scrape_reddit_cybersecurity(company: str) -> List[Dict]:
     """Scrapes Reddit posts via Google search results"""
@@ -14,7 +15,7 @@ def scrape_reddit_cybersecurity(company: str) -> List[Dict]:
     url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
     headers = {"User-Agent": "Mozilla/5.0"}
     
-    response = requests.get(url, headers=headers)
+    response = fetch(url, headers=headers)
     soup = BeautifulSoup(response.text, "html.parser")
 
     results = []
@@ -33,8 +34,8 @@ def scrape_reddit_cybersecurity(company: str) -> List[Dict]:
 
 def scrape_google_news_rss(company: str) -> List[Dict]:
     """Scrapes Google News RSS feed for company mentions"""
-    rss_url = f"https://news.google.com/rss/search?q={company}"
-    feed = feedparser.parse(rss_url)
+    rss_url = f"https://news.google.com/rss/search?q={urllib.parse.quote(company)}"
+    feed = feedparser.parse(fetch(rss_url).content)
 
     results = []
     for entry in feed.entries[:10]:
@@ -0,0 +1,462 @@
+import html
+import io
+import os
+import posixpath
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from openpyxl import load_workbook
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+XLSX_BLOCK_BYTES = 4 * 1024 * 1024  # sheet XML decoded per block
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# pandas' default na_values, so text cells become NaN exactly as with pd.read_excel
+NA_STRINGS = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+              "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+XML_ENTITIES = [("&lt;", "<"), ("&gt;", ">"), ("&quot;", '"'), ("&apos;", "'"), ("&amp;", "&")]
+
+HEADER_ROW = 1
+# Excel error values; pd.read_excel reads error cells as NaN
+EXCEL_ERRORS = ["#DIV/0!", "#N/A", "#NAME?", "#NULL!", "#NUM!", "#REF!", "#VALUE!", "#GETTING_DATA"]
+
+try:
+    TEXT_DTYPE = pd.StringDtype(na_value=np.nan)  # pandas' default "str" dtype
+except TypeError:
+    TEXT_DTYPE = None  # pandas < 2.3 has no NaN-backed string dtype; read_excel gives object columns there
+
+# Cell kinds
+EMPTY, NUMBER, TEXT, BOOL, DATE = 0, 1, 2, 3, 4
+
+# One pass for the usual attribute order (r, s, t: Excel, openpyxl, LibreOffice) ...
+CELL_RE = (r'(?s)^r="(?P<col>[A-Z]{1,3})(?P<row>\d+)"(?: s="(?P<s>\d+)")?(?: t="(?P<t>[A-Za-z]+)")?(?P<rest>[^>]*?)'
+           r'(?:/>|>\s*(?:<f[^>]*/>\s*|<f[^>]*>[^<]*</f>\s*)?(?:<v>(?P<v>[^<]*)</v>|<is>(?P<is>.*?)</is>)?)')
+# ... and one pattern per attribute for blocks written in any other order
+CELL_REF_RE = r'^[^>]*?\br="(?P<col>[A-Z]{1,3})(?P<row>\d+)"'
+CELL_TYPE_RE = r'^[^>]*?\bt="(?P<t>[A-Za-z]+)"'
+CELL_STYLE_RE = r'^[^>]*?\bs="(?P<s>\d+)"'
+CELL_VALUE_RE = r'^[^>]*[^/]>\s*(?:<f[^>]*/>\s*|<f[^>]*>[^<]*</f>\s*)?<v>(?P<v>[^<]*)</v>'
+CELL_INLINE_RE = r'(?s)^[^>]*[^/]>\s*<is>(?P<is>.*?)</is>'
+
+
+class UnsupportedSheet(Exception):
+    """Sheet XML the vectorized reader does not handle; read_xlsx falls back to openpyxl"""
+
+
+def _open_zip(source) -> zipfile.ZipFile:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return zipfile.ZipFile(io.BytesIO(source))
+    if isinstance(source, (str, os.PathLike)):
+        return zipfile.ZipFile(source)
+    source.seek(0)
+    return zipfile.ZipFile(source)
+
+
+def _rels(zf: zipfile.ZipFile, part: str) -> Dict[str, tuple]:
+    """Relationship id -> (type suffix, target part path) for one package part"""
+    folder, name = posixpath.split(part)
+    rels_path = posixpath.join(folder, "_rels", name + ".rels")
+    if rels_path not in zf.namelist():
+        return {}
+    rels = {}
+    for rel in ET.fromstring(zf.read(rels_path)).iter(PKG_REL_NS + "Relationship"):
+        target = rel.get("Target", "")
+        target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id")] = (rel.get("Type", "").rsplit("/", 1)[-1], target)
+    return rels
+
+
+class _Workbook:
+    """The parts of an .xlsx package needed to read its sheets"""
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self.zf = zf
+        root_rels = _rels(zf, "")
+        path = next((target for kind, target in root_rels.values() if kind == "officeDocument"), "xl/workbook.xml")
+        workbook = ET.fromstring(zf.read(path))
+        rels = _rels(zf, path)
+        self.sheets = {
+            sheet.get("name"): rels[sheet.get(DOC_REL_NS + "id")][1]
+            for sheet in workbook.iter(MAIN_NS + "sheet")
+        }
+        pr = workbook.find(MAIN_NS + "workbookPr")
+        self.epoch = np.datetime64("1904-01-01" if pr is not None and pr.get("date1904") in ("1", "true")
+                                   else "1899-12-30", "us")
+        parts = {kind: target for kind, target in rels.values()}
+        self._shared_path = parts.get("sharedStrings")
+        self._styles_path = parts.get("styles")
+        self._shared = None
+        self._date_styles = None
+
+    def sheet_path(self, sheet: Union[str, int, None]) -> str:
+        names = list(self.sheets)
+        if not names:
+            raise ValueError("Workbook has no sheets")
+        if sheet is None:
+            sheet = 0
+        if isinstance(sheet, int):
+            return self.sheets[names[sheet]]
+        if sheet not in self.sheets:
+            raise ValueError(f"Worksheet named '{sheet}' not found")
+        return self.sheets[sheet]
+
+    def shared_strings(self) -> pa.Array:
+        if self._shared is None:
+            strings = []
+            if self._shared_path:
+                with self.zf.open(self._shared_path) as f:
+                    for _, si in ET.iterparse(f):
+                        if si.tag == MAIN_NS + "si":
+                            # Plain <t>, or the <r><t> runs of rich text (phonetic <rPh> runs are skipped)
+                            runs = si.findall(MAIN_NS + "t") or si.findall(f"{MAIN_NS}r/{MAIN_NS}t")
+                            strings.append("".join(t.text or "" for t in runs))
+                            si.clear()
+            self._shared = pa.array(strings, type=pa.large_string())
+        return self._shared
+
+    def date_styles(self) -> np.ndarray:
+        """Per cell-format index: does it display a date?"""
+        if self._date_styles is None:
+            flags = []
+            if self._styles_path:
+                styles = ET.fromstring(self.zf.read(self._styles_path))
+                formats = dict(BUILTIN_FORMATS)
+                for fmt in styles.iter(MAIN_NS + "numFmt"):
+                    formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode", "")
+                xfs = styles.find(MAIN_NS + "cellXfs")
+                for xf in (xfs if xfs is not None else []):
+                    code = formats.get(int(xf.get("numFmtId", 0)), "General")
+                    flags.append(is_date_format(code))
+            self._date_styles = np.array(flags + [False], dtype=bool)
+        return self._date_styles
+
+
+def _iter_blocks(zf: zipfile.ZipFile, path: str, block_bytes: int) -> Iterator[str]:
+    """Sheet XML in pieces that each end on a row boundary"""
+    with zf.open(path) as raw:
+        stream = io.TextIOWrapper(raw, encoding="utf-8")
+        tail = ""
+        while True:
+            chunk = stream.read(block_bytes)
+            if not chunk:
+                break
+            text = tail + chunk
+            cut = text.rfind("</row>")
+            if cut < 0:
+                tail = text
+                continue
+            cut += len("</row>")
+            yield text[:cut]
+            tail = text[cut:]
+        if tail:
+            yield tail
+
+
+def _unescape(strings: pa.Array) -> pa.Array:
+    if pc.any(pc.match_substring(strings, "&#")).as_py():  # numeric character references: rare, do it in Python
+        return pa.array([None if s is None else html.unescape(s) for s in strings.to_pylist()],
+                        type=pa.large_string())
+    for entity, char in XML_ENTITIES:
+        strings = pc.replace_substring(strings, entity, char)
+    return strings
+
+
+def _column_index(letters: pa.Array) -> np.ndarray:
+    encoded = letters.dictionary_encode()
+    lookup = np.array([
+        sum((ord(ch) - 64) * 26 ** i for i, ch in enumerate(reversed(word))) - 1
+        for word in encoded.dictionary.to_pylist()
+    ], dtype=np.int32)
+    return lookup[encoded.indices.to_numpy()]
+
+
+def _parse_block(text: str, book: _Workbook) -> Dict[str, object]:
+    """Every cell of a block of sheet XML as parallel arrays, parsed with
+    Arrow's regex kernels rather than one Python object per cell"""
+    if "<c>" in text or ":sheetData" in text or ":row" in text:
+        raise UnsupportedSheet("cells without references or prefixed XML")
+    cells = pc.list_flatten(pc.split_pattern(pa.array([text], type=pa.large_string()), "<c "))
+    cells = cells.slice(1)  # everything before the first cell
+    parsed = pc.extract_regex(cells, CELL_RE)
+    if parsed.null_count or pc.any(pc.match_substring_regex(pc.struct_field(parsed, "rest"), r'\b[rst]="')).as_py():
+        ref = pc.extract_regex(cells, CELL_REF_RE)
+        if ref.null_count:
+            raise UnsupportedSheet("cells without references")
+        fields = {name: pc.struct_field(ref, name) for name in ("col", "row")}
+        for name, pattern in (("t", CELL_TYPE_RE), ("s", CELL_STYLE_RE), ("v", CELL_VALUE_RE), ("is", CELL_INLINE_RE)):
+            fields[name] = pc.struct_field(pc.extract_regex(cells, pattern), name).fill_null("")
+    else:
+        fields = {name: pc.struct_field(parsed, name) for name in ("col", "row", "t", "s", "v", "is")}
+    value, inline = fields["v"], fields["is"]
+
+    encoded = pc.if_else(pc.equal(fields["t"], ""), "n", fields["t"]).dictionary_encode()
+    types = np.array(encoded.dictionary.to_pylist(), dtype=object)[encoded.indices.to_numpy()]
+    has_value = pc.not_equal(value, "").to_numpy(zero_copy_only=False)
+    kinds = np.full(len(cells), EMPTY, dtype=np.int8)
+    numeric = (types == "n") & has_value
+    styles = pc.cast(pc.if_else(pc.equal(fields["s"], ""), "0", fields["s"]), pa.int64()).to_numpy()
+    date_styles = book.date_styles()
+    is_date = date_styles[np.minimum(styles, len(date_styles) - 1)]
+    kinds[numeric] = NUMBER
+    kinds[numeric & is_date] = DATE
+    kinds[(types == "b") & has_value] = BOOL
+
+    numbers = np.full(len(cells), np.nan)
+    number_cells = numeric | (kinds == BOOL)
+    if number_cells.any():
+        numbers[number_cells] = pc.cast(pc.filter(value, pa.array(number_cells)), pa.float64()).to_numpy()
+
+    shared = (types == "s") & has_value
+    formula_text = (types == "str") & has_value
+    inline_text = types == "inlineStr"
+    if (types == "d").any():
+        raise UnsupportedSheet("ISO 8601 date cells")
+    strings = pa.nulls(len(cells), type=pa.large_string())
+    if shared.any():
+        indices = pc.cast(pc.if_else(pa.array(shared), value, None), pa.int64())
+        strings = pc.take(book.shared_strings(), indices)
+    if formula_text.any():
+        strings = pc.if_else(pa.array(formula_text), _unescape(value.cast(pa.large_string())), strings)
+    if inline_text.any():
+        plain = pc.replace_substring_regex(inline.cast(pa.large_string()), r"<rPh\b.*?</rPh>|<[^>]*>", "")
+        strings = pc.if_else(pa.array(inline_text), _unescape(plain), strings)
+    text_cells = shared | formula_text | inline_text
+    kinds[text_cells] = TEXT
+    missing = pc.is_in(strings, value_set=pa.array(NA_STRINGS, type=pa.large_string())).fill_null(False)
+    kinds[text_cells & missing.to_numpy(zero_copy_only=False)] = EMPTY
+
+    return {
+        "row": pc.cast(fields["row"], pa.int32()).to_numpy(),
+        "col": _column_index(fields["col"]),
+        "kind": kinds,
+        "number": numbers,
+        "text": strings,
+    }
+
+
+def _select(block: Dict[str, object], mask: np.ndarray) -> Dict[str, object]:
+    return {
+        key: pc.filter(values, pa.array(mask)) if isinstance(values, (pa.Array, pa.ChunkedArray)) else values[mask]
+        for key, values in block.items()
+    }
+
+
+def _header_names(block: Dict[str, object], header_row: int) -> Dict[int, object]:
+    at_header = (block["row"] == header_row) & (block["kind"] != EMPTY)
+    names = {}
+    texts = block["text"].to_numpy(zero_copy_only=False)
+    for col, kind, number, text in zip(block["col"][at_header], block["kind"][at_header],
+                                       block["number"][at_header], texts[at_header]):
+        if kind == TEXT:
+            names[int(col)] = text
+        elif kind == BOOL:
+            names[int(col)] = bool(number)
+        else:
+            names[int(col)] = int(number) if float(number).is_integer() else float(number)
+    return names
+
+
+def _dedupe(names: List[object]) -> List[object]:
+    """pandas' header mangling: repeated names become name.1, name.2, ...,
+    skipping suffixes that another header already uses (a, a, a.1 -> a, a.2, a.1)"""
+    names = list(names)
+    counts = defaultdict(int)
+    for i, name in enumerate(names):
+        label, count = name, counts[name]
+        while count > 0:
+            counts[name] = count + 1
+            label = f"{name}.{count}"
+            count = count + 1 if label in names else counts[label]
+        names[i] = label
+        counts[label] = count + 1
+    return names
+
+
+def _serial_datetimes(numbers: np.ndarray, epoch: np.datetime64) -> np.ndarray:
+    """Excel date serials -> datetime64[us]; the time of day is rounded to whole
+    milliseconds, as openpyxl does, so 01:00 does not come back as 00:59:59.999999"""
+    days = np.floor(numbers)
+    milliseconds = np.round((numbers - days) * 86_400_000).astype(np.int64)
+    return epoch + days.astype(np.int64).astype("timedelta64[D]") + milliseconds.astype("timedelta64[ms]")
+
+
+def _build_column(kinds, positions, numbers, texts: Optional[pa.Array], rows: int, epoch: np.datetime64):
+    present = set(np.unique(kinds).tolist())
+    complete = len(positions) == rows
+    if present <= {NUMBER}:
+        values = np.full(rows, np.nan)
+        values[positions] = numbers
+        if complete and rows and np.all(np.mod(numbers, 1) == 0) and np.all(np.abs(numbers) < 2 ** 53):
+            return values.astype(np.int64)
+        return values
+    if present == {DATE}:
+        values = np.full(rows, np.datetime64("NaT"), dtype="datetime64[us]")
+        values[positions] = _serial_datetimes(numbers, epoch)
+        return values
+    if present == {BOOL}:
+        if not complete:  # pandas reads a boolean column with gaps as 1.0/0.0/NaN
+            values = np.full(rows, np.nan)
+            values[positions] = numbers
+            return values
+        values = np.zeros(rows, dtype=bool)
+        values[positions] = numbers != 0
+        return values
+    if present == {TEXT}:
+        indices = np.full(rows, -1, dtype=np.int64)
+        indices[positions] = np.arange(len(positions))
+        column = pc.take(texts, pa.array(indices, mask=indices < 0))
+        if TEXT_DTYPE is None:
+            values = column.to_numpy(zero_copy_only=False)
+            values[column.is_null().to_numpy(zero_copy_only=False)] = np.nan
+            return values
+        return column.to_pandas(types_mapper={pa.large_string(): TEXT_DTYPE}.get)
+    values = np.full(rows, np.nan, dtype=object)
+    texts = texts.to_numpy(zero_copy_only=False)
+    for pos, kind, number, text in zip(positions, kinds, numbers, texts):
+        if kind == TEXT:
+            values[pos] = text
+        elif kind == BOOL:
+            values[pos] = bool(number)
+        elif kind == DATE:
+            values[pos] = pd.Timestamp(_serial_datetimes(np.array([number]), epoch)[0])
+        else:
+            values[pos] = int(number) if float(number).is_integer() else float(number)
+    return values
+
+
+def _to_frame(cells: Dict[str, object], header_row: int, names: Dict[int, object],
+              columns: List[int], epoch: np.datetime64) -> pd.DataFrame:
+    """Data cells (header row already removed) into columns. Like
+    pd.read_excel, blank rows inside the data are kept and trailing ones dropped."""
+    rows = int(cells["row"].max()) - header_row if len(cells["row"]) else 0
+    order = np.argsort(cells["col"], kind="stable")
+    sorted_cols = cells["col"][order]
+    frame = {}
+    labels = _dedupe([names.get(col, f"Unnamed: {col}") for col in columns])
+    for label, col in zip(labels, columns):
+        lo, hi = np.searchsorted(sorted_cols, [col, col + 1])
+        idx = order[lo:hi]
+        kinds = cells["kind"][idx]
+        texts = pc.take(cells["text"], pa.array(idx)) if (kinds == TEXT).any() else None
+        frame[label] = _build_column(kinds, cells["row"][idx] - header_row - 1, cells["number"][idx], texts, rows, epoch)
+    return pd.DataFrame(frame)
+
+
+def _wanted_columns(names: Dict[int, object], max_col: int, usecols: Optional[Sequence]) -> List[int]:
+    all_cols = list(range(max_col + 1))
+    if usecols is None:
+        return all_cols
+    labels = dict(zip(_dedupe([names.get(c, f"Unnamed: {c}") for c in all_cols]), all_cols))
+    missing = [c for c in usecols if c not in labels]
+    if missing:
+        raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+    return sorted(labels[c] for c in usecols)
+
+
+def _read_fast(book: _Workbook, path: str, usecols: Optional[Sequence], block_bytes: int) -> pd.DataFrame:
+    blocks, header_row, names, keep = [], HEADER_ROW, None, None
+    for text in _iter_blocks(book.zf, path, block_bytes):
+        block = _parse_block(text, book)
+        wanted = block["kind"] != EMPTY
+        if not wanted.any():
+            continue
+        if names is None:
+            names = _header_names(block, header_row)
+            if usecols is not None:
+                keep = _wanted_columns(names, int(block["col"][wanted].max()), usecols)
+        wanted &= block["row"] > header_row
+        if keep is not None:  # other columns are dropped as soon as each block is parsed
+            wanted &= np.isin(block["col"], keep)
+        blocks.append(_select(block, wanted))
+        pa.default_memory_pool().release_unused()  # regex scratch space, so RSS tracks the data kept
+    if names is None:
+        return pd.DataFrame()
+    width = max(max(names, default=-1), max((int(b["col"].max()) for b in blocks if len(b["col"])), default=-1)) + 1
+    columns = keep if keep is not None else list(range(width))
+    if not any(len(b["kind"]) for b in blocks):
+        return pd.DataFrame(columns=_dedupe([names.get(c, f"Unnamed: {c}") for c in columns]))
+    cells = {
+        key: pa.concat_arrays([b[key] for b in blocks]) if key == "text" else np.concatenate([b[key] for b in blocks])
+        for key in blocks[0]
+    }
+    del blocks
+    return _to_frame(cells, header_row, names, columns, book.epoch)
+
+
+def _read_openpyxl(source, sheet: Union[str, int, None], usecols: Optional[Sequence]) -> pd.DataFrame:
+    """openpyxl in read-only mode: rows are streamed, not loaded as a cell grid"""
+    zf_source = io.BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source
+    if hasattr(zf_source, "seek"):
+        zf_source.seek(0)
+    workbook = load_workbook(zf_source, read_only=True, data_only=True)
+    try:
+        ws = workbook.worksheets[sheet or 0] if not isinstance(sheet, str) else workbook[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        labels = _dedupe([name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)])
+        if usecols is None:
+            frame = pd.DataFrame.from_records(rows, columns=labels)
+        else:
+            missing = [c for c in usecols if c not in labels]
+            if missing:
+                raise ValueError(f"Usecols do not match columns, columns expected but not found: {missing}")
+            index = sorted(labels.index(c) for c in usecols)
+            frame = pd.DataFrame.from_records(([row[i] if i < len(row) else None for i in index] for row in rows),
+                                              columns=[labels[i] for i in index])
+    finally:
+        workbook.close()
+    trailing = frame.notna().any(axis=1)
+    frame = frame.iloc[:trailing[::-1].idxmax() + 1 if trailing.any() else 0]
+    return frame.replace(NA_STRINGS + EXCEL_ERRORS, np.nan)
+
+
+def xlsx_sheets(source) -> List[str]:
+    """Sheet names, in workbook order, without reading any sheet"""
+    with _open_zip(source) as zf:
+        return list(_Workbook(zf).sheets)
+
+
+def xlsx_columns(source, sheet: Union[str, int, None] = None) -> List[object]:
+    """Header row of a sheet, reading only the start of its XML"""
+    with _open_zip(source) as zf:
+        book = _Workbook(zf)
+        path = book.sheet_path(sheet)
+        try:
+            for text in _iter_blocks(zf, path, 256 * 1024):
+                block = _parse_block(text, book)
+                block = _select(block, block["kind"] != EMPTY)
+                if len(block["kind"]):
+                    names = _header_names(block, HEADER_ROW)
+                    return _dedupe([names.get(c, f"Unnamed: {c}") for c in range(int(block["col"].max()) + 1)])
+            return []
+        except UnsupportedSheet:
+            pass
+    return list(_read_openpyxl(source, sheet, None).columns)
+
+
+def read_xlsx(source, sheet: Union[str, int, None] = None, usecols: Optional[Sequence] = None,
+              block_bytes: int = XLSX_BLOCK_BYTES) -> pd.DataFrame:
+    """Read one sheet of an .xlsx workbook into a DataFrame, like pd.read_excel.
+
+    The sheet XML is decompressed and parsed in blocks with Arrow's regex
+    kernels, never building an openpyxl cell per value, and `usecols`
+    drops the other columns right after the header is read. Sheets the
+    fast path does not understand are read with openpyxl in read-only mode.
+    """
+    with _open_zip(source) as zf:
+        book = _Workbook(zf)
+        path = book.sheet_path(sheet)
+        try:
+            return _read_fast(book, path, usecols, block_bytes)
+        except UnsupportedSheet as e:
+            print(f"Fast XLSX reader fell back to openpyxl: {e}")
+    return _read_openpyxl(source, sheet, usecols)